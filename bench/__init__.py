@@ -0,0 +1 @@
+# IndieKit Site benchmarks and stress checks
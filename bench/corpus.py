@@ -0,0 +1,164 @@
+"""
+Synthetic content corpus for benchmarks.
+
+Writes ``blog/*.md`` and ``digest/*.md`` with the same frontmatter the real
+``content/`` tree uses, deterministic for a given seed, so a benchmark can
+point ``CONTENT_DIR`` at it before importing ``src.main``. Posts mix zh-CN
+and English prose, fenced code, tables and lists; sizes follow a long-tailed
+distribution (a few hundred bytes up to tens of KB), tags a Zipf-like one.
+About 3% are hidden, and some come in translation pairs, either by slug
+suffix (``foo`` / ``foo-en``, ``foo`` / ``foo-zh``) or ``translation_of``.
+
+    python -m bench.corpus out/ [--posts 1000] [--digests 20] [--seed 0]
+"""
+import argparse
+import random
+import sys
+from datetime import date, timedelta
+from pathlib import Path
+
+TAGS = ["MCP", "AI", "PostgreSQL", "独立开发", "数据库", "部署", "FastAPI", "Claude", "SaaS", "开源", "工作流", "增长",
+        "English", "定价", "SEO", "Cloudflare", "Python", "TypeScript", "产品", "运营"]
+# 长尾标签：大多数只出现在少数几篇文章里
+TAG_POOL = TAGS + [f"topic-{n}" for n in range(300)]
+TAG_WEIGHTS = [1 / (rank + 1) for rank in range(len(TAG_POOL))]
+
+WORDS_ZH = ["独立开发者", "数据库", "部署", "工具", "用户", "增长", "模型", "接口", "缓存", "性能", "架构", "成本",
+            "产品", "定价", "流量", "服务器", "自动化", "工作流", "开源", "上线"]
+WORDS_EN = ["indie", "hacker", "database", "deploy", "agent", "workflow", "cache", "latency", "pricing", "launch",
+            "postgres", "server", "model", "prompt", "revenue", "users", "queue", "index", "migration", "edge"]
+
+HIDDEN_RATE = 0.03
+TRANSLATED_RATE = 0.15
+
+CODE = {
+    "python": "def handler(request):\n    data = load({n})\n    return {{\"items\": data[:{n}]}}\n",
+    "bash": "curl -s https://example.com/api/{n} | jq '.items[] | .name'\nnpx @indiekitai/pg-dash check $DATABASE_URL\n",
+    "sql": "SELECT id, title\nFROM posts\nWHERE created_at > now() - interval '{n} days'\nORDER BY created_at DESC;\n",
+    "json": "{{\n  \"mcpServers\": {{\n    \"tool-{n}\": {{\"command\": \"npx\", \"args\": [\"tool-{n}\"]}}\n  }}\n}}\n",
+}
+
+
+def _sentence(rng: random.Random, lang: str) -> str:
+    if lang == "en":
+        words = rng.choices(WORDS_EN, k=rng.randint(6, 16))
+        return " ".join(words).capitalize() + "."
+    # 中文正文里夹着英文术语，和真实文章一样
+    parts = ["".join(rng.choices(WORDS_ZH, k=rng.randint(2, 4))) for _ in range(rng.randint(2, 4))]
+    if rng.random() < 0.4:
+        parts.insert(rng.randrange(len(parts)), f"用 `{rng.choice(WORDS_EN)}`")
+    return "，".join(parts) + "。"
+
+
+def _paragraph(rng: random.Random, lang: str) -> str:
+    return " ".join(_sentence(rng, lang) for _ in range(rng.randint(2, 7)))
+
+
+def _table(rng: random.Random, lang: str) -> str:
+    header = ["Tool", "Price", "Notes"] if lang == "en" else ["工具", "价格", "说明"]
+    rows = [f"| {rng.choice(WORDS_EN)}-{i} | ${rng.randint(0, 99)}/mo | {_sentence(rng, lang)} |"
+            for i in range(rng.randint(2, 8))]
+    return "\n".join([f"| {' | '.join(header)} |", "|---|---|---|", *rows])
+
+
+def _list(rng: random.Random, lang: str) -> str:
+    return "\n".join(f"{i + 1}. **{rng.choice(WORDS_EN)}**：{_sentence(rng, lang)}" for i in range(rng.randint(3, 6)))
+
+
+def post_body(rng: random.Random, lang: str, sections: int) -> str:
+    parts = []
+    for s in range(sections):
+        parts.append(f"## {'Section' if lang == 'en' else '章节'} {s + 1}")
+        parts.append(_paragraph(rng, lang))
+        roll = rng.random()
+        if roll < 0.35:
+            language = rng.choice(list(CODE))
+            parts.append(f"```{language}\n{CODE[language].format(n=rng.randint(1, 500))}```")
+        elif roll < 0.5:
+            parts.append(_table(rng, lang))
+        elif roll < 0.65:
+            parts.append(_list(rng, lang))
+        if rng.random() < 0.5:
+            parts.append(_paragraph(rng, lang))
+    return "\n\n".join(parts) + "\n"
+
+
+def _sections(rng: random.Random) -> int:
+    # 对数正态：中位 3 节左右（约 2KB），少数长文 30 节以上
+    return max(1, min(60, int(rng.lognormvariate(1.1, 0.8))))
+
+
+def _title(rng: random.Random, lang: str, i: int) -> str:
+    if lang == "en":
+        return f"{' '.join(rng.choices(WORDS_EN, k=rng.randint(3, 7))).title()} ({i})"
+    return f"{''.join(rng.choices(WORDS_ZH, k=rng.randint(2, 4)))}：{rng.choice(WORDS_EN)} 实战 ({i})"
+
+
+def _write_post(blog: Path, rng: random.Random, slug: str, day: date, lang: str, i: int,
+                translation_of: str | None = None) -> None:
+    tags = list(dict.fromkeys(rng.choices(TAG_POOL, TAG_WEIGHTS, k=rng.randint(1, 5))))
+    lines = [
+        "---",
+        f'title: "{_title(rng, lang, i)}"',
+        f"date: {day.isoformat()}",
+        f'description: "{_sentence(rng, lang)}"',
+        "tags: [" + ", ".join(f'"{t}"' for t in tags) + "]",
+        f"lang: {lang}",
+    ]
+    if translation_of:
+        lines.append(f"translation_of: {translation_of}")
+    if rng.random() < HIDDEN_RATE:
+        lines.append("hidden: true")
+    lines += ["---", "", ""]
+    (blog / f"{slug}.md").write_text("\n".join(lines) + post_body(rng, lang, _sections(rng)), encoding="utf-8")
+
+
+def write_corpus(directory: Path, posts: int, digests: int = 0, seed: int = 0) -> Path:
+    """Generate ``posts`` blog posts (translations included) and ``digests`` digest issues under ``directory``."""
+    rng = random.Random(seed)
+    blog = directory / "blog"
+    blog.mkdir(parents=True, exist_ok=True)
+    start = date(2020, 1, 1)
+    written = 0
+    i = 0
+    while written < posts:
+        day = start + timedelta(days=i * 2000 // max(posts, 1))
+        slug = f"{day.isoformat()}-post-{i:06d}"
+        lang = "en" if rng.random() < 0.25 else "zh-CN"
+        _write_post(blog, rng, slug, day, lang, i)
+        written += 1
+        if written < posts and rng.random() < TRANSLATED_RATE:
+            other = "zh-CN" if lang == "en" else "en"
+            if rng.random() < 0.7:
+                # 后缀约定：foo / foo-en、foo / foo-zh
+                _write_post(blog, rng, f"{slug}-{'en' if other == 'en' else 'zh'}", day, other, i)
+            else:
+                _write_post(blog, rng, f"{day.isoformat()}-translated-{i:06d}", day, other, i, translation_of=slug)
+            written += 1
+        i += 1
+
+    if digests:
+        digest = directory / "digest"
+        digest.mkdir(parents=True, exist_ok=True)
+        for n in range(digests):
+            day = start + timedelta(weeks=n)
+            (digest / f"{day.isoformat()}.md").write_text(
+                f'---\ntitle: "Weekly {n + 1}"\ndate: {day.isoformat()}\n'
+                f'description: "{_sentence(rng, "zh-CN")}"\n---\n\n' + post_body(rng, "zh-CN", 4), encoding="utf-8")
+    return directory
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("out_dir", type=Path)
+    parser.add_argument("--posts", type=int, default=1000)
+    parser.add_argument("--digests", type=int, default=20)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+    write_corpus(args.out_dir, args.posts, args.digests, args.seed)
+    print(f"wrote {args.posts} posts, {args.digests} digests to {args.out_dir}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
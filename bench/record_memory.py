@@ -0,0 +1,81 @@
+"""
+Memory held by the post index: per-post dicts vs ``Post`` slots records.
+
+Writes the shared synthetic corpus (``bench.corpus``, ``--posts`` posts) to a
+temp directory, then builds the index records from each file's frontmatter
+twice, with the app's ``_post_record`` and with the previous dict layout, and
+reports the traced memory the records retain.
+
+    python -m bench.record_memory [--posts 10000] [--seed 0]
+"""
+import argparse
+import gc
+import shutil
+import sys
+import tempfile
+import tracemalloc
+from pathlib import Path
+
+import frontmatter
+
+from bench.corpus import write_corpus
+from src.content import Source, _scan_header
+from src.main import _post_record, normalize_lang
+
+def legacy_record(source: Source, post) -> dict:
+    """The per-post dict the index used to hold (minus the body, which is loaded lazily)."""
+    path = source.path
+    return {
+        "slug": path.stem,
+        "title": post.get("title", path.stem),
+        "date": post.get("date", ""),
+        "description": post.get("description", ""),
+        "tags": post.get("tags", []),
+        "lang": normalize_lang(post.get("lang")),
+        "translation_of": post.get("translation_of"),
+        "hidden": bool(post.get("hidden", False)),
+        "digest": source.digest,
+        "mtime": source.mtime,
+    }
+
+
+def measure(directory: Path, build) -> tuple[int, int]:
+    """(number of records, bytes still allocated once they are built)."""
+    files = sorted(directory.glob("*.md"))
+    gc.collect()
+    tracemalloc.start()
+    records = []
+    for path in files:
+        header, offset, digest = _scan_header(path)
+        source = Source(path, digest, path.stat().st_mtime, offset)
+        records.append(build(source, frontmatter.loads(header.decode("utf-8"))))
+    gc.collect()
+    size = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    return len(records), size
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--posts", type=int, default=10_000)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    directory = Path(tempfile.mkdtemp(prefix="indiekit-records-"))
+    try:
+        blog = write_corpus(directory, args.posts, seed=args.seed) / "blog"
+        n, legacy = measure(blog, legacy_record)
+        _, slots = measure(blog, _post_record)
+    finally:
+        shutil.rmtree(directory)
+
+    kib = lambda size: f"{size / 1024:,.0f} KiB"
+    print(f"{n} posts")
+    print(f"dict records   {kib(legacy):>12}  ({legacy / n:,.0f} B/post)")
+    print(f"Post records   {kib(slots):>12}  ({slots / n:,.0f} B/post)")
+    print(f"reduction      {1 - slots / legacy:.0%}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
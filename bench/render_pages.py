@@ -0,0 +1,75 @@
+"""
+Per-page HTML render time, response cache bypassed.
+
+Each route is requested in-process (like the static export does) with the
+response cache cleared before every call, so the timing covers validators,
+page assembly and the layout shell; markdown output is warmed first and
+served from the render cache, so markdown conversion is not measured.
+``render_html`` on its own is timed as well (the shell wrapped around a
+fixed body), once with the same head every time (served from the layout's
+per-page head cache) and once with a new title per call (every head rendered).
+
+    python -m bench.render_pages [--rounds 300]
+"""
+import argparse
+import asyncio
+import statistics
+import sys
+import time
+
+from src import main as site
+from src.asgi import asgi_get
+
+ROUTES = ["/", "/blog", "/tools", "/mcp", "/about", "/digest", "/search?q=MCP"]
+
+
+def _ms(seconds: float) -> str:
+    return f"{seconds * 1000:.3f}ms"
+
+
+async def time_route(route: str, rounds: int) -> list[float]:
+    samples = []
+    for _ in range(rounds):
+        site.response_cache.cache.clear()
+        t = time.perf_counter()
+        status, _, _ = await asgi_get(site.app, route)
+        samples.append(time.perf_counter() - t)
+        if status != 200:
+            raise SystemExit(f"{route}: HTTP {status}")
+    return samples
+
+
+async def run(rounds: int) -> int:
+    posts = site.visible_posts()
+    routes = ROUTES + [f"/blog/{posts[0].slug}"] if posts else ROUTES
+    for route in routes:
+        await asgi_get(site.app, route)  # 预热 markdown 渲染缓存与模板
+
+    body = "<article><p>" + "正文 " * 2000 + "</p></article>"
+    t = time.perf_counter()
+    for _ in range(rounds * 10):
+        site.render_html("Benchmark", body, "description", f"{site.SITE_URL}/bench")
+    shell = (time.perf_counter() - t) / (rounds * 10)
+    print(f"{'render_html':<32} mean {_ms(shell)}")
+    t = time.perf_counter()
+    for i in range(rounds * 10):
+        site.render_html(f"Benchmark {i}", body, "description", f"{site.SITE_URL}/bench")
+    shell = (time.perf_counter() - t) / (rounds * 10)
+    print(f"{'render_html (new head each)':<32} mean {_ms(shell)}")
+
+    for route in routes:
+        samples = sorted(await time_route(route, rounds))
+        print(f"{route:<32} p50 {_ms(statistics.median(samples))}  "
+              f"p95 {_ms(samples[int(len(samples) * 0.95)])}  mean {_ms(statistics.fmean(samples))}")
+    return 0
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--rounds", type=int, default=300)
+    args = parser.parse_args()
+    return asyncio.run(run(args.rounds))
+
+
+if __name__ == "__main__":
+    sys.exit(main())
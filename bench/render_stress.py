@@ -0,0 +1,88 @@
+"""
+Concurrent rendering stress check for MarkdownRenderer.
+
+Renders every post in content/blog plus synthetic documents with colliding
+headings from many threads and event-loop tasks at once, and fails if any
+output differs from a serial render with a fresh ``markdown.Markdown``
+(e.g. TOC ids or table markup bleeding between documents).
+
+    python -m bench.render_stress [--rounds 20] [--threads 16]
+"""
+import argparse
+import asyncio
+import random
+import sys
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+import frontmatter
+import markdown
+
+from src.render import MARKDOWN_EXTENSIONS, MarkdownRenderer
+
+CONTENT_DIR = Path(__file__).parent.parent / "content"
+
+
+def synthetic_docs(n: int) -> list[str]:
+    """Docs whose headings collide, so a shared TOC state shows up as `_1` ids."""
+    docs = []
+    for i in range(n):
+        sections = "\n\n".join(
+            f"## Intro\n\ndoc {i} section {j}\n\n| a | b |\n|---|---|\n| {i} | {j} |\n\n"
+            f"```python\nprint({i}, {j})\n```"
+            for j in range(1 + i % 5)
+        )
+        docs.append(f"[TOC]\n\n# Doc {i}\n\n{sections}\n")
+    return docs
+
+
+def load_docs() -> list[str]:
+    docs = [frontmatter.load(f).content for f in sorted((CONTENT_DIR / "blog").glob("*.md"))]
+    return docs + synthetic_docs(40)
+
+
+def expected(docs: list[str]) -> list[str]:
+    return [markdown.Markdown(extensions=MARKDOWN_EXTENSIONS).convert(d) for d in docs]
+
+
+def run(rounds: int, threads: int) -> int:
+    docs = load_docs()
+    want = expected(docs)
+    failures = 0
+
+    for r in range(rounds):
+        # cache_bytes=0：每次都真正转换，不被缓存掩盖竞争
+        renderer = MarkdownRenderer(MARKDOWN_EXTENSIONS, cache_bytes=0, max_workers=threads)
+        order = list(range(len(docs))) * 3
+        random.Random(r).shuffle(order)
+
+        # 1) 外部线程直接调用 convert()
+        with ThreadPoolExecutor(max_workers=threads) as pool:
+            got = list(pool.map(lambda i: (i, renderer.convert(docs[i])), order))
+
+        # 2) 事件循环上并发 await render()（走渲染器自己的线程池）
+        async def gather():
+            return await asyncio.gather(*(renderer.render(docs[i]) for i in order))
+        got += list(zip(order, asyncio.run(gather())))
+        renderer.shutdown()
+
+        for i, html in got:
+            if html != want[i]:
+                failures += 1
+                print(f"round {r}: doc {i} output differs from serial render", file=sys.stderr)
+
+    total = rounds * len(docs) * 6
+    print(f"{total} concurrent renders of {len(docs)} docs, {failures} mismatches")
+    return 1 if failures else 0
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--rounds", type=int, default=20)
+    parser.add_argument("--threads", type=int, default=16)
+    args = parser.parse_args()
+    return run(args.rounds, args.threads)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
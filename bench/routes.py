@@ -0,0 +1,359 @@
+"""
+Per-route throughput and latency percentiles, with a regression gate.
+
+Every route registered on ``src.main.app`` is driven in-process through the
+ASGI app (``httpx.ASGITransport``), with path parameters filled from the
+corpus (a post slug, the most used tag, a digest issue …). A route with no
+sample fails the run, so new routes have to be added here. Each URL is
+timed twice: ``hot`` leaves the response cache alone (what repeat visitors
+get), ``cold`` clears it before every request (validators, page assembly,
+layout; markdown itself stays in the render cache).
+
+Each corpus runs in its own process, because ``src.main`` reads
+``CONTENT_DIR`` at import: ``content`` is the real tree, a number is a
+synthetic corpus of that many posts (``bench.corpus``).
+
+    python -m bench.routes [--corpus content --corpus 1000] [--rounds 200]
+                           [--json out.json] [--against REF | --baseline FILE]
+                           [--threshold 25] [--metric p50]
+
+The run fails (exit 1) when a route's ``--metric`` latency grows more than
+``--threshold`` percent over the reference, or its status code changes;
+``--min-delta-ms`` ignores sub-noise differences. Sub-millisecond latencies
+only compare on the same machine at the same time, so the reference is
+either ``--against REF`` (a git ref checked out into a temporary worktree
+and measured in this run, alternating with the working tree, best of
+``--repeats``) or ``--baseline FILE``, a ``--json`` file recorded earlier on
+the same machine.
+
+Each tree is measured by its own ``bench.routes`` worker, so the base never
+runs this tree's bench code against its older ``src``. A base whose bench is
+missing or incompatible (the worker fails, or writes no per-route results)
+is skipped with a notice and only the working tree is reported.
+"""
+import argparse
+import asyncio
+import importlib
+import json
+import os
+import platform
+import re
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from contextlib import contextmanager
+from pathlib import Path
+
+from bench.corpus import write_corpus
+
+RESULTS_VERSION = 1
+PASSES = 5
+ROOT = Path(__file__).parent.parent
+
+# 带查询参数的额外请求：同一个路由的不同分支
+EXTRA_URLS = ["/blog?page=2", "/search?q=MCP", "/search?q=独立开发者", "/api/search?q=postgres 部署",
+              "/api/blog?limit=500"]
+# 必填查询参数的取值：不带的话只会测到 422
+QUERY_SAMPLES = {"q": "MCP"}
+# 路由里的 {name} / {name:converter}
+PATH_PARAM = re.compile(r"\{(\w+)(?::\w+)?\}")
+
+
+def route_urls(site) -> tuple[list[str], list[str]]:
+    """Concrete URLs for every app route, and notes for routes this corpus cannot exercise."""
+    from fastapi.routing import APIRoute
+
+    posts = site.visible_posts()
+    issues = site.load_digests()
+    tags = site.tag_index.counts()
+    # 取中位长度的文章，避免正好挑到最短/最长的一篇
+    post = sorted(posts, key=lambda p: len(site.posts_store.body(p)))[len(posts) // 2] if posts else None
+    # 带路径参数的路由 → 参数取值（None：这个语料里没有可用的值）
+    samples = {
+        "/blog/{slug}": post and {"slug": post.slug},
+        "/blog/{slug}.md": post and {"slug": post.slug},
+        "/api/blog/{slug}": post and {"slug": post.slug},
+        "/blog/page/{page:int}": {"page": 2} if len(posts) > site.BLOG_PAGE_SIZE else None,
+        "/blog/tag/{tag:path}": tags and {"tag": tags[0][0]},
+        "/blog/tag/{tag:path}/page/{page:int}":
+            {"tag": tags[0][0], "page": 2} if tags and tags[0][1] > site.BLOG_PAGE_SIZE else None,
+        "/digest/{slug}": issues and {"slug": issues[0].slug},
+        "/digest/{slug}.md": issues and {"slug": issues[0].slug},
+        "/sitemap-{page:int}.xml": {"page": 1} if len(site.sitemaps()) > 1 else None,
+    }
+    urls, skipped = [], []
+    for route in site.app.routes:
+        if not isinstance(route, APIRoute):
+            continue
+        path = route.path
+        required = [q.name for q in route.dependant.query_params if q.field_info.is_required()]
+        if missing := [name for name in required if name not in QUERY_SAMPLES]:
+            raise SystemExit(f"bench.routes: no sample for query parameter(s) {', '.join(missing)} of {path}; "
+                             "add them to QUERY_SAMPLES")
+        query = "&".join(f"{name}={QUERY_SAMPLES[name]}" for name in required)
+        query = f"?{query}" if query else ""
+        if "{" not in path:
+            urls.append(path + query)
+            continue
+        if path not in samples:
+            raise SystemExit(f"bench.routes: no sample parameters for {path}; add it to route_urls()")
+        params = samples[path]
+        if not params:
+            skipped.append(f"{path} (nothing to fill it with in this corpus)")
+            continue
+        urls.append(PATH_PARAM.sub(lambda m: str(params[m.group(1)]), path) + query)
+    return urls + EXTRA_URLS, skipped
+
+
+def summarize(samples: list[float], status: int) -> dict:
+    cuts = statistics.quantiles(samples, n=100, method="inclusive")
+    return {
+        "status": status,
+        "requests": len(samples),
+        "rps": round(len(samples) / sum(samples), 1),
+        "p50_ms": round(cuts[49] * 1000, 4),
+        "p95_ms": round(cuts[94] * 1000, 4),
+        "p99_ms": round(cuts[98] * 1000, 4),
+    }
+
+
+async def time_url(client, site, url: str, rounds: int, max_seconds: float, cold: bool,
+                   samples: list[float]) -> int:
+    """Append up to ``rounds`` latencies (at least 4, then until ``max_seconds``) to ``samples``; returns the status."""
+    status = 0
+    taken = 0
+    budget = time.perf_counter() + max_seconds
+    while taken < rounds and (taken < 4 or time.perf_counter() < budget):
+        if cold:
+            site.response_cache.cache.clear()
+        t = time.perf_counter()
+        response = await client.get(url)
+        samples.append(time.perf_counter() - t)
+        status = response.status_code
+        taken += 1
+    return status
+
+
+async def measure(rounds: int, max_seconds: float) -> dict:
+    """Run every route against the corpus ``CONTENT_DIR`` points at (this process only)."""
+    import httpx
+
+    site = importlib.import_module("src.main")
+    started = time.perf_counter()
+    urls, skipped = route_urls(site)
+    samples: dict[str, list[float]] = {}
+    statuses: dict[str, int] = {}
+    transport = httpx.ASGITransport(app=site.app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+        for url in urls:
+            await client.get(url)  # 预热 markdown 渲染缓存、模板与生成结果
+        # 分几轮交替跑所有路由：机器忽快忽慢时各路由受的影响一样
+        for _ in range(PASSES):
+            for url in urls:
+                for mode in ("hot", "cold"):
+                    name = f"GET {url} [{mode}]"
+                    statuses[name] = await time_url(client, site, url, -(-rounds // PASSES), max_seconds / PASSES,
+                                                    mode == "cold", samples.setdefault(name, []))
+    return {
+        "posts": len(site.load_posts()),
+        "digests": len(site.load_digests()),
+        "skipped": skipped,
+        "seconds": round(time.perf_counter() - started, 2),
+        "routes": {name: summarize(samples[name], statuses[name]) for name in samples},
+    }
+
+
+class WorkerError(Exception):
+    """A worker exited without per-route results; the message is its stderr."""
+
+    def reason(self) -> str:
+        lines = str(self).strip().splitlines()
+        return lines[-1] if lines else "no output"
+
+
+def run_worker(content: Path, tree: Path, rounds: int, max_seconds: float) -> dict:
+    """Measure the app in ``tree`` serving ``content`` in a fresh interpreter, with that tree's own worker."""
+    with tempfile.TemporaryDirectory(prefix="indiekit-bench-") as tmp:
+        out = Path(tmp) / "result.json"
+        # cwd 决定 -m 导入哪棵树的 bench/ 与 src/
+        worker = subprocess.run([sys.executable, "-m", "bench.routes", "--worker", str(out), "--rounds", str(rounds),
+                                 "--max-seconds", str(max_seconds)],
+                                env={**os.environ, "CONTENT_DIR": str(content)}, cwd=tree,
+                                stderr=subprocess.PIPE, text=True)
+        try:
+            result = json.loads(out.read_text()) if not worker.returncode else None
+        except (OSError, ValueError):
+            result = None
+    if not isinstance(result, dict) or not isinstance(result.get("routes"), dict):
+        raise WorkerError(worker.stderr or f"exit {worker.returncode}, no per-route results")
+    return result
+
+
+def best_of(runs: list[dict]) -> dict:
+    """Per route, the lowest latencies over several runs of the same corpus (the least disturbed run)."""
+    merged = dict(runs[-1], routes={})
+    for name, last in runs[-1]["routes"].items():
+        same = [run["routes"][name] for run in runs if name in run["routes"]]
+        merged["routes"][name] = dict(last, **{key: min(r[key] for r in same) for key in last if key.endswith("_ms")},
+                                      rps=max(r["rps"] for r in same))
+    return merged
+
+
+def run_head(content: Path, corpus: str, rounds: int, max_seconds: float) -> dict:
+    try:
+        return run_worker(content, ROOT, rounds, max_seconds)
+    except WorkerError as e:
+        raise SystemExit(f"bench.routes: worker failed on corpus {corpus}:\n{e}")
+
+
+def run_corpora(corpora: list[str], rounds: int, max_seconds: float, base_root: Path | None,
+                repeats: int) -> tuple[dict, dict | None, str | None]:
+    """Results for the working tree and, with ``base_root``, for the base tree measured alternately with it.
+
+    The third value says why the base was dropped (its worker failed); the base results are None then.
+    """
+    head, base = {}, {}
+    skipped = None
+    with tempfile.TemporaryDirectory(prefix="indiekit-bench-") as tmp:
+        for corpus in corpora:
+            if corpus == "content":
+                content = ROOT / "content"
+            else:
+                posts = int(corpus)
+                content = write_corpus(Path(tmp) / corpus, posts, digests=max(4, posts // 50))
+            if base_root is None or skipped:
+                head[corpus] = run_head(content, corpus, rounds, max_seconds)
+                continue
+            # base / head 交替跑，每边取最好的一次：两边受到的机器波动相同
+            runs: dict[str, list[dict]] = {"base": [], "head": []}
+            for _ in range(repeats):
+                try:
+                    runs["base"].append(run_worker(content, base_root, rounds, max_seconds))
+                except WorkerError as e:
+                    # 旧提交没有 bench.routes，或者它的 worker 跟这里的参数、结果格式对不上
+                    skipped = e.reason()
+                    break
+                runs["head"].append(run_head(content, corpus, rounds, max_seconds))
+            if skipped:
+                head[corpus] = best_of(runs["head"]) if runs["head"] else run_head(content, corpus, rounds,
+                                                                                    max_seconds)
+                continue
+            base[corpus] = best_of(runs["base"])
+            head[corpus] = best_of(runs["head"])
+    if base_root is None or skipped:
+        return head, None, skipped
+    return head, base, None
+
+
+@contextmanager
+def worktree(ref: str):
+    """``ref`` checked out into a temporary git worktree (same content/, its own src/)."""
+    with tempfile.TemporaryDirectory(prefix="indiekit-base-") as tmp:
+        path = Path(tmp) / "tree"
+        subprocess.run(["git", "worktree", "add", "--detach", "--quiet", str(path), ref], cwd=ROOT, check=True)
+        try:
+            yield path
+        finally:
+            subprocess.run(["git", "worktree", "remove", "--force", str(path)], cwd=ROOT, check=False)
+
+
+def compare(current: dict, baseline: dict, metric: str, threshold: float, min_delta_ms: float) -> list[str]:
+    """Regressions of ``current`` against ``baseline``, as printable lines."""
+    key = f"{metric}_ms"
+    failures = []
+    for corpus, result in current["corpora"].items():
+        old_result = baseline["corpora"].get(corpus)
+        if old_result is None:
+            continue
+        old_routes = old_result["routes"]
+        for name, now in result["routes"].items():
+            old = old_routes.get(name)
+            if old is None:
+                continue
+            if now["status"] != old["status"]:
+                failures.append(f"{corpus:>8}  {name}: HTTP {old['status']} -> {now['status']}")
+                continue
+            expected = old[key]
+            if now[key] > expected * (1 + threshold / 100) and now[key] - expected > min_delta_ms:
+                failures.append(f"{corpus:>8}  {name}: {metric} {expected:.3f}ms -> {now[key]:.3f}ms "
+                                f"(+{(now[key] / expected - 1) * 100:.0f}%)")
+    return failures
+
+
+def report(results: dict) -> None:
+    for corpus, result in results["corpora"].items():
+        print(f"\n== {corpus}: {result['posts']} posts, {result['digests']} digests ({result['seconds']}s)")
+        print(f"{'route':<52} {'status':>6} {'req/s':>9} {'p50 ms':>9} {'p95 ms':>9} {'p99 ms':>9}")
+        for name, r in result["routes"].items():
+            print(f"{name:<52} {r['status']:>6} {r['rps']:>9.0f} {r['p50_ms']:>9.3f} {r['p95_ms']:>9.3f} "
+                  f"{r['p99_ms']:>9.3f}")
+        for note in result["skipped"]:
+            print(f"  skipped {note}")
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--corpus", action="append",
+                        help="'content' (the real tree) or a synthetic post count; repeatable (default: content, 1000)")
+    parser.add_argument("--rounds", type=int, default=200, help="requests per route and cache mode")
+    parser.add_argument("--max-seconds", type=float, default=2.0, help="time cap per route and cache mode")
+    parser.add_argument("--json", type=Path, help="write results here (use it to refresh the baseline)")
+    parser.add_argument("--against", metavar="REF", help="fail when a route regresses against this git ref, "
+                        "measured in the same run")
+    parser.add_argument("--repeats", type=int, default=2, help="alternating base/head runs with --against (default 2)")
+    parser.add_argument("--baseline", type=Path, help="fail when a route regresses against this results file "
+                        "(recorded on the same machine)")
+    parser.add_argument("--threshold", type=float, default=25.0, help="allowed slowdown in percent (default 25)")
+    parser.add_argument("--metric", choices=["p50", "p95", "p99"], default="p50")
+    parser.add_argument("--min-delta-ms", type=float, default=0.05, help="ignore slowdowns smaller than this")
+    parser.add_argument("--worker", type=Path, help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.worker:
+        # 被测的 src/ 与这个 bench/ 同属一棵树：--against 的 base 用的是它自己的 worker
+        sys.path.insert(0, str(ROOT))
+        args.worker.write_text(json.dumps(asyncio.run(measure(args.rounds, args.max_seconds))))
+        return 0
+    if args.against and args.baseline:
+        parser.error("--against and --baseline are mutually exclusive")
+
+    corpora = args.corpus or ["content", "1000"]
+    notice = None
+    if args.against:
+        with worktree(args.against) as base_root:
+            head, base, skipped = run_corpora(corpora, args.rounds, args.max_seconds, base_root, args.repeats)
+        reference = {"version": RESULTS_VERSION, "corpora": base} if base is not None else None
+        label = f"base {args.against}"
+        if skipped:
+            notice = f"{label} has no compatible bench.routes ({skipped}); skipping the comparison"
+    else:
+        head, _, _ = run_corpora(corpora, args.rounds, args.max_seconds, None, 1)
+        reference = json.loads(args.baseline.read_text()) if args.baseline else None
+        label = f"baseline {args.baseline}"
+    results = {
+        "version": RESULTS_VERSION,
+        "python": platform.python_version(),
+        "rounds": args.rounds,
+        "corpora": head,
+    }
+    report(results)
+    if args.json:
+        args.json.write_text(json.dumps(results, indent=1, ensure_ascii=False) + "\n")
+    if notice:
+        print(f"\n{notice}")
+
+    if reference is not None:
+        if reference.get("version") != RESULTS_VERSION:
+            raise SystemExit(f"{label}: results version {reference.get('version')}, expected {RESULTS_VERSION}")
+        failures = compare(results, reference, args.metric, args.threshold, args.min_delta_ms)
+        print(f"\n{label}: {len(failures)} regression(s) over {args.threshold:g}% ({args.metric})")
+        for line in failures:
+            print(f"  {line}")
+        return 1 if failures else 0
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
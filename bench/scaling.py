@@ -0,0 +1,225 @@
+"""
+Scaling report: startup, memory and route latency as the archive grows.
+
+For each size a synthetic corpus (``bench.corpus``) is written to a temp
+directory and a fresh interpreter is started with ``CONTENT_DIR`` pointing
+at it, so import time, the first content scan and the search index build
+(on the first search) are all measured from scratch. Latency is taken through the ASGI app
+(``httpx.ASGITransport``) for the archive-sized routes, with the response
+cache cold (cleared before every request) and hot. With ``--bundle`` each
+corpus is compiled first (``python -m src.main bundle``) and served from the
+memory-mapped bundle (``CONTENT_BUNDLE``) instead of being parsed.
+
+    python -m bench.scaling [--sizes 1000 10000 100000] [--rounds 50] [--bundle]
+                            [--markdown bench/scaling.md] [--json out.json]
+
+The Markdown output is meant to be committed and compared across releases.
+"""
+import argparse
+import asyncio
+import importlib
+import json
+import os
+import platform
+import resource
+import signal
+import subprocess
+import sys
+import tempfile
+import time
+import tomllib
+from datetime import date
+from pathlib import Path
+
+from bench.corpus import write_corpus
+from bench.routes import summarize, time_url
+
+ROOT = Path(__file__).parent.parent
+ROUTES = ["/blog", "/blog/{slug}", "/sitemap.xml", "/feed.xml", "/llms-full.txt"]
+
+
+def rss_mib() -> float:
+    """Current resident set size (Linux), falling back to the peak."""
+    try:
+        for line in Path("/proc/self/status").read_text().splitlines():
+            if line.startswith("VmRSS:"):
+                return int(line.split()[1]) / 1024
+    except OSError:
+        pass
+    return peak_rss_mib()
+
+
+def peak_rss_mib() -> float:
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux 以 KiB 计，macOS 以字节计
+    return peak / (1024 * 1024 if sys.platform == "darwin" else 1024)
+
+
+async def measure(out: Path, rounds: int, max_seconds: float) -> None:
+    """Startup, memory and latency for the corpus ``CONTENT_DIR`` points at (this process only).
+
+    每个阶段结束都把目前的结果写到 ``out``：进程被 OOM 杀掉时，报告仍然能给出
+    已测到的部分和死在哪个阶段。
+    """
+    import httpx
+
+    result: dict = {"rss_before_mib": round(rss_mib(), 1), "latency": {}}
+
+    def checkpoint(phase: str) -> None:
+        result["phase"] = phase
+        result["rss_peak_mib"] = round(peak_rss_mib(), 1)
+        out.write_text(json.dumps(result))
+
+    checkpoint("import")
+    t = time.perf_counter()
+    site = importlib.import_module("src.main")
+    result["import_s"] = round(time.perf_counter() - t, 3)
+
+    transport = httpx.ASGITransport(app=site.app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+        # 第一次请求触发内容扫描；搜索索引等到第一次搜索才在线程里建
+        checkpoint("first request")
+        t = time.perf_counter()
+        await client.get("/blog")
+        result["first_request_s"] = round(time.perf_counter() - t, 3)
+        result["rss_startup_mib"] = round(rss_mib(), 1)
+        checkpoint("first search")
+        t = time.perf_counter()
+        await client.get("/search", params={"q": "MCP"})
+        result["first_search_s"] = round(time.perf_counter() - t, 3)
+        result["search_index_mib"] = round(site.search_index.stats()["bytes"] / 1024 / 1024, 1)
+        posts = site.visible_posts()
+        result["posts"] = len(site.load_posts())
+        result["visible"] = len(posts)
+
+        post = sorted(posts, key=lambda p: len(site.posts_store.body(p)))[len(posts) // 2]
+        for route in ROUTES:
+            url = route.replace("{slug}", post.slug)
+            checkpoint(route)
+            await client.get(url)  # 预热 markdown 渲染缓存与生成结果
+            for mode in ("cold", "hot"):
+                samples: list[float] = []
+                status = await time_url(client, site, url, rounds, max_seconds, mode == "cold", samples)
+                result["latency"][f"{route} [{mode}]"] = summarize(samples, status)
+
+    result["rss_end_mib"] = round(rss_mib(), 1)
+    checkpoint("done")
+
+
+def run_size(posts: int, rounds: int, max_seconds: float, seed: int, bundle: bool = False) -> dict:
+    with tempfile.TemporaryDirectory(prefix="indiekit-scaling-") as tmp:
+        t = time.perf_counter()
+        content = write_corpus(Path(tmp) / "content", posts, digests=max(4, posts // 50), seed=seed)
+        generated = time.perf_counter() - t
+        corpus_bytes = sum(f.stat().st_size for f in (content / "blog").iterdir())
+        env = {**os.environ, "CONTENT_DIR": str(content)}
+        bundled = None
+        if bundle:
+            t = time.perf_counter()
+            env["CONTENT_BUNDLE"] = str(Path(tmp) / "content.bundle")
+            subprocess.run([sys.executable, "-m", "src.main", "bundle", env["CONTENT_BUNDLE"]], env=env, check=True)
+            bundled = time.perf_counter() - t
+        out = Path(tmp) / "result.json"
+        worker = subprocess.run([sys.executable, "-m", "bench.scaling", "--worker", str(out), "--rounds", str(rounds),
+                                 "--max-seconds", str(max_seconds)], env=env)
+        result = json.loads(out.read_text()) if out.exists() else {"phase": "start", "latency": {}}
+    if bundled is not None:
+        result["bundle_s"] = round(bundled, 1)
+    result.setdefault("posts", posts)
+    result["corpus_mib"] = round(corpus_bytes / 1024 / 1024, 1)
+    result["generate_s"] = round(generated, 1)
+    if worker.returncode:
+        how = signal.Signals(-worker.returncode).name if worker.returncode < 0 else f"exit {worker.returncode}"
+        result["error"] = f"worker died ({how}) during {result['phase']}"
+    return result
+
+
+def _release() -> str:
+    version = tomllib.loads((ROOT / "pyproject.toml").read_text())["project"]["version"]
+    try:
+        commit = subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=ROOT, capture_output=True, text=True,
+                                check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        commit = "unknown"
+    return f"{version} ({commit})"
+
+
+def _latency_cell(stats: dict | None) -> str:
+    return "—" if stats is None else f"{stats['p50_ms']:.2f} / {stats['p95_ms']:.2f}"
+
+
+def markdown(results: dict) -> str:
+    sizes = results["sizes"]
+    lines = [
+        f"# Scaling report — {results['release']}",
+        "",
+        f"{results['date']}, Python {results['python']}, {results['machine']}. "
+        f"Synthetic corpora from `bench.corpus` (seed {results['seed']}); "
+        "regenerate with `python -m bench.scaling --markdown bench/scaling.md`."
+        + (" Served from a compiled content bundle (`--bundle`)." if results.get("bundle") else ""),
+        "",
+        "## Startup and memory",
+        "",
+        "| posts | corpus MiB | import s | first `/blog` s | RSS after first request MiB | first `/search` s "
+        "| search index MiB | RSS at end MiB | peak RSS MiB |",
+        "|---:|---:|---:|---:|---:|---:|---:|---:|---:|",
+    ]
+    for r in sizes:
+        cells = [r.get(k, "—") for k in ("corpus_mib", "import_s", "first_request_s", "rss_startup_mib",
+                                          "first_search_s", "search_index_mib", "rss_end_mib", "rss_peak_mib")]
+        lines.append(f"| {r['posts']:,} | " + " | ".join(map(str, cells)) + " |")
+    for mode, note in (("cold", "response cache cleared before every request"),
+                       ("hot", "served from the response cache")):
+        lines += ["", f"## Latency p50 / p95 ms — {mode} ({note})", "",
+                  "| posts | " + " | ".join(f"`{route}`" for route in ROUTES) + " |",
+                  "|---:|" + "---:|" * len(ROUTES)]
+        for r in sizes:
+            cells = [_latency_cell(r["latency"].get(f"{route} [{mode}]")) for route in ROUTES]
+            lines.append(f"| {r['posts']:,} | " + " | ".join(cells) + " |")
+    failed = [r for r in sizes if "error" in r]
+    if failed:
+        lines += ["", "## Incomplete runs", ""]
+        lines += [f"- {r['posts']:,} posts: {r['error']}, peak RSS {r.get('rss_peak_mib', '—')} MiB "
+                  "at the last checkpoint" for r in failed]
+    return "\n".join(lines) + "\n"
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--sizes", type=int, nargs="+", default=[1000, 10000, 100000])
+    parser.add_argument("--rounds", type=int, default=50, help="requests per route and cache mode")
+    parser.add_argument("--max-seconds", type=float, default=3.0, help="time cap per route and cache mode")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--bundle", action="store_true", help="serve each corpus from a compiled content bundle")
+    parser.add_argument("--markdown", type=Path, help="write the report table here")
+    parser.add_argument("--json", type=Path, help="write raw results here")
+    parser.add_argument("--worker", type=Path, help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.worker:
+        asyncio.run(measure(args.worker, args.rounds, args.max_seconds))
+        return 0
+
+    results = {
+        "release": _release(),
+        "date": date.today().isoformat(),
+        "python": platform.python_version(),
+        "machine": f"{platform.system()} {platform.machine()}",
+        "seed": args.seed,
+        "bundle": args.bundle,
+        "sizes": [],
+    }
+    for posts in args.sizes:
+        print(f"{posts} posts …", file=sys.stderr, flush=True)
+        results["sizes"].append(run_size(posts, args.rounds, args.max_seconds, args.seed, args.bundle))
+    report = markdown(results)
+    print(report)
+    if args.markdown:
+        args.markdown.write_text(report)
+    if args.json:
+        args.json.write_text(json.dumps(results, indent=1) + "\n")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
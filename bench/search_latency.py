@@ -0,0 +1,98 @@
+"""
+Query latency of the app's search index over a synthetic corpus.
+
+Writes ``--posts`` posts with ``bench.corpus`` to a temp directory, points
+``CONTENT_DIR`` at it and imports ``src.main``, so the index measured is the
+one the app serves (``src.main.search_index``, built from the first content
+scan before the first search). A mix of Chinese, English and mixed queries is timed against the index
+alone and through ``search_posts`` (ranking plus snippets, what /search and
+/api/search return). Also checks that editing one post re-indexes only that
+post.
+
+    python -m bench.search_latency [--posts 3600] [--queries 2000] [--seed 0]
+"""
+import argparse
+import importlib
+import os
+import shutil
+import statistics
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+from bench.corpus import write_corpus
+
+QUERIES = ["MCP", "数据库", "fastapi 部署", "claude code", "独立开发者", "AI agent 工作流", "postgres", "免费 托管"]
+
+
+def percentiles(samples: list[float]) -> str:
+    samples = sorted(samples)
+
+    def ms(seconds: float) -> str:
+        return f"{seconds * 1000:.3f}ms"
+
+    return (f"p50 {ms(statistics.median(samples))}  p95 {ms(samples[int(len(samples) * 0.95)])}  "
+            f"p99 {ms(samples[int(len(samples) * 0.99)])}")
+
+
+def timed(query, queries: int) -> list[float]:
+    samples = []
+    for i in range(queries):
+        q = QUERIES[i % len(QUERIES)]
+        t = time.perf_counter()
+        query(q)
+        samples.append(time.perf_counter() - t)
+    return samples
+
+
+def run(directory: Path, queries: int) -> int:
+    os.environ["CONTENT_DIR"] = str(directory)
+    site = importlib.import_module("src.main")
+    started = time.perf_counter()
+    # 和 app 一样：扫描只把文章排进索引队列，flush 才建索引
+    site.posts_store.refresh(force=True)
+    scan = time.perf_counter() - started
+    site.search_index.flush()
+    build = time.perf_counter() - started - scan
+    index = site.search_index
+
+    bare = timed(lambda q: index.search(q, 10), queries)
+    served = timed(lambda q: site.search_posts(q, 10), queries // 10 or 1)
+
+    # 单篇变更：改一篇文章的文件，只重新索引这一篇
+    post = site.visible_posts()[0]
+    path = site.posts_store.directory / f"{post.slug}.md"
+    path.write_text(path.read_text(encoding="utf-8") + "\n\nincrementalmarker\n", encoding="utf-8")
+    t = time.perf_counter()
+    site.posts_store.update([path.name])
+    site.search_index.flush()
+    single = time.perf_counter() - t
+    ok = [r.slug for _, r in index.search("incrementalmarker")[1]] == [post.slug]
+
+    stats = index.stats()
+    print(f"{stats['documents']} docs, {stats['terms']} terms, {stats['bytes'] / 1024 / 1024:.1f} MiB, "
+          f"scanned in {scan:.2f}s, indexed in {build:.2f}s")
+    print(f"index.search  {percentiles(bare)}")
+    print(f"search_posts  {percentiles(served)}  (ranking + snippets)")
+    print(f"single-post update {single * 1000:.3f}ms, {'ok' if ok else 'FAILED'}")
+    return 0 if ok else 1
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--posts", type=int, default=3600)
+    parser.add_argument("--queries", type=int, default=2000)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    directory = Path(tempfile.mkdtemp(prefix="indiekit-search-"))
+    try:
+        write_corpus(directory, args.posts, seed=args.seed)
+        return run(directory, args.queries)
+    finally:
+        shutil.rmtree(directory)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
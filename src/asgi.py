@@ -0,0 +1,60 @@
+"""
+In-process ASGI requests: the static export and start-up warm-up call the app without a server.
+"""
+import asyncio
+
+# 进程内自发请求（导出、预热）在 scope 里带这个键：不进请求指标、慢请求日志和采样 profile
+INTERNAL = "indiekit.internal"
+
+
+async def asgi_get(app, route: str, headers: dict[str, str] | None = None,
+                   internal: bool = False) -> tuple[int, dict[str, str], bytes]:
+    """Issue a GET against an ASGI app in-process; returns (status, headers, body).
+
+    ``internal=True`` marks the request (``scope[INTERNAL]``) so request metrics,
+    the slow-request log and the sampling profiler skip it.
+    """
+    path, _, query = route.partition("?")
+    scope = {
+        "type": "http",
+        "asgi": {"version": "3.0"},
+        "http_version": "1.1",
+        "method": "GET",
+        "scheme": "https",
+        "path": path,
+        "raw_path": path.encode(),
+        "query_string": query.encode(),
+        "root_path": "",
+        "headers": [(b"host", b"localhost"), *((k.lower().encode(), v.encode()) for k, v in (headers or {}).items())],
+        "client": ("127.0.0.1", 0),
+        "server": ("localhost", 443),
+    }
+    if internal:
+        scope[INTERNAL] = True
+    status = 500
+    response_headers: dict[str, str] = {}
+    body = bytearray()
+    requested = False
+    done = asyncio.Event()
+
+    async def receive():
+        # 请求体只给一次；之后挂起直到响应发完，再报告断开（StreamingResponse 会一直监听断开）
+        nonlocal requested
+        if not requested:
+            requested = True
+            return {"type": "http.request", "body": b"", "more_body": False}
+        await done.wait()
+        return {"type": "http.disconnect"}
+
+    async def send(message):
+        nonlocal status
+        if message["type"] == "http.response.start":
+            status = message["status"]
+            response_headers.update((k.decode().lower(), v.decode()) for k, v in message.get("headers", []))
+        elif message["type"] == "http.response.body":
+            body.extend(message.get("body", b""))
+            if not message.get("more_body", False):
+                done.set()
+
+    await app(scope, receive, send)
+    return status, response_headers, bytes(body)
@@ -0,0 +1,396 @@
+"""
+Compiled content bundle: ``content/`` in one memory-mapped file.
+
+    python -m src.main bundle content.bundle [--workers N]
+
+The bundle holds, for every post and digest issue, the raw markdown file, the
+body (a slice of it) and the pre-rendered HTML, plus ``membership.md``, all
+addressed by byte offsets from small JSON tables. With ``CONTENT_BUNDLE``
+pointing at it the app maps it read-only instead of parsing ``content/``:
+every uvicorn worker shares the same pages through the OS page cache, and
+opening it costs a stat and an ``mmap`` whatever the size of the archive.
+
+Layout::
+
+    header   MAGIC, index offset, index length          (HEADER)
+    blobs    raw markdown / HTML of every record
+    tables   one JSON metadata table per section
+    index    JSON: format version, build time, markdown extensions,
+             section tables and single files (offset, length)
+
+The builder writes a temp file next to the target and ``os.replace``s it, so
+a running app sees either the old bundle or the new one, never a partial
+file. ``BundleSource`` notices the new inode on the next refresh, maps it and
+the stores swap their snapshot in one assignment; requests already holding
+the old map keep reading it until they finish.
+"""
+import argparse
+import dataclasses
+import json
+import logging
+import mmap
+import os
+import struct
+import sys
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor
+from datetime import date, datetime, timezone
+from pathlib import Path
+from typing import Iterable
+
+from .content import ContentFile, ContentStore, DigestIssue, Post, Record, Source, _content_digest
+
+logger = logging.getLogger(__name__)
+
+MAGIC = b"IKBUNDLE"
+VERSION = 1
+# magic、索引偏移、索引长度
+HEADER = struct.Struct("<8sQQ")
+RECORD_TYPES = {cls.__name__: cls for cls in (Record, Post, DigestIssue)}
+
+Span = tuple[int, int]  # (偏移, 长度)
+
+
+class ContentBundle:
+    """One bundle file mapped read-only; ``signature`` identifies the file it was opened from."""
+
+    def __init__(self, path: Path):
+        self.path = path
+        with path.open("rb") as f:
+            # 对打开的文件 fstat：签名与映射的内容一定对应，不会被中途替换的新文件混淆
+            st = os.fstat(f.fileno())
+            self.signature = (st.st_ino, st.st_mtime_ns, st.st_size)
+            self._map = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        if self._map.size() < HEADER.size:
+            raise ValueError(f"{path}: not a content bundle")
+        magic, offset, length = HEADER.unpack_from(self._map)
+        if magic != MAGIC:
+            raise ValueError(f"{path}: not a content bundle")
+        self.index = json.loads(self._map[offset:offset + length])
+        if self.index.get("version") != VERSION:
+            raise ValueError(f"{path}: bundle format {self.index.get('version')}, expected {VERSION}")
+
+    def blob(self, span: Span) -> bytes:
+        offset, length = span
+        return self._map[offset:offset + length]
+
+    def text(self, span: Span) -> str:
+        return self.blob(span).decode("utf-8")
+
+    def table(self, section: str) -> tuple[type[Record], list[dict]]:
+        """(record type, metadata rows) of a section; an empty list if the bundle doesn't have it."""
+        entry = self.index["sections"].get(section)
+        if entry is None:
+            return Record, []
+        return RECORD_TYPES[entry["type"]], json.loads(self.blob(entry["table"]))
+
+    def file(self, name: str) -> dict | None:
+        return self.index["files"].get(name)
+
+
+class BundleSource:
+    """The bundle at ``path``, reopened whenever a new file has been published there.
+
+    ``current()`` 每次只 stat 一下路径，调用方（各个 store）自己按 rescan_interval 节流。
+    新包打不开（损坏、格式版本不对）时记一次日志，继续用旧包。
+    """
+
+    def __init__(self, path: Path, extensions: list[str]):
+        self.path = path
+        self.extensions = list(extensions)
+        self._bundle: ContentBundle | None = None
+        self._failed: tuple[int, int, int] | None = None
+        self._lock = threading.Lock()
+
+    def current(self) -> ContentBundle | None:
+        try:
+            st = self.path.stat()
+        except FileNotFoundError:
+            return self._bundle
+        sig = (st.st_ino, st.st_mtime_ns, st.st_size)
+        bundle = self._bundle
+        if (bundle is not None and bundle.signature == sig) or sig == self._failed:
+            return bundle
+        with self._lock:
+            if self._bundle is not bundle:
+                return self._bundle
+            try:
+                bundle = ContentBundle(self.path)
+            except (OSError, ValueError, KeyError) as exc:
+                logger.error("content bundle %s unusable (%s), keeping the previous one", self.path, exc)
+                self._failed = sig
+                return self._bundle
+            if bundle.index["extensions"] != self.extensions:
+                logger.warning("content bundle %s was rendered with markdown extensions %s, not %s: "
+                               "ignoring its HTML", self.path, bundle.index["extensions"], self.extensions)
+            logger.info("content bundle %s loaded (built %s)", self.path, bundle.index["built"])
+            self._bundle = bundle
+            return bundle
+
+    def html_usable(self, bundle: ContentBundle) -> bool:
+        return bundle.index["extensions"] == self.extensions
+
+    def info(self) -> dict:
+        bundle = self._bundle
+        return {"path": str(self.path), "built": bundle.index["built"] if bundle else None}
+
+
+def _encode_record(record: Record) -> dict:
+    fields = {f.name: getattr(record, f.name) for f in dataclasses.fields(record)}
+    if fields.get("date"):
+        fields["date"] = fields["date"].isoformat()
+    return fields
+
+
+def _decode_record(cls: type[Record], fields: dict) -> Record:
+    values = dict(fields)
+    if values.get("date"):
+        values["date"] = date.fromisoformat(values["date"])
+    # 与 main._post_record 一样 intern：所有文章共享同一批标签、语言字符串
+    if "tags" in values:
+        values["tags"] = tuple(sys.intern(t) for t in values["tags"])
+    if "lang" in values:
+        values["lang"] = sys.intern(values["lang"])
+    return cls(**values)
+
+
+class BundleStore(ContentStore):
+    """A ``ContentStore`` over one section (``blog``, ``digest``) of a content bundle.
+
+    ``refresh()`` 只检查包文件是否换了：换了就读新包的元数据表，digest 没变的记录
+    沿用旧对象，变更监听器（搜索、标签、译文索引）只收到真正变化的记录。
+    正文与预渲染 HTML 每次直接从映射里切出来，不占 body 缓存。
+    """
+
+    def __init__(self, source: BundleSource, section: str, directory: Path, rescan_interval: float = 0.0):
+        # 记录从包里的元数据表直接解码，不经过 build（不解析 frontmatter）
+        super().__init__(directory, None, rescan_interval, body_cache_bytes=0)
+        self.source = source
+        self.section = section
+        # (包, slug -> (原文, 正文, HTML) 的位置)：整体替换，读者拿到的包和位置总是配套的
+        self._mapped: tuple[ContentBundle | None, dict[str, tuple[Span, Span, Span]]] = (None, {})
+
+    def update(self, names: Iterable[str] | None) -> bool:
+        return self.refresh(force=True)
+
+    def body(self, record: Record) -> str:
+        bundle, spans = self._mapped
+        entry = spans.get(record.slug)
+        return bundle.text(entry[1]) if entry else ""
+
+    def html(self, record: Record) -> str | None:
+        bundle, spans = self._mapped
+        entry = spans.get(record.slug)
+        if entry is None or not self.source.html_usable(bundle):
+            return None
+        return bundle.text(entry[2])
+
+    def raw(self, record: Record) -> bytes | None:
+        bundle, spans = self._mapped
+        entry = spans.get(record.slug)
+        return bundle.blob(entry[0]) if entry else None
+
+    def _rescan(self) -> bool:
+        bundle = self.source.current()
+        if bundle is self._mapped[0]:
+            return False
+        cls, rows = bundle.table(self.section) if bundle is not None else (Record, [])
+        previous = self._entries
+        entries = {}
+        spans = {}
+        for row in rows:
+            name = row["name"]
+            sig = (row["mtime_ns"], row["size"])
+            cached = previous.get(name)
+            if cached is None or cached[0] != sig or cached[2].digest != row["record"]["digest"]:
+                record = _decode_record(cls, row["record"])
+                cached = (sig, Source(self.directory / name, record.digest, record.mtime, row["offset"]), record)
+            entries[name] = cached
+            spans[cached[2].slug] = (tuple(row["raw"]), tuple(row["body"]), tuple(row["html"]))
+        # 先换映射再发布：监听器读正文时已经是新包
+        self._mapped = (bundle, spans)
+        changed = entries.keys() != previous.keys() or any(previous[n] is not e for n, e in entries.items())
+        if changed:
+            self._publish(entries)
+        return changed
+
+
+class BundleFile(ContentFile):
+    """A ``ContentFile`` (``membership.md``) served from a content bundle."""
+
+    def __init__(self, source: BundleSource, name: str, path: Path, rescan_interval: float = 0.0):
+        super().__init__(path, lambda text: text, rescan_interval)
+        self.source = source
+        self.name = name
+        self._bundle: ContentBundle | None = None
+        self._html: str | None = None
+
+    def refresh(self, force: bool = False) -> bool:
+        now = time.monotonic()
+        if not force and self._last_scan is not None and (
+                self.watched or now - self._last_scan < self.rescan_interval):
+            return False
+        with self._lock:
+            self._last_scan = now
+            bundle = self.source.current()
+            if bundle is self._bundle:
+                return False
+            self._bundle = bundle
+            entry = bundle.file(self.name) if bundle is not None else None
+            if entry is None:
+                value = html = None
+                etag, last_modified = _content_digest(b""), 0.0
+            else:
+                value = bundle.text(entry["value"])
+                html = bundle.text(entry["html"]) if self.source.html_usable(bundle) else None
+                etag, last_modified = entry["digest"], entry["mtime_ns"] / 1e9
+            self._value, self._html = value, html
+            if etag == self.etag and last_modified == self.last_modified:
+                # 新包里这个文件没变：页面缓存照旧有效
+                return False
+            self.etag, self.last_modified = etag, last_modified
+            self.generation += 1
+            return True
+
+    def html(self) -> str | None:
+        self.refresh()
+        return self._html
+
+
+# ---- 构建 ----
+
+# 构建时每批渲染的记录数：正文和 HTML 只在内存里留一批
+BATCH = 1024
+
+_worker_renderer = None
+
+
+def _init_worker(extensions: list[str]) -> None:
+    global _worker_renderer
+    from .render import MarkdownRenderer
+    _worker_renderer = MarkdownRenderer(extensions, cache_bytes=0, max_workers=1)
+
+
+def _convert(text: str) -> str:
+    return _worker_renderer.convert(text)
+
+
+class _Renderer:
+    """Markdown → HTML for the builder: in this process, or a process pool when ``workers`` > 1."""
+
+    def __init__(self, extensions: list[str], workers: int):
+        self.pool = None
+        if workers > 1:
+            self.pool = ProcessPoolExecutor(workers, initializer=_init_worker, initargs=(extensions,))
+        else:
+            _init_worker(extensions)
+
+    def render(self, texts: list[str]) -> list[str]:
+        if self.pool is None:
+            return [_convert(text) for text in texts]
+        return list(self.pool.map(_convert, texts, chunksize=32))
+
+    def close(self) -> None:
+        if self.pool is not None:
+            self.pool.shutdown()
+
+
+class _Writer:
+    def __init__(self, f):
+        self.f = f
+
+    def write(self, data: bytes) -> Span:
+        offset = self.f.tell()
+        self.f.write(data)
+        return offset, len(data)
+
+
+def _body_span(raw: bytes, offset: int, body: str) -> Span | None:
+    """Where ``body`` (``raw[offset:]`` decoded and stripped) sits inside ``raw``, or None if it isn't a slice."""
+    tail = raw[offset:].decode("utf-8")
+    start = offset + len(tail[:len(tail) - len(tail.lstrip())].encode())
+    data = body.encode()
+    return (start, len(data)) if raw[start:start + len(data)] == data else None
+
+
+def _write_section(out: _Writer, store: ContentStore, renderer: _Renderer) -> tuple[str, list[dict]]:
+    store.refresh(force=True)
+    records = store.items()
+    entries = {entry[2].slug: entry for entry in store._entries.values()}
+    rows = []
+    for start in range(0, len(records), BATCH):
+        batch = records[start:start + BATCH]
+        bodies = [store.body(r) for r in batch]
+        for record, body, html in zip(batch, bodies, renderer.render(bodies)):
+            sig, source, _ = entries[record.slug]
+            raw = source.path.read_bytes()
+            if _content_digest(raw) != record.digest:
+                raise RuntimeError(f"{source.path} changed while bundling, run again")
+            raw_span = out.write(raw)
+            # 正文通常就是原文的一段，只记位置；frontmatter 解析异常的文件单独存一份
+            body_span = _body_span(raw, source.offset, body)
+            body_span = (raw_span[0] + body_span[0], body_span[1]) if body_span else out.write(body.encode())
+            rows.append({"name": source.path.name, "mtime_ns": sig[0], "size": sig[1], "offset": source.offset,
+                         "raw": raw_span, "body": body_span, "html": out.write(html.encode()),
+                         "record": _encode_record(record)})
+    return type(records[0]).__name__ if records else Record.__name__, rows
+
+
+def build_bundle(out: Path, stores: dict[str, ContentStore], files: dict[str, ContentFile],
+                 extensions: list[str], workers: int = 1) -> dict:
+    """Compile ``stores`` and ``files`` into a bundle at ``out`` (atomically replaced); returns the index."""
+    index = {"version": VERSION, "built": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+             "extensions": list(extensions), "sections": {}, "files": {}}
+    tmp = out.with_name(f".{out.name}.{os.getpid()}.tmp")
+    renderer = _Renderer(extensions, workers)
+    try:
+        with tmp.open("wb") as f:
+            w = _Writer(f)
+            f.write(HEADER.pack(MAGIC, 0, 0))
+            for section, store in stores.items():
+                kind, rows = _write_section(w, store, renderer)
+                table = w.write(json.dumps(rows, ensure_ascii=False, separators=(",", ":")).encode())
+                index["sections"][section] = {"type": kind, "table": table, "count": len(rows)}
+            for name, page in files.items():
+                page.refresh(force=True)
+                value = page.get()
+                if value is None:
+                    continue
+                sig = os.stat(page.path)
+                html, = renderer.render([value])
+                index["files"][name] = {"digest": page.etag, "mtime_ns": sig.st_mtime_ns,
+                                        "raw": w.write(page.path.read_bytes()), "value": w.write(value.encode()),
+                                        "html": w.write(html.encode())}
+            span = w.write(json.dumps(index, ensure_ascii=False).encode())
+            f.seek(0)
+            f.write(HEADER.pack(MAGIC, *span))
+            f.flush()
+            os.fsync(f.fileno())
+        # 原子替换：正在运行的 app 要么看到旧包，要么看到完整的新包
+        os.replace(tmp, out)
+    finally:
+        renderer.close()
+        tmp.unlink(missing_ok=True)
+    return index
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(prog="python -m src.main bundle",
+                                     description="Compile content/ into one memory-mapped bundle.")
+    parser.add_argument("out", type=Path, help="bundle file to write (replaced atomically)")
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1, help="markdown render processes")
+    args = parser.parse_args(argv)
+
+    from . import main as site
+
+    # 总是从 content/ 目录构建，即使当前环境设置了 CONTENT_BUNDLE
+    stores = {"blog": ContentStore(site.CONTENT_DIR / "blog", site._post_record),
+              "digest": ContentStore(site.CONTENT_DIR / "digest", site._digest_record)}
+    files = {"membership.md": ContentFile(site.CONTENT_DIR / "membership.md", site._membership_body)}
+    started = time.perf_counter()
+    index = build_bundle(args.out, stores, files, site.MARKDOWN_EXTENSIONS, args.workers)
+    counts = ", ".join(f"{entry['count']} {name}" for name, entry in index["sections"].items())
+    print(f"bundled {counts}, {len(index['files'])} files into {args.out} "
+          f"({args.out.stat().st_size / 1024 / 1024:.1f} MiB) in {time.perf_counter() - started:.1f}s")
+    return 0
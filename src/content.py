@@ -0,0 +1,499 @@
+"""
+Long-lived content index for markdown directories (blog posts, digest issues).
+"""
+import hashlib
+import os
+import re
+import threading
+import time
+from dataclasses import dataclass
+from datetime import date
+from pathlib import Path
+from typing import Callable, Iterable, NamedTuple
+
+import frontmatter
+
+from .cache import LRUCache
+from .metrics import phase
+
+# 与 python-frontmatter 的 YAMLHandler 相同的分隔行
+_BOUNDARY = re.compile(rb"^-{3,}\s*$")
+
+
+class Source(NamedTuple):
+    """Where a record came from: file path, content hash, mtime (epoch seconds) and body offset."""
+    path: Path
+    digest: str
+    mtime: float
+    offset: int = 0
+
+
+@dataclass(slots=True, frozen=True)
+class Record:
+    """Frontmatter of one markdown file plus its source digest/mtime; the body comes from ``ContentStore.body``."""
+    slug: str
+    title: str
+    date: date | None
+    description: str
+    hidden: bool
+    digest: str
+    mtime: float
+
+    @property
+    def iso_date(self) -> str:
+        return self.date.isoformat() if self.date else ""
+
+
+@dataclass(slots=True, frozen=True)
+class Post(Record):
+    """A blog post. ``tags`` and ``lang`` are interned: a handful of distinct values shared by every post."""
+    tags: tuple[str, ...]
+    lang: str
+    translation_of: str | None
+
+
+@dataclass(slots=True, frozen=True)
+class DigestIssue(Record):
+    """A weekly digest issue."""
+
+
+def _content_digest(data: bytes) -> str:
+    return hashlib.sha1(data).hexdigest()
+
+
+def _scan_header(path: Path) -> tuple[bytes, int, str]:
+    """(frontmatter block, byte offset of the body, sha1 of the whole file) without keeping the body.
+
+    只按行读到第二条 ``---`` 为止；正文部分只流过哈希，不留在内存里。
+    没有 frontmatter 时返回空块、偏移 0。
+    """
+    h = hashlib.sha1()
+    header = b""
+    offset = 0
+    with path.open("rb") as f:
+        lines = []
+        line = f.readline()
+        # frontmatter.parse 先 strip 全文：开头的空行不影响识别
+        while line and not line.strip():
+            lines.append(line)
+            line = f.readline()
+        lines.append(line)
+        if _BOUNDARY.match(line):
+            while line := f.readline():
+                lines.append(line)
+                if _BOUNDARY.match(line):
+                    header = b"".join(lines)
+                    offset = len(header)
+                    break
+        h.update(b"".join(lines))
+        while chunk := f.read(1 << 16):
+            h.update(chunk)
+    return header, offset, h.hexdigest()
+
+
+def _position_after(names: list[str], index: dict[str, int], slug: str) -> int:
+    """Index of the first entry after ``slug`` in a filename-descending list.
+
+    已删除或已隐藏的 slug 也能定位：按文件名在降序列表里二分查找。
+    """
+    position = index.get(slug)
+    if position is not None:
+        return position + 1
+    name = f"{slug}.md"
+    lo, hi = 0, len(names)
+    while lo < hi:
+        mid = (lo + hi) // 2
+        if names[mid] > name:
+            lo = mid + 1
+        else:
+            hi = mid
+    return lo
+
+
+def _stat_signature(path: Path) -> tuple[int, int] | None:
+    try:
+        st = path.stat()
+    except FileNotFoundError:
+        return None
+    if not path.is_file():
+        return None
+    return (st.st_mtime_ns, st.st_size)
+
+
+# listener(changed, removed)：新增/变更后的记录，与被替换/删除的旧记录
+ChangeListener = Callable[[list[Record], list[Record]], object]
+
+
+class ContentStore:
+    """In-memory index over ``directory/*.md``.
+
+    每个文件只解析一次：``refresh()`` 重新 stat 目录，只重新解析 mtime/size 变化的文件，
+    并处理新增和删除。重扫最多每 ``rescan_interval`` 秒一次，其余请求直接读内存快照。
+    有文件监听时（``watched = True``）请求路径完全不扫描，由监听器调用 ``update()``。
+
+    索引里只有 frontmatter（``build`` 拿到的 ``Post.content`` 为空）；正文由 ``body()``
+    按需读取，放在 ``body_cache_bytes`` 大小的 LRU 里，常驻内存不随文章总量增长。
+    """
+
+    def __init__(self, directory: Path, build: Callable[[Source, frontmatter.Post], Record],
+                 rescan_interval: float = 0.0, body_cache_bytes: int = 8 * 1024 * 1024):
+        self.directory = directory
+        self.build = build
+        self.rescan_interval = rescan_interval
+        self.bodies = LRUCache(body_cache_bytes)
+        self.watched = False
+        self.generation = 0
+        # 整个目录的内容指纹与最新 mtime，用作列表类页面的 ETag / Last-Modified
+        self.etag = _content_digest(b"")
+        self.last_modified = 0.0
+        # filename -> ((mtime_ns, size), source, record)
+        self._entries: dict[str, tuple[tuple[int, int], Source, Record]] = {}
+        self._items: list[Record] = []
+        self._visible: list[Record] = []
+        self._visible_names: list[str] = []
+        self._visible_index: dict[str, int] = {}
+        self._by_slug: dict[str, Record] = {}
+        self._sources: dict[str, Source] = {}
+        self._last_scan: float | None = None
+        self._lock = threading.Lock()
+        self._listeners: list[ChangeListener] = []
+        # 正在（持锁）通知监听器的线程
+        self._publishing: int | None = None
+
+    def subscribe(self, listener: ChangeListener) -> None:
+        """Call ``listener(changed, removed)`` after every index change (derived indexes hook in here).
+
+        首次订阅时当前全部记录作为 ``changed`` 补发一次。
+        """
+        with self._lock:
+            self._listeners.append(listener)
+            if self._items:
+                self._notify(listener, list(self._items), [])
+
+    def refresh(self, force: bool = False) -> bool:
+        """Pick up changed, added and removed files. Returns True if the index changed."""
+        now = time.monotonic()
+        if not force and self._last_scan is not None and (
+                self.watched or now - self._last_scan < self.rescan_interval):
+            return False
+        with self._lock, phase("parse"):
+            self._last_scan = now
+            return self._rescan()
+
+    def update(self, names: Iterable[str] | None) -> bool:
+        """Re-check only the given filenames (watcher hook); ``None`` rescans the whole directory.
+
+        Returns True if the index changed.
+        """
+        if names is None:
+            return self.refresh(force=True)
+        with self._lock:
+            if self._last_scan is None:
+                self._last_scan = time.monotonic()
+                return self._rescan()
+            entries = dict(self._entries)
+            changed = False
+            for name in names:
+                if not name.endswith(".md"):
+                    continue
+                path = self.directory / name
+                sig = _stat_signature(path)
+                if sig is None:
+                    changed |= entries.pop(name, None) is not None
+                    continue
+                cached = entries.get(name)
+                if cached is not None and cached[0] == sig:
+                    continue
+                entries[name] = self._load(path, sig)
+                changed = True
+            if changed:
+                self._publish(entries)
+            return changed
+
+    def items(self) -> list[Record]:
+        """All records, newest filename first (includes hidden)."""
+        self.refresh()
+        return self._items
+
+    def visible(self) -> list[Record]:
+        """Records without ``hidden: true``."""
+        self.refresh()
+        return self._visible
+
+    def get(self, slug: str) -> Record | None:
+        """O(1) lookup by slug, hidden records included.
+
+        未知 slug 直接查字典返回 None，不 stat 也不解析，扫描器的 404 探测几乎零成本；
+        新文件由其他路由的 ``refresh()`` 收录。
+        """
+        if slug not in self._by_slug and self._last_scan is not None:
+            return None
+        self.refresh()
+        return self._by_slug.get(slug)
+
+    def body(self, record: Record) -> str:
+        """Markdown body of a record (frontmatter stripped), read from disk on a cache miss.
+
+        按 (路径, 内容 hash) 缓存。返回的正文总是和 store 当前快照的 digest 一致：
+        文件在上次扫描后又改过时先 ``update()`` 这个文件，再按新快照读正文。
+        变更监听器在发布快照时持有锁、不能重扫，此时返回空串（文件已变，下一次扫描
+        会重新发布这条记录）。
+        """
+        for _ in range(2):
+            source = self._sources.get(record.slug)
+            if source is None:
+                return ""
+            key = (source.path, source.digest)
+            if (cached := self.bodies.get(key)) is not None:
+                return cached
+            with phase("parse"):
+                try:
+                    data = source.path.read_bytes()
+                except FileNotFoundError:
+                    data = None
+                if data is not None and _content_digest(data) == source.digest:
+                    text = data[source.offset:].decode("utf-8").strip()
+                    self.bodies.put(key, text)
+                    return text
+            if self._publishing == threading.get_ident():
+                break
+            self.update([source.path.name])
+        return ""
+
+    def html(self, record: Record) -> str | None:
+        """Pre-rendered HTML of the body, if the store has it (only content bundles do)."""
+        return None
+
+    def raw(self, record: Record) -> bytes | None:
+        """Source file bytes when the source isn't a plain file under ``directory`` (bundles), else None."""
+        return None
+
+    def visible_after(self, slug: str) -> int:
+        """Index in ``visible()`` of the first record after ``slug`` (cursor pagination)."""
+        return _position_after(self._visible_names, self._visible_index, slug)
+
+    def _stat_files(self) -> dict[str, tuple[int, int]]:
+        stats = {}
+        if not self.directory.is_dir():
+            return stats
+        with os.scandir(self.directory) as it:
+            for entry in it:
+                if entry.name.endswith(".md") and entry.is_file():
+                    st = entry.stat()
+                    stats[entry.name] = (st.st_mtime_ns, st.st_size)
+        return stats
+
+    def _rescan(self) -> bool:
+        stats = self._stat_files()
+        entries = {}
+        changed = stats.keys() != self._entries.keys()
+        for name, sig in stats.items():
+            cached = self._entries.get(name)
+            if cached is not None and cached[0] == sig:
+                entries[name] = cached
+                continue
+            entries[name] = self._load(self.directory / name, sig)
+            changed = True
+
+        if changed:
+            self._publish(entries)
+        return changed
+
+    def _load(self, path: Path, sig: tuple[int, int]) -> tuple[tuple[int, int], Source, Record]:
+        header, offset, digest = _scan_header(path)
+        source = Source(path, digest, sig[0] / 1e9, offset)
+        return sig, source, self.build(source, frontmatter.loads(header.decode("utf-8")))
+
+    def _publish(self, entries: dict[str, tuple[tuple[int, int], Source, Record]]) -> None:
+        # 整体替换列表而不是原地修改，读者拿到的快照始终一致
+        previous = self._entries
+        names = sorted(entries, reverse=True)
+        items = [entries[name][2] for name in names]
+        self.etag = _content_digest("\n".join(f"{n}:{entries[n][1].digest}" for n in names).encode())
+        self.last_modified = max((entries[n][0][0] / 1e9 for n in names), default=0.0)
+        self._entries = entries
+        self._items = items
+        visible_names = [n for n in names if not entries[n][2].hidden]
+        self._visible = [entries[n][2] for n in visible_names]
+        self._visible_names = visible_names
+        self._visible_index = {r.slug: i for i, r in enumerate(self._visible)}
+        self._by_slug = {r.slug: r for r in items}
+        self._sources = {entries[n][2].slug: entries[n][1] for n in names}
+        self.generation += 1
+        if self._listeners:
+            changed = [e[2] for n, e in entries.items() if previous.get(n) is not e]
+            removed = [e[2] for n, e in previous.items() if entries.get(n) is not e]
+            for listener in self._listeners:
+                self._notify(listener, changed, removed)
+
+    def _notify(self, listener: ChangeListener, changed: list[Record], removed: list[Record]) -> None:
+        self._publishing = threading.get_ident()
+        try:
+            listener(changed, removed)
+        finally:
+            self._publishing = None
+
+
+class TagIndex:
+    """Visible records of a ``ContentStore`` grouped by a list field (``tags``).
+
+    每次内容变更时整体重建一次（订阅 store 的变更通知），请求路径上只有字典查找。
+    标签按 casefold 归一：``AI`` 和 ``ai`` 是同一个标签，显示名取最常用的写法。
+    """
+
+    def __init__(self, store: ContentStore, field: str = "tags"):
+        self.field = field
+        self.generation = 0
+        # key -> (显示名, 记录列表（新→旧）, 文件名列表, slug -> 位置)
+        self._groups: dict[str, tuple[str, list[Record], list[str], dict[str, int]]] = {}
+        self._counts: list[tuple[str, int]] = []
+        self._store = store
+        store.subscribe(self._rebuild)
+
+    @staticmethod
+    def key(tag: str) -> str:
+        return tag.strip().casefold()
+
+    def _rebuild(self, changed: list[Record], removed: list[Record]) -> None:
+        # 在 store 的锁内被调用：直接读刚发布的快照，不能再调 visible()
+        members: dict[str, list[Record]] = {}
+        spellings: dict[str, dict[str, int]] = {}
+        for record in self._store._visible:
+            values = getattr(record, self.field, None) or []
+            if isinstance(values, str):
+                values = [values]
+            seen = set()
+            for value in values:
+                tag = str(value).strip()
+                key = self.key(tag)
+                if not key or key in seen:
+                    continue
+                seen.add(key)
+                members.setdefault(key, []).append(record)
+                names = spellings.setdefault(key, {})
+                names[tag] = names.get(tag, 0) + 1
+
+        groups = {}
+        for key, records in members.items():
+            # 最常用的写法；一样多时取先出现（更新的文章）的
+            name = max(spellings[key].items(), key=lambda kv: kv[1])[0]
+            groups[key] = (name, records, [f"{r.slug}.md" for r in records],
+                           {r.slug: i for i, r in enumerate(records)})
+        self._groups = groups
+        self._counts = sorted(((g[0], len(g[1])) for g in groups.values()), key=lambda kv: (-kv[1], kv[0].casefold()))
+        self.generation += 1
+
+    def get(self, tag: str) -> tuple[str, list[Record]] | None:
+        """(display name, records newest first) for a tag, or None."""
+        self._store.refresh()
+        group = self._groups.get(self.key(tag))
+        return (group[0], group[1]) if group else None
+
+    def counts(self) -> list[tuple[str, int]]:
+        """(display name, number of records) for every tag, most used first."""
+        self._store.refresh()
+        return self._counts
+
+    def after(self, tag: str, slug: str) -> int:
+        """Index in ``get(tag)`` records of the first record after ``slug`` (cursor pagination)."""
+        group = self._groups.get(self.key(tag))
+        return _position_after(group[2], group[3], slug) if group else 0
+
+
+class TranslationIndex:
+    """Translation groups: the same article in several languages.
+
+    一篇文章的译文通过后缀约定（``foo`` / ``foo-en`` / ``foo-zh``）或 frontmatter 的
+    ``translation_of: <slug>`` 归到同一组；组在内容变更时整体重建，包含隐藏文章
+    （隐藏文章仍可直接访问，互相之间的 hreflang 照常输出）。
+    """
+
+    SUFFIXES = ("-en", "-zh")
+
+    def __init__(self, store: ContentStore):
+        self.generation = 0
+        # slug -> 所在组（原文在前，其余按 slug 排序）；没有译文的文章不在表里
+        self._groups: dict[str, list[Record]] = {}
+        self._store = store
+        store.subscribe(self._rebuild)
+
+    def _root(self, slug: str, by_slug: dict[str, Record]) -> str:
+        seen = set()
+        while slug not in seen:
+            seen.add(slug)
+            target = str(getattr(by_slug[slug], "translation_of", None) or "").removesuffix(".md")
+            if target in by_slug and target != slug:
+                slug = target
+            elif slug.endswith(self.SUFFIXES) and slug[:-3] in by_slug:
+                slug = slug[:-3]
+            else:
+                break
+        return slug
+
+    def _rebuild(self, changed: list[Record], removed: list[Record]) -> None:
+        by_slug = self._store._by_slug
+        members: dict[str, list[Record]] = {}
+        for slug in sorted(by_slug):
+            members.setdefault(self._root(slug, by_slug), []).append(by_slug[slug])
+        groups = {}
+        for root, records in members.items():
+            if len(records) < 2:
+                continue
+            group = sorted(records, key=lambda r: (r.slug != root, r.slug))
+            for record in group:
+                groups[record.slug] = group
+        self._groups = groups
+        self.generation += 1
+
+    def group(self, slug: str) -> list[Record]:
+        """All versions of ``slug`` (itself included), original first; [] if it has no translations."""
+        return self._groups.get(slug, [])
+
+
+class ContentFile:
+    """A single content page (e.g. membership.md), re-read only when it changes."""
+
+    def __init__(self, path: Path, build: Callable[[str], str], rescan_interval: float = 0.0):
+        self.path = path
+        self.build = build
+        self.rescan_interval = rescan_interval
+        self.watched = False
+        self.generation = 0
+        self.etag = _content_digest(b"")
+        self.last_modified = 0.0
+        self._sig: tuple[int, int] | None = None
+        self._value: str | None = None
+        self._last_scan: float | None = None
+        self._lock = threading.Lock()
+
+    def refresh(self, force: bool = False) -> bool:
+        now = time.monotonic()
+        if not force and self._last_scan is not None and (
+                self.watched or now - self._last_scan < self.rescan_interval):
+            return False
+        with self._lock:
+            self._last_scan = now
+            sig = _stat_signature(self.path)
+            if sig == self._sig:
+                return False
+            if sig is None:
+                self._value = None
+                self.etag = _content_digest(b"")
+                self.last_modified = 0.0
+            else:
+                data = self.path.read_bytes()
+                self._value = self.build(data.decode("utf-8"))
+                self.etag = _content_digest(data)
+                self.last_modified = sig[0] / 1e9
+            self._sig = sig
+            self.generation += 1
+            return True
+
+    def get(self) -> str | None:
+        """Built page content, or None if the file does not exist."""
+        self.refresh()
+        return self._value
+
+    def html(self) -> str | None:
+        """Pre-rendered HTML of the page, if available (only from content bundles)."""
+        return None
@@ -0,0 +1,217 @@
+"""
+Static site export: pre-render every route to files nginx / Cloudflare can serve.
+
+    python -m src.main export out/ [--workers N] [--full]
+
+Pages are rendered by the real FastAPI handlers (in-process ASGI calls) in a
+process pool. HTML routes become ``<route>/index.html``, JSON APIs become
+``<route>/index.json`` and routes with an extension (``sitemap.xml``,
+``llms.txt`` …) keep their name, so nginx can use::
+
+    location / {
+        error_page 418 = @app;
+        if ($args) { return 418; }
+        try_files $uri $uri/index.html $uri/index.json @app;
+    }
+
+``try_files`` ignores the query string, so requests that carry one
+(``/blog?limit=50``, ``/api/blog?cursor=…``, ``/search?q=…``) must skip the
+files and go straight to the app. List pages use path-based pagination
+(``/blog/page/2``, ``/blog/tag/<tag>/page/2``) and every page is exported.
+
+``out/.export-manifest.json`` records a source hash per route; later runs only
+re-render routes whose sources (post files, corpus, code) changed and delete
+outputs for routes that no longer exist.
+"""
+import argparse
+import asyncio
+import hashlib
+import json
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+
+from .asgi import asgi_get
+
+MANIFEST_NAME = ".export-manifest.json"
+MANIFEST_VERSION = 1
+
+SRC_DIR = Path(__file__).parent
+
+# 不依赖内容、只随代码变化的路由
+STATIC_ROUTES = ["/tools", "/mcp", "/about", "/robots.txt", "/api/tools", "/.well-known/ai-plugin.json"]
+# 依赖整个博客语料（列表、feed、全文）的路由
+CORPUS_ROUTES = ["/", "/blog", "/sitemap.xml", "/feed.xml", "/rss.xml", "/llms.txt", "/llms-full.txt", "/api/blog",
+                 "/api/tags"]
+
+
+def _sha256(data: bytes) -> str:
+    return hashlib.sha256(data).hexdigest()
+
+
+def _file_hash(path: Path) -> str:
+    try:
+        return _sha256(path.read_bytes())
+    except FileNotFoundError:
+        return "missing"
+
+
+def _dir_hashes(directory: Path) -> dict[str, str]:
+    if not directory.is_dir():
+        return {}
+    return {f.stem: _file_hash(f) for f in sorted(directory.glob("*.md"))}
+
+
+def _combine(*parts: object) -> str:
+    return _sha256(json.dumps(parts, sort_keys=True, default=str).encode())
+
+
+def output_path(route: str, content_type: str) -> str:
+    """Relative output file for a route."""
+    name = route.strip("/")
+    if not name:
+        return "index.html"
+    if Path(name).suffix:
+        return name
+    if content_type.startswith("application/json"):
+        return f"{name}/index.json"
+    return f"{name}/index.html"
+
+
+def export_routes() -> dict[str, str]:
+    """Every exportable route mapped to a hash of the sources it is rendered from."""
+    from . import main
+
+    code = _combine(sorted((p.name, _file_hash(p)) for p in SRC_DIR.glob("*.py")),
+                    sorted((p.name, _file_hash(p)) for p in (SRC_DIR / "templates").glob("*.html")), main.SITE_URL)
+    posts = _dir_hashes(main.posts_store.directory)
+    digests = _dir_hashes(main.digests_store.directory)
+    corpus = _combine(posts)
+
+    routes = {r: code for r in STATIC_ROUTES}
+    routes.update({r: _combine(code, corpus) for r in CORPUS_ROUTES})
+    routes["/digest"] = _combine(code, digests)
+    routes["/membership"] = _combine(code, _file_hash(main.membership_page.path))
+    routes["/api"] = _combine(code, _file_hash(main.API_DOCS_FILE))
+
+    for post in main.load_posts():
+        slug = post.slug
+        # hreflang / 语言切换 / alternates 取决于同组译文
+        versions = [(v.slug, posts[v.slug]) for v in main.post_alternates(post)]
+        routes[f"/blog/{slug}"] = _combine(code, posts[slug], versions)
+        routes[f"/api/blog/{slug}"] = _combine(code, posts[slug], versions)
+        # 原始 markdown 与代码无关，只随文件本身变化
+        routes[f"/blog/{slug}.md"] = posts[slug]
+    # 列表的第 2 页起：/blog/page/N、/blog/tag/<tag>/page/N
+    for page in range(2, main.page_count(len(main.visible_posts())) + 1):
+        routes[f"/blog/page/{page}"] = _combine(code, corpus)
+    for name, count in main.tag_index.counts():
+        # 文件名用解码后的标签，nginx 的 $uri 也是解码后的
+        routes[f"/blog/tag/{name}"] = _combine(code, corpus)
+        for page in range(2, main.page_count(count) + 1):
+            routes[f"/blog/tag/{name}/page/{page}"] = _combine(code, corpus)
+    for issue in main.load_digests():
+        routes[f"/digest/{issue.slug}"] = _combine(code, digests[issue.slug])
+        routes[f"/digest/{issue.slug}.md"] = digests[issue.slug]
+
+    # sitemap 也收录周刊；URL 超过上限时拆成 index + /sitemap-N.xml
+    sitemap = _combine(code, corpus, digests)
+    routes["/sitemap.xml"] = sitemap
+    for n in range(1, len(main.sitemaps())):
+        routes[f"/sitemap-{n}.xml"] = sitemap
+    return routes
+
+
+def _write_atomic(path: Path, data: bytes) -> None:
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp = path.with_name(f".{path.name}.tmp")
+    tmp.write_bytes(data)
+    os.replace(tmp, path)
+
+
+def _render_batch(routes: list[str], out_dir: str) -> list[tuple[str, int, str | None]]:
+    """Worker: render routes and write them to disk. Returns (route, status, relpath)."""
+    from .main import app
+
+    async def run():
+        results = []
+        for route in routes:
+            status, headers, body = await asgi_get(app, route, internal=True)
+            if status != 200:
+                results.append((route, status, None))
+                continue
+            rel = output_path(route, headers.get("content-type", ""))
+            _write_atomic(Path(out_dir) / rel, body)
+            results.append((route, status, rel))
+        return results
+
+    return asyncio.run(run())
+
+
+def _load_manifest(out_dir: Path) -> dict:
+    try:
+        manifest = json.loads((out_dir / MANIFEST_NAME).read_text())
+    except (FileNotFoundError, json.JSONDecodeError):
+        return {}
+    if manifest.get("version") != MANIFEST_VERSION:
+        return {}
+    return manifest.get("routes", {})
+
+
+def export(out_dir: Path, workers: int | None = None, full: bool = False) -> dict:
+    """Export the site into ``out_dir``; returns counts of rendered/unchanged/removed/failed routes."""
+    started = time.perf_counter()
+    out_dir.mkdir(parents=True, exist_ok=True)
+    previous = {} if full else _load_manifest(out_dir)
+    routes = export_routes()
+
+    todo = [r for r, source in routes.items()
+            if previous.get(r, {}).get("source") != source
+            or not (out_dir / previous[r]["path"]).exists()]
+    manifest = {r: previous[r] for r in routes if r in previous and r not in todo}
+
+    workers = max(1, workers or os.cpu_count() or 1)
+    # 每个进程多分几批，慢页面不至于拖住整个池
+    size = max(1, len(todo) // (workers * 4) or 1)
+    batches = [todo[i:i + size] for i in range(0, len(todo), size)]
+    failed = []
+    if batches:
+        with ProcessPoolExecutor(max_workers=min(workers, len(batches))) as pool:
+            for results in pool.map(_render_batch, batches, [str(out_dir)] * len(batches)):
+                for route, status, rel in results:
+                    if rel is None:
+                        failed.append((route, status))
+                        if route in previous:
+                            (out_dir / previous[route]["path"]).unlink(missing_ok=True)
+                    else:
+                        manifest[route] = {"path": rel, "source": routes[route]}
+
+    removed = [r for r in previous if r not in routes]
+    for route in removed:
+        (out_dir / previous[route]["path"]).unlink(missing_ok=True)
+
+    _write_atomic(out_dir / MANIFEST_NAME,
+                  json.dumps({"version": MANIFEST_VERSION, "routes": manifest}, indent=1, sort_keys=True).encode())
+    return {
+        "rendered": len(todo) - len(failed),
+        "unchanged": len(routes) - len(todo),
+        "removed": len(removed),
+        "failed": failed,
+        "seconds": round(time.perf_counter() - started, 3),
+    }
+
+
+def main(argv: list[str] | None = None) -> int:
+    parser = argparse.ArgumentParser(prog="python -m src.main export", description="Pre-render every route to disk.")
+    parser.add_argument("out_dir", type=Path)
+    parser.add_argument("--workers", type=int, default=None, help="process pool size (default: CPU count)")
+    parser.add_argument("--full", action="store_true", help="ignore the manifest and re-render everything")
+    args = parser.parse_args(argv)
+
+    result = export(args.out_dir, args.workers, args.full)
+    print(f"rendered {result['rendered']}, unchanged {result['unchanged']}, "
+          f"removed {result['removed']} in {result['seconds']}s")
+    for route, status in result["failed"]:
+        print(f"  skipped {route} (HTTP {status})")
+    return 0
@@ -0,0 +1,89 @@
+"""
+Page layout: Jinja2 templates in src/templates, compiled once at startup.
+"""
+import re
+from functools import lru_cache
+from pathlib import Path
+
+from jinja2 import Environment, FileSystemLoader, select_autoescape
+from markupsafe import Markup, escape
+
+from .metrics import phase
+
+TEMPLATES_DIR = Path(__file__).parent / "templates"
+
+# shell.html 里正文的占位，渲染一次后按它切成前后两段
+_CONTENT_MARKER = Markup("<!--content-->")
+
+# head.html 里随页面变化的变量；启动时用占位渲染一次，按占位切成静态段和槽位
+HEAD_SLOTS = ("lang", "title", "description", "canonical", "og_type", "article_meta", "extra_head")
+_SLOT = re.compile(r"\x00(\w+)\x00")
+# 填好的 <head> 按参数缓存的条数（每个页面一条，约 1.5 KB）
+HEAD_CACHE_SIZE = 4096
+
+
+class Layout:
+    """Renders page bodies and wraps them in the site shell.
+
+    模板在启动时编译（``auto_reload=False``，之后不再 stat 模板文件）。
+    外壳里与页面无关的部分（样式、导航、统计脚本、页脚）只在这里渲染一次，
+    ``<head>`` 也在启动时渲染成静态段和 ``HEAD_SLOTS`` 槽位，每个页面只转义
+    几个值再拼接，不再走模板；填好的结果按参数缓存（``typed``，Markup 与同文本
+    的 str 不共用一条）。
+    """
+
+    def __init__(self, directory: Path = TEMPLATES_DIR, **globals: object):
+        self.env = Environment(
+            loader=FileSystemLoader(directory),
+            autoescape=select_autoescape(["html"]),
+            trim_blocks=True,
+            lstrip_blocks=True,
+            keep_trailing_newline=True,
+            auto_reload=False,
+        )
+        self.env.globals.update(globals)
+        head = self.env.get_template("head.html").render({name: Markup(f"\x00{name}\x00") for name in HEAD_SLOTS})
+        parts = _SLOT.split(head)
+        self._head_text, self._head_slots = parts[::2], parts[1::2]
+        self._head = lru_cache(maxsize=HEAD_CACHE_SIZE, typed=True)(self._fill_head)
+        shell = self.env.get_template("shell.html").render(content=_CONTENT_MARKER)
+        self.prefix, marker, self.suffix = shell.partition(_CONTENT_MARKER)
+        if not marker:
+            raise ValueError("shell.html must output {{ content }} exactly once")
+
+    def render(self, name: str, **context: object) -> str:
+        """A page body (or any fragment) from ``templates/<name>``."""
+        with phase("assemble"):
+            return self.env.get_template(name).render(context)
+
+    def page(self, content: str, *, title: str, description: str = "", canonical: str = "", lang: str = "zh-CN",
+             og_type: str = "website", extra_head: str = "", article_date: str = "", article_tags: list = None) -> str:
+        """The full HTML document for an already rendered body."""
+        with phase("assemble"):
+            head = self._head(title, description, canonical, lang, og_type, extra_head, article_date,
+                              tuple(article_tags) if article_tags else ())
+            return "".join((head, self.prefix, content, self.suffix))
+
+    def _fill_head(self, title: str, description: str, canonical: str, lang: str, og_type: str,
+                   extra_head: str, article_date: str, article_tags: tuple) -> str:
+        site = self.env.globals
+        article_meta = ""
+        if og_type == "article":
+            # 文章专属 article:* meta
+            if article_date:
+                article_meta += f'    <meta property="article:published_time" content="{escape(article_date)}">\n'
+            for tag in article_tags:
+                article_meta += f'    <meta property="article:tag" content="{escape(tag)}">\n'
+        values = {
+            "lang": escape(lang),
+            "title": escape(title),
+            "description": escape(description or site["site_desc"]),
+            "canonical": escape(canonical or site["site_url"]),
+            "og_type": escape(og_type),
+            "article_meta": article_meta,
+            "extra_head": escape(extra_head),
+        }
+        out = [self._head_text[0]]
+        for name, text in zip(self._head_slots, self._head_text[1:]):
+            out += (values[name], text)
+        return "".join(out)
@@ -1,26 +1,118 @@
 """
 IndieKit Site - Blog + Tools for indie hackers
 """
+import time
+
+# 模块导入耗时（启动日志、/ready 里报告）从这里开始算
+_IMPORT_STARTED = time.perf_counter()
+
+import asyncio
+import base64
+import binascii
+import hashlib
+import hmac
+import logging
 import os
+import sys
+import tempfile
+from contextlib import asynccontextmanager
+from functools import lru_cache
 from pathlib import Path
-from datetime import datetime
+from datetime import date, datetime, timezone
+from typing import TYPE_CHECKING, Iterator
 
-from fastapi import FastAPI, Request, HTTPException
+from fastapi import FastAPI, Request, HTTPException, Query
 from fastapi.responses import HTMLResponse
 from fastapi.staticfiles import StaticFiles
 from dotenv import load_dotenv
 import frontmatter
-import markdown
+from markupsafe import Markup, escape
 
 import json
+from urllib.parse import quote
+from xml.sax.saxutils import escape as xml_escape
+
+from .bundle import BundleFile, BundleSource, BundleStore
+from .content import ContentFile, ContentStore, DigestIssue, Post, Record, Source, TagIndex, TranslationIndex
+from .layout import TEMPLATES_DIR, Layout
+from .metrics import Metrics, SlowRequestLog, TimingMiddleware, phase
+from .profiling import FORMATS as PROFILE_FORMATS, ProfileRing, ProfilingMiddleware
+from .render import MARKDOWN_EXTENSIONS, MarkdownRenderer
+from .responses import ResponseCache, Validators
+from .search import Highlighter, SearchIndex
+
+if TYPE_CHECKING:
+    from .watcher import ContentWatcher
 
 load_dotenv()
 
-CONTENT_DIR = Path(__file__).parent.parent / "content"
+# 跟 uvicorn 的启动日志走同一个 handler
+logger = logging.getLogger("uvicorn.error")
+
+# 内容根目录（blog/、digest/、membership.md）；基准测试指向临时生成的语料
+CONTENT_DIR = Path(os.getenv("CONTENT_DIR", Path(__file__).parent.parent / "content"))
+# 编译好的内容包（python -m src.main bundle）：设置后各 worker 只读映射这个文件，不再解析 CONTENT_DIR；
+# 包文件被替换时按 CONTENT_RESCAN_INTERVAL 发现并切换
+CONTENT_BUNDLE = os.getenv("CONTENT_BUNDLE", "")
 STATIC_DIR = Path(__file__).parent.parent / "static"
+API_DOCS_FILE = Path("/root/source/side-projects/API.md")
 SITE_URL = os.getenv("SITE_URL", "https://indiekit.ai")
 SITE_NAME = "IndieKit"
 SITE_DESC = "独立开发者的 AI 工具包 | Resources for Indie Hackers"
+# 内容目录重新 stat 的最小间隔（秒），期间请求直接读内存索引
+CONTENT_RESCAN_INTERVAL = float(os.getenv("CONTENT_RESCAN_INTERVAL", "2.0"))
+# 渲染结果缓存的内存预算（字节）
+RENDER_CACHE_BYTES = int(os.getenv("RENDER_CACHE_BYTES", str(32 * 1024 * 1024)))
+# 文章正文（markdown 原文）缓存的内存预算：列表类路由只用元数据，正文按需从磁盘读
+BODY_CACHE_BYTES = int(os.getenv("BODY_CACHE_BYTES", str(8 * 1024 * 1024)))
+# markdown 转换线程池大小
+RENDER_WORKERS = int(os.getenv("RENDER_WORKERS", "4"))
+# 内容文件监听：off（默认，按请求节流重扫）/ auto / inotify / poll
+CONTENT_WATCH = os.getenv("CONTENT_WATCH", "off")
+# 响应缓存（原文 + gzip/br 压缩版本）的内存预算与压缩参数
+RESPONSE_CACHE_BYTES = int(os.getenv("RESPONSE_CACHE_BYTES", str(64 * 1024 * 1024)))
+GZIP_LEVEL = int(os.getenv("GZIP_LEVEL", "6"))
+BROTLI_QUALITY = int(os.getenv("BROTLI_QUALITY", "6"))
+COMPRESS_MIN_SIZE = int(os.getenv("COMPRESS_MIN_SIZE", "1024"))
+# 搜索：每次最多返回的结果数
+SEARCH_LIMIT_MAX = 50
+# 分页：/blog 每页文章数，/api/blog 默认与最大 limit
+BLOG_PAGE_SIZE = int(os.getenv("BLOG_PAGE_SIZE", "20"))
+API_PAGE_SIZE = int(os.getenv("API_PAGE_SIZE", "100"))
+API_PAGE_SIZE_MAX = 500
+# 每个响应带 Server-Timing 头（各阶段耗时）：on / off
+SERVER_TIMING = os.getenv("SERVER_TIMING", "on")
+# Prometheus /metrics：off（默认，不记录、端点 404）/ on
+METRICS = os.getenv("METRICS", "off")
+# 启动预热：加载内容并预渲染首页、博客列表和最新 WARMUP_POSTS 篇文章，完成前 /ready 返回 503
+WARMUP = os.getenv("WARMUP", "on")
+WARMUP_POSTS = int(os.getenv("WARMUP_POSTS", "10"))
+# 慢请求日志：超过阈值（毫秒，0 关闭）的请求各写一行 JSON 日志，最近 SLOW_REQUEST_LOG_SIZE 条
+# 可在 /admin/slow-requests 查看（需 Authorization: Bearer <ADMIN_TOKEN>，未设置则 404）
+SLOW_REQUEST_MS = float(os.getenv("SLOW_REQUEST_MS", "500"))
+SLOW_REQUEST_LOG_SIZE = int(os.getenv("SLOW_REQUEST_LOG_SIZE", "100"))
+ADMIN_TOKEN = os.getenv("ADMIN_TOKEN", "")
+# 采样 profiler：带 X-Profile: <PROFILE_TOKEN> 的请求返回该请求的 profile（未设置则关闭）；
+# PROFILE_SAMPLE_EVERY=N 时每 N 个请求采一次，写进 PROFILE_DIR 里最新 PROFILE_KEEP 个文件的环
+PROFILE_TOKEN = os.getenv("PROFILE_TOKEN", "")
+PROFILE_SAMPLE_EVERY = int(os.getenv("PROFILE_SAMPLE_EVERY", "0"))
+PROFILE_DIR = Path(os.getenv("PROFILE_DIR", Path(tempfile.gettempdir()) / "indiekit-profiles"))
+PROFILE_KEEP = int(os.getenv("PROFILE_KEEP", "100"))
+PROFILE_INTERVAL_MS = float(os.getenv("PROFILE_INTERVAL_MS", "1"))
+PROFILE_FORMAT = os.getenv("PROFILE_FORMAT", "speedscope")
+
+
+
+def _build_id() -> tuple[str, float]:
+    """Fingerprint and newest mtime of the app code and templates; part of every ETag so deploys invalidate caches."""
+    files = sorted(Path(__file__).parent.glob("*.py")) + sorted(TEMPLATES_DIR.glob("*.html"))
+    h = hashlib.sha1(SITE_URL.encode())
+    for f in files:
+        h.update(f.read_bytes())
+    return h.hexdigest()[:12], max(f.stat().st_mtime for f in files)
+
+
+BUILD_ID, BUILD_MTIME = _build_id()
 
 # Tools data for API and llms.txt
 TOOLS_DATA = [
@@ -37,205 +129,250 @@ TOOLS_DATA = [
     {"name": "claude-orchestrator", "github": "indiekitai/claude-orchestrator", "description": "Claude Code workflow harness inspired by codex-orchestrator. Uses serial planning, worktree isolation, anti-shallow-slice checks, quality gates, and reviewer-owned merge discipline for terminal-first Claude Code projects.", "category": "AI Orchestration"},
 ]
 
-app = FastAPI(title=SITE_NAME)
+
+# 启动状态：/ready 在预热完成前返回 503，负载均衡不会把请求发给冷 worker
+startup: dict[str, object] = {"ready": False, "import_ms": None, "warmup_ms": None, "warmed_routes": 0}
+
+
+def _load_content() -> None:
+    # 首次扫描：解析 frontmatter，建标签、译文和搜索索引
+    posts_store.refresh()
+    search_index.flush()
+    digests_store.refresh()
+    membership_page.refresh()
+
+
+async def warm_up() -> None:
+    """Load content and pre-render the pages a cold worker would otherwise render on its first hits."""
+    from .asgi import asgi_get
+
+    started = time.perf_counter()
+    try:
+        # 扫描是同步的 CPU 活：放进线程，预热期间 /health、/ready 照常响应
+        await asyncio.to_thread(_load_content)
+        loaded = time.perf_counter() - started
+        routes = ["/", "/blog"] + [f"/blog/{p.slug}" for p in visible_posts()[:WARMUP_POSTS]]
+        for route in routes:
+            # 带上浏览器常见的 Accept-Encoding，压缩版本也进响应缓存；标成内部请求，不进指标和慢请求日志
+            await asgi_get(app, route, {"accept-encoding": "br, gzip"}, internal=True)
+        startup["warmed_routes"] = len(routes)
+        logger.info("warm-up: content loaded in %.0f ms, %d pages pre-rendered in %.0f ms",
+                    loaded * 1000, len(routes), (time.perf_counter() - started - loaded) * 1000)
+    except Exception:
+        # 预热失败不该让 worker 永远不接流量：记下来，照常就绪，按需渲染
+        logger.exception("warm-up failed")
+    startup["warmup_ms"] = round((time.perf_counter() - started) * 1000, 1)
+    startup["ready"] = True
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    logger.info("app imported in %.0f ms", startup["import_ms"])
+    # 内容包模式只看包文件本身（按间隔 stat），不监听 content/
+    watcher = start_content_watcher(CONTENT_WATCH) if CONTENT_WATCH != "off" and not CONTENT_BUNDLE else None
+    warming = asyncio.create_task(warm_up()) if WARMUP == "on" else None
+    if warming is None:
+        startup["ready"] = True
+    yield
+    if warming is not None:
+        warming.cancel()
+    if watcher is not None:
+        watcher.stop()
+        for store in (posts_store, digests_store, membership_page):
+            store.watched = False
+
+
+app = FastAPI(title=SITE_NAME, lifespan=lifespan)
+
+# 请求计时：全都关时不装中间件，phase() 退化成一次 ContextVar 查询
+metrics = Metrics() if METRICS == "on" else None
+slow_requests = SlowRequestLog(SLOW_REQUEST_MS / 1000, SLOW_REQUEST_LOG_SIZE) if SLOW_REQUEST_MS > 0 else None
+if metrics is not None or slow_requests is not None or SERVER_TIMING == "on":
+    app.add_middleware(TimingMiddleware, metrics=metrics, server_timing=SERVER_TIMING == "on",
+                       slow_log=slow_requests)
+if PROFILE_TOKEN or PROFILE_SAMPLE_EVERY > 0:
+    if PROFILE_FORMAT not in PROFILE_FORMATS:
+        raise ValueError(f"PROFILE_FORMAT must be one of {', '.join(PROFILE_FORMATS)}, not {PROFILE_FORMAT!r}")
+    app.add_middleware(ProfilingMiddleware, ring=ProfileRing(PROFILE_DIR, PROFILE_KEEP), token=PROFILE_TOKEN,
+                       sample_every=PROFILE_SAMPLE_EVERY, interval=PROFILE_INTERVAL_MS / 1000, fmt=PROFILE_FORMAT)
 
 # 挂载静态资源（og-cover.png 等社交分享图）
 STATIC_DIR.mkdir(exist_ok=True)
 app.mount("/static", StaticFiles(directory=str(STATIC_DIR)), name="static")
 
-# Markdown processor
-md = markdown.Markdown(extensions=['fenced_code', 'tables', 'toc'])
+# Markdown processor（按内容 hash 缓存渲染结果，转换在线程池里执行）
+renderer = MarkdownRenderer(MARKDOWN_EXTENSIONS, RENDER_CACHE_BYTES, RENDER_WORKERS)
+# 可缓存路由的响应字节（按 URL + ETag，压缩版本只压一次）
+response_cache = ResponseCache(RESPONSE_CACHE_BYTES, GZIP_LEVEL, BROTLI_QUALITY, COMPRESS_MIN_SIZE)
+# 页面模板（启动时编译，外壳的静态部分只渲染一次）
+layout = Layout(site_name=SITE_NAME, site_url=SITE_URL, site_desc=SITE_DESC)
+
+
+def normalize_lang(lang) -> str:
+    """Frontmatter ``lang`` as a BCP 47 tag (``zh`` → ``zh-CN``)."""
+    lang = str(lang or "zh-CN")
+    return "zh-CN" if lang == "zh" else lang
+
+
+def as_date(value) -> date | None:
+    """Frontmatter date (YAML date, datetime or ``YYYY-MM-DD…`` string) as a date, else None."""
+    if isinstance(value, datetime):
+        return value.date()
+    if isinstance(value, date):
+        return value
+    if isinstance(value, str):
+        try:
+            return date.fromisoformat(value.strip()[:10])
+        except ValueError:
+            return None
+    return None
+
+
+def _frontmatter_text(post: frontmatter.Post, key: str, default: str = "") -> str:
+    value = post.get(key)
+    return default if value is None else str(value)
+
+
+def _post_record(source: Source, post: frontmatter.Post) -> Post:
+    path = source.path
+    tags = post.get("tags") or ()
+    if isinstance(tags, str):
+        tags = (tags,)
+    translation_of = post.get("translation_of")
+    return Post(
+        slug=path.stem,
+        title=_frontmatter_text(post, "title", path.stem),
+        date=as_date(post.get("date")),
+        description=_frontmatter_text(post, "description"),
+        hidden=bool(post.get("hidden", False)),
+        digest=source.digest,
+        mtime=source.mtime,
+        # 标签和语言只有少数几种取值：intern 后所有文章共享同一个字符串对象
+        tags=tuple(sys.intern(str(t)) for t in tags),
+        lang=sys.intern(normalize_lang(post.get("lang"))),
+        translation_of=None if translation_of is None else str(translation_of),
+    )
 
 
-def load_posts() -> list[dict]:
-    """Load all blog posts from content/blog/"""
-    posts = []
-    blog_dir = CONTENT_DIR / "blog"
-    
-    if not blog_dir.exists():
-        return posts
-    
-    for f in sorted(blog_dir.glob("*.md"), reverse=True):
-        post = frontmatter.load(f)
-        posts.append({
-            "slug": f.stem,
-            "title": post.get("title", f.stem),
-            "date": post.get("date", ""),
-            "description": post.get("description", ""),
-            "tags": post.get("tags", []),
-            "lang": post.get("lang", "zh-CN"),
-            "hidden": bool(post.get("hidden", False)),
-            "content": post.content,
-        })
-    
-    return posts
+def _digest_record(source: Source, issue: frontmatter.Post) -> DigestIssue:
+    path = source.path
+    return DigestIssue(
+        slug=path.stem,
+        title=_frontmatter_text(issue, "title", path.stem),
+        date=as_date(issue.get("date")),
+        description=_frontmatter_text(issue, "description"),
+        hidden=bool(issue.get("hidden", False)),
+        digest=source.digest,
+        mtime=source.mtime,
+    )
 
 
-def visible_posts() -> list[dict]:
+def _membership_body(content_raw: str) -> str:
+    # 解析 frontmatter
+    if content_raw.startswith('---'):
+        parts = content_raw.split('---', 2)
+        if len(parts) >= 3:
+            return parts[2].strip()
+    return content_raw
+
+
+# 常驻内容索引：文件只在变更时重新解析；有内容包时从包里读
+if CONTENT_BUNDLE:
+    bundle_source = BundleSource(Path(CONTENT_BUNDLE), MARKDOWN_EXTENSIONS)
+    if not bundle_source.path.is_file():
+        logger.warning("CONTENT_BUNDLE %s does not exist yet: serving no content until it appears", CONTENT_BUNDLE)
+    posts_store = BundleStore(bundle_source, "blog", CONTENT_DIR / "blog", CONTENT_RESCAN_INTERVAL)
+    digests_store = BundleStore(bundle_source, "digest", CONTENT_DIR / "digest", CONTENT_RESCAN_INTERVAL)
+    membership_page = BundleFile(bundle_source, "membership.md", CONTENT_DIR / "membership.md",
+                                 CONTENT_RESCAN_INTERVAL)
+else:
+    bundle_source = None
+    posts_store = ContentStore(CONTENT_DIR / "blog", _post_record, CONTENT_RESCAN_INTERVAL, BODY_CACHE_BYTES)
+    digests_store = ContentStore(CONTENT_DIR / "digest", _digest_record, CONTENT_RESCAN_INTERVAL, BODY_CACHE_BYTES)
+    membership_page = ContentFile(CONTENT_DIR / "membership.md", _membership_body, CONTENT_RESCAN_INTERVAL)
+api_docs_page = ContentFile(API_DOCS_FILE, lambda text: text, CONTENT_RESCAN_INTERVAL)
+# 全文检索：posts_store 的变更先排队，搜索前（或预热时）在线程里建索引
+search_index = SearchIndex(body=posts_store.body)
+posts_store.subscribe(search_index.update)
+# 标签 → 文章：同样在内容变更时重建
+tag_index = TagIndex(posts_store)
+# 译文分组（hreflang / 语言切换）
+translations = TranslationIndex(posts_store)
+
+LANG_NAMES = {"zh-CN": "中文", "en": "English"}
+
+
+def post_alternates(post: Post) -> list[Post]:
+    """Language versions of a post including itself, one per language, original first."""
+    taken = {post.lang}
+    versions = []
+    for record in translations.group(post.slug):
+        if record is post:
+            versions.append(record)
+        elif record.lang not in taken:
+            taken.add(record.lang)
+            versions.append(record)
+    return versions
+
+
+def start_content_watcher(mode: str) -> "ContentWatcher":
+    """Watch content/ and apply changes to the in-process stores as they happen."""
+    # ctypes / inotify 只在开启监听时才需要
+    from .watcher import ContentWatcher
+
+    def on_content_dir(names):
+        if names is None or "membership.md" in names:
+            membership_page.refresh(force=True)
+
+    watcher = ContentWatcher({
+        posts_store.directory: posts_store.update,
+        digests_store.directory: digests_store.update,
+        membership_page.path.parent: on_content_dir,
+    }).start(mode)
+    # 先挂监听再全量加载，避免漏掉中间的变更；之后请求路径不再 stat
+    for store in (posts_store, digests_store, membership_page):
+        store.refresh(force=True)
+        store.watched = True
+    return watcher
+
+
+def load_posts() -> list[Post]:
+    """All blog posts from content/blog/, newest first (served from posts_store)."""
+    return posts_store.items()
+
+
+def visible_posts() -> list[Post]:
     """Posts that should appear in public indexes and feeds."""
-    return [p for p in load_posts() if not p.get("hidden")]
+    return posts_store.visible()
+
+
+def static_validators() -> Validators:
+    """Validators for pages that only change when the code does."""
+    return Validators(BUILD_ID, last_modified=BUILD_MTIME)
+
+
+def corpus_validators(*extra: object) -> Validators:
+    """Validators for pages built from the whole blog corpus (lists, feeds, full text)."""
+    posts_store.refresh()
+    return Validators(BUILD_ID, posts_store.etag, *extra,
+                      last_modified=max(BUILD_MTIME, posts_store.last_modified))
 
 
 def render_html(title: str, content: str, description: str = "", canonical: str = "", lang: str = "zh-CN",
                 og_type: str = "website", extra_head: str = "", article_date: str = "", article_tags: list = None) -> str:
     """Render HTML page with SEO meta tags."""
-    # 文章专属 article:* meta（仅 og_type=article 时输出）
-    _article_meta = ""
-    if og_type == "article":
-        if article_date:
-            _article_meta += f'    <meta property="article:published_time" content="{article_date}">\n'
-        for _tag in (article_tags or []):
-            _article_meta += f'    <meta property="article:tag" content="{_tag}">\n'
-
-    return f'''<!DOCTYPE html>
-<html lang="{lang}">
-<head>
-    <meta charset="utf-8">
-    <meta name="viewport" content="width=device-width, initial-scale=1">
-    <title>{title} | {SITE_NAME}</title>
-    <meta name="description" content="{description or SITE_DESC}">
-    <link rel="canonical" href="{canonical or SITE_URL}">
-    <link rel="alternate" type="application/rss+xml" title="{SITE_NAME} RSS" href="{SITE_URL}/feed.xml">
-
-    <!-- Open Graph -->
-    <meta property="og:title" content="{title}">
-    <meta property="og:description" content="{description or SITE_DESC}">
-    <meta property="og:type" content="{og_type}">
-    <meta property="og:url" content="{canonical or SITE_URL}">
-    <meta property="og:image" content="{SITE_URL}/static/og-cover.png">
-    <meta property="og:image:alt" content="{title} | {SITE_NAME}">
-{_article_meta}
-    <!-- Twitter -->
-    <meta name="twitter:card" content="summary_large_image">
-    <meta name="twitter:title" content="{title}">
-    <meta name="twitter:description" content="{description or SITE_DESC}">
-    <meta name="twitter:image" content="{SITE_URL}/static/og-cover.png">
-
-{extra_head}    <!-- Google Analytics -->
-    <script async src="https://www.googletagmanager.com/gtag/js?id=G-1QHNTKJ27T"></script>
-    <script>
-        window.dataLayer = window.dataLayer || [];
-        function gtag(){{dataLayer.push(arguments);}}
-        gtag('js', new Date());
-        gtag('config', 'G-1QHNTKJ27T');
-    </script>
-    
-    <!-- Syntax Highlighting -->
-    <link rel="stylesheet" href="https://cdnjs.cloudflare.com/ajax/libs/highlight.js/11.9.0/styles/atom-one-dark.min.css">
-    <script src="https://cdnjs.cloudflare.com/ajax/libs/highlight.js/11.9.0/highlight.min.js"></script>
-    
-    <style>
-        * {{ box-sizing: border-box; }}
-        body {{
-            font-family: -apple-system, BlinkMacSystemFont, 'Segoe UI', Roboto, sans-serif;
-            line-height: 1.6;
-            color: #333;
-            max-width: 800px;
-            margin: 0 auto;
-            padding: 20px;
-            background: #fafafa;
-        }}
-        header {{
-            border-bottom: 1px solid #eee;
-            padding-bottom: 20px;
-            margin-bottom: 30px;
-        }}
-        header h1 {{ margin: 0; }}
-        header h1 a {{ color: #333; text-decoration: none; }}
-        header nav {{ margin-top: 10px; }}
-        header nav a {{ margin-right: 15px; color: #666; text-decoration: none; }}
-        header nav a:hover {{ color: #000; }}
-        article {{ background: #fff; padding: 30px; border-radius: 8px; box-shadow: 0 1px 3px rgba(0,0,0,0.1); margin-bottom: 20px; }}
-        article h1 {{ margin-top: 0; }}
-        article .meta {{ color: #666; font-size: 0.9em; margin-bottom: 20px; }}
-        article a {{ color: #0066cc; }}
-        pre {{ background: #2d2d2d; color: #ccc; padding: 15px; border-radius: 5px; overflow-x: auto; }}
-        code {{ background: #eee; padding: 2px 5px; border-radius: 3px; font-size: 0.9em; }}
-        pre code {{ background: none; padding: 0; }}
-        .post-list {{ list-style: none; padding: 0; }}
-        .post-list li {{ margin-bottom: 20px; padding-bottom: 20px; border-bottom: 1px solid #eee; }}
-        .post-list h2 {{ margin: 0 0 5px; }}
-        .post-list h2 a {{ color: #333; text-decoration: none; }}
-        .post-list h2 a:hover {{ color: #0066cc; }}
-        .post-list .meta {{ color: #666; font-size: 0.9em; }}
-        .tools {{ display: grid; grid-template-columns: repeat(auto-fit, minmax(250px, 1fr)); gap: 15px; margin: 20px 0; }}
-        .tool {{ background: #fff; padding: 20px; border-radius: 8px; box-shadow: 0 1px 3px rgba(0,0,0,0.1); }}
-        .tool h3 {{ margin: 0 0 10px; }}
-        .tool a {{ color: #0066cc; text-decoration: none; }}
-        .tool-stats {{ font-size: 0.85em; color: #666; margin: 10px 0; }}
-        .tool-link {{ display: inline-block; margin-top: 5px; font-weight: 500; }}
-        .tool:hover {{ box-shadow: 0 2px 8px rgba(0,0,0,0.15); transition: box-shadow 0.2s; }}
-        .share-buttons {{ margin-top: 30px; padding-top: 20px; border-top: 1px solid #eee; color: #666; }}
-        .share-buttons a {{ margin-left: 10px; color: #0066cc; text-decoration: none; }}
-        .share-buttons a:hover {{ text-decoration: underline; }}
-        /* Article typography */
-        article p {{ margin: 1.2em 0; line-height: 1.8; }}
-        article h2 {{ margin-top: 2em; margin-bottom: 0.8em; padding-bottom: 0.3em; border-bottom: 1px solid #eee; }}
-        article h3 {{ margin-top: 1.6em; margin-bottom: 0.6em; }}
-        article h4 {{ margin-top: 1.4em; margin-bottom: 0.5em; }}
-        article ul, article ol {{ padding-left: 1.5em; margin: 1em 0; }}
-        article li {{ margin-bottom: 0.4em; line-height: 1.7; }}
-        /* Tables */
-        .table-wrapper {{ overflow-x: auto; margin: 1.5em 0; }}
-        article table {{ border-collapse: collapse; width: 100%; font-size: 0.95em; }}
-        article table th, article table td {{ border: 1px solid #ddd; padding: 10px 14px; text-align: left; }}
-        article table th {{ background: #f5f5f5; font-weight: 600; }}
-        article table tr:nth-child(even) {{ background: #fafafa; }}
-        article table tr:hover {{ background: #f0f0f0; }}
-        /* Blockquote */
-        article blockquote {{ border-left: 4px solid #667eea; background: #f8f9fa; margin: 1.5em 0; padding: 1em 1.5em; color: #555; border-radius: 0 4px 4px 0; }}
-        article blockquote p {{ margin: 0.5em 0; }}
-        /* Images */
-        article img {{ max-width: 100%; height: auto; border-radius: 6px; margin: 1em 0; }}
-        /* Horizontal rule */
-        article hr {{ border: none; border-top: 2px solid #eee; margin: 2em 0; }}
-        footer {{ text-align: center; color: #666; font-size: 0.9em; margin-top: 40px; padding-top: 20px; border-top: 1px solid #eee; }}
-    </style>
-</head>
-<body>
-    <header>
-        <h1><a href="/">🛠️ IndieKit</a></h1>
-        <nav>
-            <a href="/">首页</a>
-            <a href="/blog">博客</a>
-            <a href="/digest">周刊</a>
-            <a href="/tools">工具</a>
-            <a href="/mcp">MCP</a>
-            <a href="/api">API</a>
-            <a href="/about">关于</a>
-            <a href="https://github.com/indiekitai/indiekit-site/issues/new?labels=feedback&title=Feedback:" target="_blank">💬 反馈</a>
-        </nav>
-    </header>
-    <main>
-        {content}
-    </main>
-    <footer>
-        <p>© 2026 IndieKit.ai</p>
-        <p>
-            <a href="https://github.com/indiekitai" target="_blank">GitHub</a> · 
-            <a href="https://x.com/indiekitai" target="_blank">Twitter</a> · 
-            <a href="https://github.com/indiekitai/indiekit-site/issues/new?labels=feedback" target="_blank">反馈建议</a>
-        </p>
-    </footer>
-    <script>hljs.highlightAll();</script>
-</body>
-</html>'''
+    return layout.page(content, title=title, description=description, canonical=canonical, lang=lang,
+                       og_type=og_type, extra_head=Markup(extra_head), article_date=article_date,
+                       article_tags=article_tags)
 
 
 @app.get("/", response_class=HTMLResponse)
-async def home():
+async def home(request: Request):
+    validators = corpus_validators()
+    if (cached := response_cache.lookup(request, validators)) is not None:
+        return cached
     posts = visible_posts()[:3]
 
-    posts_html = ""
-    for p in posts:
-        posts_html += f'''
-        <li>
-            <h2><a href="/blog/{p['slug']}">{p['title']}</a></h2>
-            <div class="meta">{p['date']}</div>
-            <p>{p['description']}</p>
-        </li>
-        '''
-
     # GEO：Organization + WebSite 结构化数据
     _home_jsonld = json.dumps({
         "@context": "https://schema.org",
@@ -259,394 +396,303 @@ async def home():
         ]
     }, ensure_ascii=False)
 
-    content = f'''
-    <script type="application/ld+json">{_home_jsonld}</script>
-    <article>
-        <h1>独立开发者的 AI 工具包</h1>
-        <p>IndieKit 是一套为独立开发者打造的轻量级工具集合。所有工具都是开源的，你可以免费使用或自行部署。</p>
-        <p>从 PostgreSQL 监控到 MCP Server，每个工具都在真实项目中打磨，解决我自己遇到的问题。</p>
-    </article>
-
-    <!-- pg-dash Landing Section -->
-    <section style="background: linear-gradient(135deg, #1a1a2e 0%, #16213e 50%, #0f3460 100%); color: #e0e0e0; border-radius: 12px; padding: 36px 32px; margin: 28px 0; box-shadow: 0 4px 24px rgba(0,0,0,0.18);">
-        <div style="display:flex; align-items:center; gap:12px; margin-bottom:6px;">
-            <span style="font-size:2rem;">🐘</span>
-            <h2 style="margin:0; color:#fff; font-size:1.7rem; letter-spacing:-0.5px;">pg-dash</h2>
-            <span style="background:#4ade80; color:#14532d; font-size:0.72rem; font-weight:700; padding:2px 8px; border-radius:99px; letter-spacing:0.5px;">v0.13</span>
-        </div>
-        <p style="margin:0 0 6px; color:#94a3b8; font-size:0.95rem;">@indiekitai/pg-dash</p>
-        <p style="margin:0 0 20px; color:#cbd5e1; font-size:1.05rem; max-width:560px;">
-            PostgreSQL 全能监控工具。健康检查、EXPLAIN 分析、锁监控、迁移安全审查 —— 一条命令搞定。
-        </p>
-
-        <div style="background:#0d1117; border-radius:8px; padding:16px 20px; font-family:monospace; font-size:0.88rem; color:#c9d1d9; margin-bottom:24px; overflow-x:auto;">
-            <div style="color:#6e7681; margin-bottom:8px;"># 安装</div>
-            <div><span style="color:#79c0ff;">npm</span> <span style="color:#c9d1d9;">install -g @indiekitai/pg-dash</span></div>
-            <div style="margin-top:12px; color:#6e7681;"># 核心命令</div>
-            <div><span style="color:#79c0ff;">pg-dash</span> <span style="color:#ffa657;">check</span>              <span style="color:#6e7681;"># 全面健康检查</span></div>
-            <div><span style="color:#79c0ff;">pg-dash</span> <span style="color:#ffa657;">explain</span> <span style="color:#a5d6ff;">"SELECT ..."</span>  <span style="color:#6e7681;"># EXPLAIN 可视化</span></div>
-            <div><span style="color:#79c0ff;">pg-dash</span> <span style="color:#ffa657;">watch-locks</span>        <span style="color:#6e7681;"># 实时锁监控</span></div>
-            <div><span style="color:#79c0ff;">pg-dash</span> <span style="color:#ffa657;">check-migration</span>    <span style="color:#6e7681;"># 迁移安全检查</span></div>
-            <div><span style="color:#79c0ff;">pg-dash</span> <span style="color:#ffa657;">schema-diff</span>        <span style="color:#6e7681;"># Schema 对比</span></div>
-            <div><span style="color:#79c0ff;">pg-dash</span> <span style="color:#ffa657;">diff-env</span>           <span style="color:#6e7681;"># 两环境 Schema 差异</span></div>
-        </div>
-
-        <div style="display:grid; grid-template-columns:repeat(auto-fit, minmax(180px, 1fr)); gap:12px; margin-bottom:24px;">
-            <div style="background:rgba(255,255,255,0.06); border-radius:8px; padding:14px 16px;">
-                <div style="font-size:1.3rem; margin-bottom:4px;">📊</div>
-                <div style="font-weight:600; color:#fff; margin-bottom:3px;">健康检查</div>
-                <div style="font-size:0.85rem; color:#94a3b8;">缓存命中率、慢查询、连接数、未使用索引</div>
-            </div>
-            <div style="background:rgba(255,255,255,0.06); border-radius:8px; padding:14px 16px;">
-                <div style="font-size:1.3rem; margin-bottom:4px;">🔍</div>
-                <div style="font-weight:600; color:#fff; margin-bottom:3px;">EXPLAIN 分析</div>
-                <div style="font-size:0.85rem; color:#94a3b8;">终端可视化执行计划，Seq Scan 一眼识别</div>
-            </div>
-            <div style="background:rgba(255,255,255,0.06); border-radius:8px; padding:14px 16px;">
-                <div style="font-size:1.3rem; margin-bottom:4px;">🔒</div>
-                <div style="font-weight:600; color:#fff; margin-bottom:3px;">锁监控</div>
-                <div style="font-size:0.85rem; color:#94a3b8;">实时追踪锁等待链，定位阻塞源</div>
-            </div>
-            <div style="background:rgba(255,255,255,0.06); border-radius:8px; padding:14px 16px;">
-                <div style="font-size:1.3rem; margin-bottom:4px;">🔌</div>
-                <div style="font-weight:600; color:#fff; margin-bottom:3px;">23 个 MCP 工具</div>
-                <div style="font-size:0.85rem; color:#94a3b8;">让 AI Agent 直接操作你的 PG 数据库</div>
-            </div>
-        </div>
-
-        <div style="display:flex; gap:12px; flex-wrap:wrap;">
-            <a href="https://github.com/indiekitai/pg-dash" target="_blank"
-               style="display:inline-flex; align-items:center; gap:6px; background:#21262d; color:#c9d1d9; text-decoration:none; padding:9px 18px; border-radius:6px; font-size:0.9rem; font-weight:500; border:1px solid #30363d;">
-                ⭐ GitHub
-            </a>
-            <a href="https://www.npmjs.com/package/@indiekitai/pg-dash" target="_blank"
-               style="display:inline-flex; align-items:center; gap:6px; background:#cc3534; color:#fff; text-decoration:none; padding:9px 18px; border-radius:6px; font-size:0.9rem; font-weight:500;">
-                📦 npm
-            </a>
-            <a href="/tools#pg-dash"
-               style="display:inline-flex; align-items:center; gap:6px; background:rgba(255,255,255,0.1); color:#cbd5e1; text-decoration:none; padding:9px 18px; border-radius:6px; font-size:0.9rem; font-weight:500;">
-                → 完整文档
-            </a>
-        </div>
-    </section>
-
-    <!-- AI Orchestration Section -->
-    <section style="background: linear-gradient(135deg, #0f172a 0%, #1e293b 50%, #334155 100%); color: #e0e0e0; border-radius: 12px; padding: 36px 32px; margin: 28px 0; box-shadow: 0 4px 24px rgba(0,0,0,0.18);">
-        <div style="display:flex; align-items:center; gap:12px; margin-bottom:6px;">
-            <span style="font-size:2rem;">🤖</span>
-            <h2 style="margin:0; color:#fff; font-size:1.7rem; letter-spacing:-0.5px;">AI Agent Orchestration</h2>
-            <span style="background:#818cf8; color:#fff; font-size:0.72rem; font-weight:700; padding:2px 8px; border-radius:99px; letter-spacing:0.5px;">NEW</span>
-        </div>
-        <p style="margin:0 0 20px; color:#cbd5e1; font-size:1.05rem; max-width:620px;">
-            给 Codex App 和 Claude Code 加一层工程 harness：先定义功能包和边界，再派隔离 worktree worker；用 ledger、状态页、heartbeat、review pack 和 evidence labels 让 AI 编程循环可巡检、可验收、可恢复。
-        </p>
-
-        <div style="display:grid; grid-template-columns:repeat(auto-fit, minmax(260px, 1fr)); gap:16px; margin-bottom:24px;">
-            <div style="background:rgba(255,255,255,0.06); border-radius:8px; padding:18px 20px;">
-                <div style="font-weight:600; color:#fff; margin-bottom:6px; font-size:1.05rem;">codex-orchestrator</div>
-                <div style="font-size:0.85rem; color:#94a3b8; margin-bottom:10px;">OpenAI Codex App</div>
-                <div style="font-size:0.9rem; color:#cbd5e1; line-height:1.6;">
-                    Codex App-first 的 Loop Engineering harness。规划功能包，派发隔离 worktree session，记录 ledger/status truth，审查证据后再 merge/push/cleanup，并严格区分 local / proxy / direct / blocked。
-                </div>
-                <div style="margin-top:12px;">
-                    <a href="https://github.com/indiekitai/codex-orchestrator" target="_blank"
-                       style="display:inline-flex; align-items:center; gap:6px; background:#21262d; color:#c9d1d9; text-decoration:none; padding:7px 14px; border-radius:6px; font-size:0.85rem; font-weight:500; border:1px solid #30363d;">
-                        ⭐ GitHub
-                    </a>
-                </div>
-            </div>
-            <div style="background:rgba(255,255,255,0.06); border-radius:8px; padding:18px 20px;">
-                <div style="font-weight:600; color:#fff; margin-bottom:6px; font-size:1.05rem;">claude-orchestrator</div>
-                <div style="font-size:0.85rem; color:#94a3b8; margin-bottom:10px;">Claude Code</div>
-                <div style="font-size:0.9rem; color:#cbd5e1; line-height:1.6;">
-                    面向 Claude Code 的终端优先版本。用串行规划、worktree 隔离、反浅切片检查和质量 gate，把多个 Claude worker 的产出变成可审查、可拒绝、可合并的分支。
-                </div>
-                <div style="margin-top:12px;">
-                    <a href="https://github.com/indiekitai/claude-orchestrator" target="_blank"
-                       style="display:inline-flex; align-items:center; gap:6px; background:#21262d; color:#c9d1d9; text-decoration:none; padding:7px 14px; border-radius:6px; font-size:0.85rem; font-weight:500; border:1px solid #30363d;">
-                        ⭐ GitHub
-                    </a>
-                </div>
-            </div>
-        </div>
-
-        <div style="background:#0d1117; border-radius:8px; padding:16px 20px; font-family:monospace; font-size:0.85rem; color:#c9d1d9; margin-bottom:16px;">
-            <div style="color:#6e7681; margin-bottom:8px;"># Codex App-first 用法</div>
-            <div><span style="color:#8b949e;">把仓库地址交给 Codex App，让它读取 README，安装或更新 skill，然后先做 dry run。</span></div>
-            <div><span style="color:#79c0ff;">https://github.com/indiekitai/codex-orchestrator</span></div>
-            <div style="margin-top:12px; color:#6e7681;"># Claude Code 版本</div>
-            <div><span style="color:#79c0ff;">cp -r</span> claude-orchestrator <span style="color:#a5d6ff;">~/.claude/skills/build-orchestrator</span></div>
-        </div>
-
-        <p style="margin:0; color:#94a3b8; font-size:0.88rem;">
-            MIT 开源 · Codex App-first · <a href="https://github.com/indiekitai/codex-orchestrator" style="color:#818cf8;" target="_blank">了解更多 →</a>
-        </p>
-    </section>
-
-    <h2>🔧 工具</h2>
-    <div class="tools">
-        <div class="tool">
-            <h3>📰 HN Digest</h3>
-            <p>AI 生成的中文 Hacker News 每日精选</p>
-            <a href="https://hn.indiekit.ai">→ 访问</a>
-        </div>
-        <div class="tool">
-            <h3>📊 Uptime Ping</h3>
-            <p>简单的 API 健康监控 + Telegram 告警</p>
-            <a href="https://up.indiekit.ai">→ 访问</a>
-        </div>
-        <div class="tool">
-            <h3>🔗 Webhook Relay</h3>
-            <p>接收 Webhook 转发到 Telegram</p>
-            <a href="https://hook.indiekit.ai">→ 访问</a>
-        </div>
-        <div class="tool">
-            <h3>🔗 Tiny Link</h3>
-            <p>短链接服务 + 点击统计</p>
-            <a href="https://s.indiekit.ai">→ 访问</a>
-        </div>
-        <div class="tool">
-            <h3>📋 Quick Paste</h3>
-            <p>代码分享 + 语法高亮</p>
-            <a href="https://p.indiekit.ai">→ 访问</a>
-        </div>
-        <div class="tool">
-            <h3>🤖 AI CS SaaS</h3>
-            <p>多租户 AI 客服 + RAG 检索</p>
-            <a href="https://cs.indiekit.ai/docs">→ API 文档</a>
-        </div>
-        <div class="tool" style="background: linear-gradient(135deg, #667eea 0%, #764ba2 100%); color: white;">
-            <h3>🔌 MCP Server</h3>
-            <p>让 AI Agent 直接调用工具</p>
-            <a href="/mcp" style="color: white;">→ 了解更多</a>
-        </div>
-        <div class="tool">
-            <h3>📄 Doc2MD</h3>
-            <p>PDF/Word/网页 → Markdown</p>
-            <p class="tool-stats">✨ URL 前缀模式：d.indiekit.ai/https/任意网址</p>
-            <a href="https://d.indiekit.ai/docs">→ API 文档</a>
-        </div>
-    </div>
-    
-    <h2>📝 最新文章</h2>
-    <ul class="post-list">
-        {posts_html if posts_html else '<li>暂无文章</li>'}
-    </ul>
-    '''
+    content = layout.render("home.html", jsonld=Markup(_home_jsonld), posts=posts)
     
-    return render_html("首页", content)
+    return response_cache.store(request, validators, HTMLResponse(render_html("首页", content)))
+
+
+def tag_url(tag: str) -> str:
+    return f"/blog/tag/{quote(str(tag), safe='')}"
+
+
+@lru_cache(maxsize=4096)
+def _tag_link(tag) -> str:
+    # 标签集合很小、重复出现在每个列表项里：链接 HTML 只拼一次
+    return f'<a href="{tag_url(tag)}">{escape(tag)}</a>'
+
+
+def tag_links(tags: list, empty: str = "未分类") -> Markup:
+    if not tags:
+        return escape(empty)
+    return Markup(", ".join(map(_tag_link, tags)))
+
+
+def page_count(total: int, limit: int = BLOG_PAGE_SIZE) -> int:
+    """Number of list pages for ``total`` posts (at least one, even when empty)."""
+    return max(1, -(-total // limit))
+
+
+def _list_page_url(base: str, page: int, limit: int) -> str:
+    # 默认每页条数用路径分页（/blog/page/2），静态导出里每页都是一个文件；自定义 limit 才用查询参数
+    if limit != BLOG_PAGE_SIZE:
+        return f"{base}?page={page}&limit={limit}"
+    return base if page == 1 else f"{base}/page/{page}"
+
+
+def render_post_list(all_posts: list[Post], page: int, limit: int, base: str, title: str,
+                     heading: str, description: str, empty: str) -> str:
+    """A paginated post list page (/blog, /blog/tag/…); 404 past the last page."""
+    # 已排好序的列表直接切片，不重新排序
+    total_pages = page_count(len(all_posts), limit)
+    if not 1 <= page <= total_pages:
+        raise HTTPException(status_code=404, detail="页面不存在")
+    posts = all_posts[(page - 1) * limit:page * limit]
+
+    # rel=prev/next：head 里给爬虫，页面底部给读者
+    prev_url = _list_page_url(base, page - 1, limit) if page > 1 else ""
+    next_url = _list_page_url(base, page + 1, limit) if page < total_pages else ""
+    pager_head = ""
+    if prev_url:
+        pager_head += f'    <link rel="prev" href="{SITE_URL}{prev_url}">\n'
+    if next_url:
+        pager_head += f'    <link rel="next" href="{SITE_URL}{next_url}">\n'
+
+    content = layout.render("post_list.html", heading=Markup(heading), posts=posts, empty=empty, page=page,
+                            total_pages=total_pages, prev_url=prev_url, next_url=next_url, tag_links=tag_links)
+
+    page_title = title if page == 1 else f"{title} · 第 {page} 页"
+    return render_html(page_title, content, description, f"{SITE_URL}{_list_page_url(base, page, limit)}",
+                       extra_head=pager_head)
 
 
 @app.get("/blog", response_class=HTMLResponse)
-async def blog_list():
-    posts = visible_posts()
-    
-    posts_html = ""
-    for p in posts:
-        posts_html += f'''
-        <li>
-            <h2><a href="/blog/{p['slug']}">{p['title']}</a></h2>
-            <div class="meta">{p['date']} · {', '.join(p['tags']) if p['tags'] else '未分类'}</div>
-            <p>{p['description']}</p>
-        </li>
-        '''
-    
-    content = f'''
-    <h1>博客</h1>
-    <ul class="post-list">
-        {posts_html if posts_html else '<li>暂无文章，敬请期待...</li>'}
-    </ul>
-    '''
-    
-    return render_html("博客", content, "独立开发者经验分享、教程、工具推荐", f"{SITE_URL}/blog")
+async def blog_list(request: Request, page: int = Query(1, ge=1), limit: int = Query(BLOG_PAGE_SIZE, ge=1, le=100)):
+    validators = corpus_validators()
+    if (cached := response_cache.lookup(request, validators)) is not None:
+        return cached
+    return response_cache.store(request, validators, HTMLResponse(render_post_list(
+        visible_posts(), page, limit, "/blog", "博客", "<h1>博客</h1>",
+        "独立开发者经验分享、教程、工具推荐", "暂无文章，敬请期待...")))
+
+
+@app.get("/blog/page/{page:int}", response_class=HTMLResponse)
+async def blog_list_page(page: int, request: Request):
+    return await blog_list(request, page, BLOG_PAGE_SIZE)
+
+
+# 必须在 /blog/tag/{tag:path} 之前声明，否则 "…/page/2" 会被当成标签名的一部分
+@app.get("/blog/tag/{tag:path}/page/{page:int}", response_class=HTMLResponse)
+async def blog_tag_page(tag: str, page: int, request: Request):
+    return await blog_tag(tag, request, page, BLOG_PAGE_SIZE)
+
+
+@app.get("/blog/tag/{tag:path}", response_class=HTMLResponse)
+async def blog_tag(tag: str, request: Request, page: int = Query(1, ge=1),
+                   limit: int = Query(BLOG_PAGE_SIZE, ge=1, le=100)):
+    validators = corpus_validators()
+    if (cached := response_cache.lookup(request, validators)) is not None:
+        return cached
+    group = tag_index.get(tag)
+    if group is None:
+        raise HTTPException(status_code=404, detail="标签不存在")
+    name, posts = group
+    heading = Markup('''<h1>标签：{}</h1>
+    <p>共 {} 篇文章 · <a href="/blog">全部文章</a></p>''').format(name, len(posts))
+    return response_cache.store(request, validators, HTMLResponse(render_post_list(
+        posts, page, limit, tag_url(name), f"标签：{name}", heading,
+        f"IndieKit 博客中关于「{name}」的文章", "暂无文章")))
+
+
+def markdown_source(request: Request, store: ContentStore, record: Record):
+    """The record's source file as-is (frontmatter included): sendfile, Range, HEAD, conditional GET."""
+    from fastapi.responses import FileResponse, Response
+    validators = Validators(record.digest, last_modified=record.mtime)
+    if (not_modified := validators.not_modified(request)) is not None:
+        return not_modified
+    if (raw := store.raw(record)) is not None:
+        # 内容包里的原文：不是磁盘上的独立文件，没有 sendfile / Range
+        return Response(raw, media_type="text/markdown; charset=utf-8", headers=validators.headers())
+    path = store.directory / f"{record.slug}.md"
+    try:
+        # 同一次 stat 决定 Content-Length 和 Range 边界
+        stat_result = os.stat(path)
+    except FileNotFoundError:
+        raise HTTPException(status_code=404, detail="文章不存在")
+    return FileResponse(path, media_type="text/markdown; charset=utf-8", headers=validators.headers(),
+                        stat_result=stat_result)
+
+
+# 原始 markdown：必须在 /blog/{slug} 之前声明，否则 "xxx.md" 会被当成 slug
+@app.api_route("/blog/{slug}.md", methods=["GET", "HEAD"])
+async def blog_post_markdown(slug: str, request: Request):
+    post = posts_store.get(slug)
+    if not post:
+        raise HTTPException(status_code=404, detail="文章不存在")
+    return markdown_source(request, posts_store, post)
 
 
 @app.get("/blog/{slug}", response_class=HTMLResponse)
-async def blog_post(slug: str):
-    posts = load_posts()
-    post = next((p for p in posts if p['slug'] == slug), None)
+async def blog_post(slug: str, request: Request):
+    post = posts_store.get(slug)
     
     if not post:
         raise HTTPException(status_code=404, detail="文章不存在")
+
+    # 译文（hreflang、语言切换）也会影响页面，一并计入 ETag
+    versions = post_alternates(post)
+    validators = Validators(BUILD_ID, post.digest, *(f"{v.slug}:{v.digest}" for v in versions),
+                            last_modified=max([BUILD_MTIME, post.mtime] + [v.mtime for v in versions]))
+    if (cached := response_cache.lookup(request, validators)) is not None:
+        return cached
     
-    md.reset()
-    html_content = md.convert(post['content'])
+    body = posts_store.body(post)
+    html_content = posts_store.html(post)
+    if html_content is None:
+        html_content = await renderer.render(body)
     
     # 阅读时间：中文 400 字/分钟，英文 200 词/分钟
-    word_count = len(post['content'])
+    word_count = len(body)
     read_time = max(1, round(word_count / 400))
     
     post_url = f"{SITE_URL}/blog/{slug}"
-    share_text = post['title'].replace('"', '&quot;')
     
-    article_lang = post.get("lang", "zh-CN")
-    # 规范化 lang（zh → zh-CN）
-    if article_lang == "zh":
-        article_lang = "zh-CN"
+    article_lang = post.lang
 
-    # hreflang 配对逻辑：-en / -zh 后缀互指，或基础 slug 查找对应版本
-    blog_dir = CONTENT_DIR / "blog"
+    # hreflang：同组每种语言一条（含自己），x-default 指向英文版，没有英文版就指向原文
     hreflang_html = ""
-    if slug.endswith("-en"):
-        _base = slug[:-3]  # 去掉 -en
-        if (blog_dir / f"{_base}.md").exists():
-            _en_url = f"{SITE_URL}/blog/{slug}"
-            _zh_url = f"{SITE_URL}/blog/{_base}"
-            hreflang_html = (
-                f'    <link rel="alternate" hreflang="en" href="{_en_url}">\n'
-                f'    <link rel="alternate" hreflang="zh-CN" href="{_zh_url}">\n'
-                f'    <link rel="alternate" hreflang="x-default" href="{_en_url}">\n'
-            )
-    elif slug.endswith("-zh"):
-        _base = slug[:-3]  # 去掉 -zh
-        if (blog_dir / f"{_base}.md").exists():
-            _en_url = f"{SITE_URL}/blog/{_base}"
-            _zh_url = f"{SITE_URL}/blog/{slug}"
-            hreflang_html = (
-                f'    <link rel="alternate" hreflang="en" href="{_en_url}">\n'
-                f'    <link rel="alternate" hreflang="zh-CN" href="{_zh_url}">\n'
-                f'    <link rel="alternate" hreflang="x-default" href="{_en_url}">\n'
-            )
-    else:
-        if (blog_dir / f"{slug}-en.md").exists():
-            _en_url = f"{SITE_URL}/blog/{slug}-en"
-            _zh_url = f"{SITE_URL}/blog/{slug}"
-            hreflang_html = (
-                f'    <link rel="alternate" hreflang="zh-CN" href="{_zh_url}">\n'
-                f'    <link rel="alternate" hreflang="en" href="{_en_url}">\n'
-                f'    <link rel="alternate" hreflang="x-default" href="{_en_url}">\n'
-            )
-        elif (blog_dir / f"{slug}-zh.md").exists():
-            _en_url = f"{SITE_URL}/blog/{slug}"
-            _zh_url = f"{SITE_URL}/blog/{slug}-zh"
-            hreflang_html = (
-                f'    <link rel="alternate" hreflang="en" href="{_en_url}">\n'
-                f'    <link rel="alternate" hreflang="zh-CN" href="{_zh_url}">\n'
-                f'    <link rel="alternate" hreflang="x-default" href="{_en_url}">\n'
-            )
+    if len(versions) > 1:
+        default = next((v for v in versions if v.lang == "en"), versions[0])
+        for v in versions:
+            hreflang_html += f'    <link rel="alternate" hreflang="{v.lang}" href="{SITE_URL}/blog/{v.slug}">\n'
+        hreflang_html += f'    <link rel="alternate" hreflang="x-default" href="{SITE_URL}/blog/{default.slug}">\n'
 
     # BlogPosting + BreadcrumbList 结构化数据
-    json_ld = json.dumps({
-        "@context": "https://schema.org",
-        "@graph": [
-            {
-                "@type": "Article",
-                "headline": post['title'],
-                "description": post.get("description", ""),
-                "datePublished": str(post['date']),
-                "dateModified": str(post['date']),
-                "inLanguage": article_lang,
-                "keywords": post.get("tags", []),
-                "mainEntityOfPage": {"@type": "WebPage", "@id": post_url},
-                "author": {"@type": "Organization", "name": "IndieKit"},
-                "publisher": {"@type": "Organization", "name": "IndieKit", "url": SITE_URL},
-                "url": post_url,
-            },
-            {
-                "@type": "BreadcrumbList",
-                "itemListElement": [
-                    {"@type": "ListItem", "position": 1, "name": "首页", "item": SITE_URL},
-                    {"@type": "ListItem", "position": 2, "name": "博客", "item": f"{SITE_URL}/blog"},
-                    {"@type": "ListItem", "position": 3, "name": post['title'], "item": post_url},
-                ]
-            }
-        ]
-    }, ensure_ascii=False)
-
-    content = f'''
-    <script type="application/ld+json">{json_ld}</script>
-    <article>
-        <h1>{post['title']}</h1>
-        <div class="meta">{post['date']} · {read_time} 分钟阅读 · {', '.join(post['tags']) if post['tags'] else '未分类'}</div>
-        {html_content}
-        <div class="share-buttons">
-            <span>分享到：</span>
-            <a href="https://twitter.com/intent/tweet?text={share_text}&url={post_url}" target="_blank" rel="noopener">Twitter</a>
-            <a href="https://www.linkedin.com/shareArticle?mini=true&url={post_url}&title={share_text}" target="_blank" rel="noopener">LinkedIn</a>
-            <a href="https://news.ycombinator.com/submitlink?u={post_url}&t={share_text}" target="_blank" rel="noopener">HN</a>
-        </div>
-    </article>
-    '''
+    with phase("jsonld"):
+        json_ld = json.dumps({
+            "@context": "https://schema.org",
+            "@graph": [
+                {
+                    "@type": "Article",
+                    "headline": post.title,
+                    "description": post.description,
+                    "datePublished": post.iso_date,
+                    "dateModified": post.iso_date,
+                    "inLanguage": article_lang,
+                    "keywords": post.tags,
+                    "mainEntityOfPage": {"@type": "WebPage", "@id": post_url},
+                    "author": {"@type": "Organization", "name": "IndieKit"},
+                    "publisher": {"@type": "Organization", "name": "IndieKit", "url": SITE_URL},
+                    "url": post_url,
+                },
+                {
+                    "@type": "BreadcrumbList",
+                    "itemListElement": [
+                        {"@type": "ListItem", "position": 1, "name": "首页", "item": SITE_URL},
+                        {"@type": "ListItem", "position": 2, "name": "博客", "item": f"{SITE_URL}/blog"},
+                        {"@type": "ListItem", "position": 3, "name": post.title, "item": post_url},
+                    ]
+                }
+            ]
+        }, ensure_ascii=False)
+
+    content = layout.render("post.html", jsonld=Markup(json_ld), post=post, read_time=read_time, url=post_url,
+                            versions=versions, lang_names=LANG_NAMES, body=Markup(html_content), tag_links=tag_links)
     
-    return render_html(post['title'], content, post['description'], post_url, article_lang,
-                       og_type="article", extra_head=hreflang_html,
-                       article_date=str(post['date']), article_tags=post.get('tags', []))
-
-
-def load_digests() -> list[dict]:
-    """Load weekly digest issues from content/digest/"""
-    digests = []
-    digest_dir = CONTENT_DIR / "digest"
-
-    if not digest_dir.exists():
-        return digests
-
-    for f in sorted(digest_dir.glob("*.md"), reverse=True):
-        issue = frontmatter.load(f)
-        digests.append({
-            "slug": f.stem,
-            "title": issue.get("title", f.stem),
-            "date": issue.get("date", ""),
-            "description": issue.get("description", ""),
-            "hidden": bool(issue.get("hidden", False)),
-            "content": issue.content,
-        })
-
-    return [d for d in digests if not d["hidden"]]
+    return response_cache.store(request, validators, HTMLResponse(
+        render_html(post.title, content, post.description, post_url, article_lang,
+                    og_type="article", extra_head=hreflang_html,
+                    article_date=post.iso_date, article_tags=post.tags)))
+
+
+async def sync_search_index() -> None:
+    """Index queued post changes in a thread; the first build takes seconds on a large archive."""
+    posts_store.refresh()
+    if search_index.pending:
+        with phase("index"):
+            await asyncio.to_thread(search_index.flush)
+
+
+def search_posts(q: str, limit: int) -> tuple[int, list[dict]]:
+    """(total hits, top ``limit`` results) with highlighted snippets for /search and /api/search."""
+    posts_store.refresh()
+    with phase("search"):
+        total, hits = search_index.search(q, limit)
+        highlighter = Highlighter(q)
+        return total, [{
+            "slug": p.slug,
+            "title": p.title,
+            "date": p.iso_date,
+            "tags": p.tags,
+            "lang": p.lang,
+            "url": f"{SITE_URL}/blog/{p.slug}",
+            "score": round(score, 4),
+            "snippet": highlighter.snippet(posts_store.body(p), fallback=p.description),
+        } for score, p in hits]
+
+
+@app.get("/search", response_class=HTMLResponse)
+async def search_page(request: Request, q: str = Query("", max_length=200)):
+    # 查询词不进响应缓存，避免任意查询挤掉常用页面
+    validators = corpus_validators()
+    if (not_modified := validators.not_modified(request)) is not None:
+        return not_modified
+    q = q.strip()
+    if q:
+        await sync_search_index()
+    total, results = search_posts(q, 20) if q else (0, [])
+    content = layout.render("search.html", q=q, total=total, results=results, tag_links=tag_links)
+    title = f"搜索：{q}" if q else "搜索"
+    return validators.apply(HTMLResponse(
+        render_html(title, content, "搜索 IndieKit 博客文章", f"{SITE_URL}/search",
+                    extra_head='    <meta name="robots" content="noindex">\n' if q else "")))
+
+
+def load_digests() -> list[DigestIssue]:
+    """Visible weekly digest issues from content/digest/ (served from digests_store)."""
+    return digests_store.visible()
 
 
 @app.get("/digest", response_class=HTMLResponse)
-async def digest_list():
+async def digest_list(request: Request):
     issues = load_digests()
+    validators = Validators(BUILD_ID, digests_store.etag,
+                            last_modified=max(BUILD_MTIME, digests_store.last_modified))
+    if (cached := response_cache.lookup(request, validators)) is not None:
+        return cached
+
+    content = layout.render("digest_list.html", issues=issues)
 
-    issues_html = ""
-    for d in issues:
-        issues_html += f'''
-        <li>
-            <h2><a href="/digest/{d['slug']}">{d['title']}</a></h2>
-            <div class="meta">{d['date']}</div>
-            <p>{d['description']}</p>
-        </li>
-        '''
+    return response_cache.store(request, validators, HTMLResponse(
+        render_html("周刊", content, "IndieKit 周刊：每周精选 HN 热帖与 GitHub 趋势，附点评", f"{SITE_URL}/digest")))
 
-    content = f'''
-    <h1>周刊</h1>
-    <p>每周精选：HN 热帖与 GitHub 趋势里真正值得看的东西，附点评。长文观点在<a href="/blog">博客</a>。</p>
-    <ul class="post-list">
-        {issues_html if issues_html else '<li>第一期正在路上...</li>'}
-    </ul>
-    '''
 
-    return render_html("周刊", content, "IndieKit 周刊：每周精选 HN 热帖与 GitHub 趋势，附点评", f"{SITE_URL}/digest")
+@app.api_route("/digest/{slug}.md", methods=["GET", "HEAD"])
+async def digest_issue_markdown(slug: str, request: Request):
+    issue = digests_store.get(slug)
+    if not issue or issue.hidden:
+        raise HTTPException(status_code=404, detail="该期不存在")
+    return markdown_source(request, digests_store, issue)
 
 
 @app.get("/digest/{slug}", response_class=HTMLResponse)
-async def digest_issue(slug: str):
-    issues = load_digests()
-    issue = next((d for d in issues if d['slug'] == slug), None)
+async def digest_issue(slug: str, request: Request):
+    issue = digests_store.get(slug)
 
-    if not issue:
+    if not issue or issue.hidden:
         raise HTTPException(status_code=404, detail="该期不存在")
 
-    md.reset()
-    html_content = md.convert(issue['content'])
+    validators = Validators(BUILD_ID, issue.digest, last_modified=max(BUILD_MTIME, issue.mtime))
+    if (cached := response_cache.lookup(request, validators)) is not None:
+        return cached
+
+    html_content = digests_store.html(issue)
+    if html_content is None:
+        html_content = await renderer.render(digests_store.body(issue))
 
     issue_url = f"{SITE_URL}/digest/{slug}"
-    content = f'''
-    <article>
-        <h1>{issue['title']}</h1>
-        <div class="meta">{issue['date']}</div>
-        {html_content}
-    </article>
-    <p><a href="/digest">← 全部周刊</a></p>
-    '''
+    content = layout.render("digest_issue.html", issue=issue, body=Markup(html_content))
 
-    return render_html(issue['title'], content, issue['description'], issue_url,
-                       og_type="article", article_date=str(issue['date']))
+    return response_cache.store(request, validators, HTMLResponse(
+        render_html(issue.title, content, issue.description, issue_url,
+                    og_type="article", article_date=issue.iso_date)))
 
 
 @app.get("/tools", response_class=HTMLResponse)
-async def tools():
+async def tools(request: Request):
+    validators = static_validators()
+    if (cached := response_cache.lookup(request, validators)) is not None:
+        return cached
+
     # GEO：每个工具输出 SoftwareApplication 结构化数据
     _tools_jsonld_items = []
     for _t in TOOLS_DATA:
@@ -666,67 +712,6 @@ async def tools():
         ensure_ascii=False
     )
 
-    content = f'<script type="application/ld+json">{_tools_jsonld}</script>\n'
-    content += '''
-    <h1>工具</h1>
-    <p>所有工具都是免费使用的。轻量、快速、无需注册。</p>
-    
-    <div class="tools">
-        <div class="tool">
-            <h3>📰 HN Digest</h3>
-            <p>AI 自动抓取 Hacker News 热门文章，生成中文摘要。每天更新，帮你快速了解科技圈动态。</p>
-            <p class="tool-stats">🔄 每日更新 · 📖 AI 中文摘要 · ⏱️ 节省 30 分钟/天</p>
-            <p><a href="https://hn.indiekit.ai" class="tool-link">→ 访问工具</a></p>
-        </div>
-        <div class="tool">
-            <h3>📊 Uptime Ping</h3>
-            <p>监控你的 API 和网站是否正常运行。支持 Telegram 告警，服务挂了第一时间通知你。</p>
-            <p class="tool-stats">⏱️ 1 分钟检测间隔 · 📱 Telegram 告警 · 📈 可用率统计</p>
-            <p><a href="https://up.indiekit.ai" class="tool-link">→ 访问工具</a></p>
-        </div>
-        <div class="tool">
-            <h3>🔔 Webhook Relay</h3>
-            <p>接收来自 GitHub、Stripe 等服务的 Webhook，转发到你的 Telegram。再也不用盯着后台看了。</p>
-            <p class="tool-stats">🔗 一键创建端点 · 📱 即时通知 · 📝 请求日志</p>
-            <p><a href="https://hook.indiekit.ai" class="tool-link">→ 访问工具</a></p>
-        </div>
-        <div class="tool">
-            <h3>🔗 Tiny Link</h3>
-            <p>自托管的短链接服务。支持点击统计、自定义短码。你的数据你做主。</p>
-            <p class="tool-stats">📊 点击统计 · ✏️ 自定义短码 · 🔒 数据自主</p>
-            <p><a href="https://s.indiekit.ai" class="tool-link">→ 访问工具</a></p>
-        </div>
-        <div class="tool">
-            <h3>📋 Quick Paste</h3>
-            <p>代码分享工具，支持语法高亮、阅后即焚。分享代码片段的最佳选择。</p>
-            <p class="tool-stats">🎨 语法高亮 · ⏰ 自动过期 · 📦 无需登录</p>
-            <p><a href="https://p.indiekit.ai" class="tool-link">→ 访问工具</a></p>
-        </div>
-        <div class="tool">
-            <h3>🤖 AI CS SaaS</h3>
-            <p>多租户 AI 客服系统。上传知识库，一行代码嵌入 Widget，让你的网站拥有智能客服。</p>
-            <p class="tool-stats">🧠 RAG 语义检索 · 💬 流式响应 · 🏢 多租户隔离</p>
-            <p><a href="https://cs.indiekit.ai/docs" class="tool-link">→ API 文档</a></p>
-        </div>
-        <div class="tool" style="background: linear-gradient(135deg, #667eea 0%, #764ba2 100%); color: white;">
-            <h3>🔌 MCP Server</h3>
-            <p>让 AI Agent 直接使用 IndieKit 工具。支持 Claude Desktop、Cursor 等 MCP 兼容客户端。</p>
-            <p class="tool-stats" style="color: rgba(255,255,255,0.9);">🤖 7 个工具 · 🔗 标准协议 · ⚡ 即装即用</p>
-            <p><a href="/mcp" class="tool-link" style="color: white;">→ 了解更多</a></p>
-        </div>
-        <div class="tool">
-            <h3>📄 Doc2MD</h3>
-            <p>文档转 Markdown 服务。支持 PDF、Word、HTML、网页。URL 前缀模式：<code>d.indiekit.ai/https/任意网址</code>。三层转换管道 + markdown.new fallback。</p>
-            <p class="tool-stats">✨ URL 前缀 · 📑 多格式 · 🔄 自动 Fallback · ⚡ REST + MCP</p>
-            <p><a href="https://d.indiekit.ai/docs" class="tool-link">→ API 文档</a></p>
-        </div>
-    </div>
-    
-    <h2>📦 npm 工具包</h2>
-    <p>所有工具都有 CLI + MCP Server + JSON 输出。<code>npm install</code> 即用。</p>
-    <p><strong>一键安装所有 skills：</strong> <code>pi install npm:@indiekitai/pi-skills</code></p>
-    '''
-
     # Dynamically add npm tools grouped by category
     categories = {}
     for tool in TOOLS_DATA:
@@ -736,269 +721,242 @@ async def tools():
         categories[cat].append(tool)
 
     category_icons = {"PostgreSQL": "🐘", "Developer Tools": "🛠", "Terminal": "🎨", "Automation": "🤖", "AI Orchestration": "🤖", "Meta": "📦"}
+    content = layout.render("tools.html", jsonld=Markup(_tools_jsonld), categories=categories,
+                            category_icons=category_icons)
 
-    for cat, tools in categories.items():
-        icon = category_icons.get(cat, "📦")
-        content += f'<h3>{icon} {cat}</h3><div class="tools">'
-        for t in tools:
-            gh_link = f'<a href="https://github.com/{t["github"]}" target="_blank">GitHub</a>' if t.get("github") else ""
-            npm_link = f'<code>npx {t["npm"]}</code>' if t.get("npm") else ""
-            mcp_badge = ' · 🔌 MCP' if t.get("mcp") else ""
-            content += f'''
-        <div class="tool" id="{t['name']}">
-            <h4>{t['name']}</h4>
-            <p>{t['description']}</p>
-            <p class="tool-stats">{npm_link}{mcp_badge}</p>
-            <p>{gh_link}</p>
-        </div>'''
-        content += '</div>'
-
-    content += f'''
-    <h2>技术栈</h2>
-    <p>Web 工具：Python + FastAPI。npm 工具包：TypeScript。全部开源。</p>
-    <p>GitHub: <a href="https://github.com/indiekitai">github.com/indiekitai</a> · npm: <a href="https://www.npmjs.com/org/indiekitai">@indiekitai</a></p>
-    '''
-
-    return render_html("工具", content, "免费开源的独立开发者工具集合 — 18 个 npm 包 + Web 工具", f"{SITE_URL}/tools")
+    return response_cache.store(request, validators, HTMLResponse(
+        render_html("工具", content, "免费开源的独立开发者工具集合 — 18 个 npm 包 + Web 工具", f"{SITE_URL}/tools")))
 
 
 @app.get("/mcp", response_class=HTMLResponse)
-async def mcp_page():
-    content = '''
-    <article>
-        <h1>🔌 IndieKit MCP Server</h1>
-        <p class="lead">让 AI Agent 直接使用 IndieKit 工具。基于 <a href="https://modelcontextprotocol.io">Model Context Protocol</a> 标准。</p>
-        
-        <h2>什么是 MCP？</h2>
-        <p>MCP (Model Context Protocol) 是 Anthropic 推出的开放协议，定义了 AI 和外部工具之间的标准通信方式。到 2026 年初已成为事实标准，OpenAI、Google、Microsoft 全部跟进。</p>
-        <p>简单说：<strong>MCP 让 AI 能直接调用你的工具，不需要人工操作界面。</strong></p>
-        
-        <h2>安装</h2>
-        <pre><code class="language-bash"># 使用 pip
-pip install indiekit-mcp
-
-# 或使用 uv
-uv pip install indiekit-mcp</code></pre>
-        
-        <h2>配置 Claude Desktop</h2>
-        <p>编辑配置文件：</p>
-        <ul>
-            <li>macOS: <code>~/Library/Application Support/Claude/claude_desktop_config.json</code></li>
-            <li>Windows: <code>%APPDATA%\\Claude\\claude_desktop_config.json</code></li>
-        </ul>
-        <pre><code class="language-json">{
-  "mcpServers": {
-    "indiekit": {
-      "command": "indiekit-mcp"
-    }
-  }
-}</code></pre>
-        <p>重启 Claude Desktop 即可使用。</p>
-        
-        <h2>可用工具</h2>
-        <table>
-            <thead>
-                <tr><th>工具</th><th>功能</th></tr>
-            </thead>
-            <tbody>
-                <tr><td><code>hn_digest</code></td><td>获取 Hacker News 每日中文摘要</td></tr>
-                <tr><td><code>uptime_check</code></td><td>检查网站/API 是否在线</td></tr>
-                <tr><td><code>uptime_status</code></td><td>获取所有监控端点状态</td></tr>
-                <tr><td><code>shorten_url</code></td><td>创建短链接</td></tr>
-                <tr><td><code>get_link_stats</code></td><td>获取短链接点击统计</td></tr>
-                <tr><td><code>create_paste</code></td><td>创建代码片段分享</td></tr>
-                <tr><td><code>get_paste</code></td><td>获取代码片段内容</td></tr>
-            </tbody>
-        </table>
-        
-        <h2>使用示例</h2>
-        <p>配置好后，直接对 Claude 说：</p>
-        <ul>
-            <li>"帮我看看今天 Hacker News 有什么热门"</li>
-            <li>"检查一下 https://example.com 是否在线"</li>
-            <li>"把这个链接缩短：https://very-long-url.com/..."</li>
-            <li>"帮我创建一个 Python 代码片段"</li>
-        </ul>
-        <p>Claude 会自动调用对应的 IndieKit 工具，返回结果。</p>
-        
-        <h2>为什么需要 MCP？</h2>
-        <blockquote>
-            <p>"PC 软件为手机重做了一遍，现在轮到 Agent 了。"</p>
-            <p>— <a href="https://twitter.com/dotey">@dotey</a></p>
-        </blockquote>
-        <p>GUI 是给人用的，Agent 需要结构化的接口。MCP 就是给 Agent 开的正门，比让 AI 模拟点击界面高效 10 倍。</p>
-        
-        <h2>源码</h2>
-        <p><a href="https://github.com/indiekitai/indiekit-mcp">github.com/indiekitai/indiekit-mcp</a></p>
-        
-        <h2>其他 MCP Server</h2>
-        <ul>
-            <li><a href="https://github.com/indiekitai/notion-mcp">notion-mcp</a> - 让 Agent 管理你的 Notion</li>
-            <li><a href="https://github.com/indiekitai/doc2md">doc2md</a> - 文档转 Markdown（含 MCP Server）</li>
-        </ul>
-    </article>
-    '''
+async def mcp_page(request: Request):
+    validators = static_validators()
+    if (cached := response_cache.lookup(request, validators)) is not None:
+        return cached
+
+    content = layout.render("mcp.html")
     
-    return render_html("MCP Server", content, "IndieKit MCP Server - 让 AI Agent 直接使用 IndieKit 工具", f"{SITE_URL}/mcp")
+    return response_cache.store(request, validators, HTMLResponse(
+        render_html("MCP Server", content, "IndieKit MCP Server - 让 AI Agent 直接使用 IndieKit 工具", f"{SITE_URL}/mcp")))
 
 
 @app.get("/membership", response_class=HTMLResponse)
-async def membership():
+async def membership(request: Request):
     """会员页面"""
-    membership_file = CONTENT_DIR / "membership.md"
-    if not membership_file.exists():
+    content_body = membership_page.get()
+    if content_body is None:
         raise HTTPException(status_code=404, detail="页面不存在")
+
+    validators = Validators(BUILD_ID, membership_page.etag,
+                            last_modified=max(BUILD_MTIME, membership_page.last_modified))
+    if (cached := response_cache.lookup(request, validators)) is not None:
+        return cached
     
-    content_raw = membership_file.read_text()
-    
-    # 解析 frontmatter
-    if content_raw.startswith('---'):
-        parts = content_raw.split('---', 2)
-        if len(parts) >= 3:
-            content_body = parts[2].strip()
-        else:
-            content_body = content_raw
-    else:
-        content_body = content_raw
-    
-    md.reset()
-    html_content = md.convert(content_body)
+    html_content = membership_page.html()
+    if html_content is None:
+        html_content = await renderer.render(content_body)
     
-    content = f'''
-    <article>
-        {html_content}
-        <div id="subscribe" style="margin-top: 2rem; padding: 1.5rem; background: #f8f9fa; border-radius: 8px;">
-            <h3>🚀 即将上线</h3>
-            <p>IndieKit 会员正在准备中，敬请期待！</p>
-            <p>想第一时间知道？关注我们的 <a href="https://twitter.com/indiekitai">Twitter</a></p>
-        </div>
-    </article>
-    '''
+    content = layout.render("membership.html", body=Markup(html_content))
     
-    return render_html("IndieKit 会员", content, "每日 AI 开发精选 + 独家工具模板", f"{SITE_URL}/membership")
+    return response_cache.store(request, validators, HTMLResponse(
+        render_html("IndieKit 会员", content, "每日 AI 开发精选 + 独家工具模板", f"{SITE_URL}/membership")))
 
 
 @app.get("/api", response_class=HTMLResponse)
-async def api_docs():
+async def api_docs(request: Request):
     """API 文档页面"""
-    api_file = Path("/root/source/side-projects/API.md")
-    if not api_file.exists():
+    content_raw = api_docs_page.get()
+    if content_raw is None:
         raise HTTPException(status_code=404, detail="API 文档不存在")
+
+    validators = Validators(BUILD_ID, api_docs_page.etag,
+                            last_modified=max(BUILD_MTIME, api_docs_page.last_modified))
+    if (cached := response_cache.lookup(request, validators)) is not None:
+        return cached
+
+    html_content = await renderer.render(content_raw)
     
-    content_raw = api_file.read_text()
-    md.reset()
-    html_content = md.convert(content_raw)
-    
-    content = f'''
-    <article>
-        {html_content}
-    </article>
-    '''
+    content = layout.render("article.html", body=Markup(html_content))
     
-    return render_html("API Reference", content, "IndieKit API 文档 - 所有服务的 JSON API 接口", f"{SITE_URL}/api")
+    return response_cache.store(request, validators, HTMLResponse(
+        render_html("API Reference", content, "IndieKit API 文档 - 所有服务的 JSON API 接口", f"{SITE_URL}/api")))
 
 
 @app.get("/about", response_class=HTMLResponse)
-async def about():
-    content = '''
-    <article>
-        <h1>关于 IndieKit</h1>
-        <p>IndieKit 是我个人维护的开源开发者工具集。旗舰项目 <a href="https://github.com/indiekitai/pg-dash">pg-dash</a> 是一个 AI-native 的 PostgreSQL 监控工具，提供 23 个 MCP 工具、CI 集成、迁移安全检查和多环境对比。</p>
-
-        <h2>做这些工具的原因</h2>
-        <p>我的日常工作涉及全栈开发和基础设施运维。每次遇到重复痛点——数据库健康检查要开 pgAdmin、迁移安全要人肉 review、Schema 变更没 diff——我就把解决方案抽成工具开源出来。</p>
-        <p>所有工具都是 AI Agent 深度辅助开发的：从 Claude Code 到 Codex，我用多 agent 协作完成从设计到交付的全流程。这本身也是我感兴趣的方向——<strong>AI Agent 如何真正提升工程交付效率</strong>。</p>
-
-        <h2>技术栈</h2>
-        <ul>
-            <li><strong>TypeScript</strong>：pg-dash 及大部分 npm 工具包</li>
-            <li><strong>Python + FastAPI</strong>：本站及 Web 服务</li>
-            <li><strong>MCP (Model Context Protocol)</strong>：所有工具均提供 MCP Server</li>
-            <li><strong>PostgreSQL</strong>：核心领域</li>
-            <li><strong>DigitalOcean + Cloudflare</strong>：基础设施</li>
-        </ul>
-
-        <h2>理念</h2>
-        <ul>
-            <li><strong>解决真实问题</strong>：每个工具都源于实际工作中遇到的痛点</li>
-            <li><strong>自托管优先</strong>：数据完全掌控，不依赖第三方 SaaS</li>
-            <li><strong>AI-native</strong>：从设计之初就考虑 Agent 集成，不是事后加 MCP</li>
-        </ul>
-
-        <h2>联系</h2>
-        <ul>
-            <li>GitHub: <a href="https://github.com/indiekitai">github.com/indiekitai</a></li>
-            <li>Twitter: <a href="https://twitter.com/indiekitai">@indiekitai</a></li>
-        </ul>
-    </article>
-    '''
-    
-    return render_html("关于", content, "关于 IndieKit - 独立开发者的 AI 工具包", f"{SITE_URL}/about")
+async def about(request: Request):
+    validators = static_validators()
+    if (cached := response_cache.lookup(request, validators)) is not None:
+        return cached
+
+    content = layout.render("about.html")
+
+    return response_cache.store(request, validators, HTMLResponse(
+        render_html("关于", content, "关于 IndieKit - 独立开发者的 AI 工具包", f"{SITE_URL}/about")))
 
 
 @app.get("/health")
 async def health():
-    return {"status": "ok"}
+    return {"status": "ok", "ready": startup["ready"], "render_cache": renderer.cache.stats(),
+            "response_cache": response_cache.cache.stats(), "body_cache": posts_store.bodies.stats(),
+            "content_bundle": bundle_source.info() if bundle_source is not None else None}
 
 
-# Sitemap for SEO
-@app.get("/sitemap.xml")
-async def sitemap():
+@app.get("/ready")
+async def ready():
+    """Readiness probe: 503 until the startup warm-up has finished (``/health`` is liveness only)."""
+    from fastapi.responses import JSONResponse
+    return JSONResponse({"status": "ready" if startup["ready"] else "warming", **startup},
+                        status_code=200 if startup["ready"] else 503, headers={"Cache-Control": "no-store"})
+
+
+@app.get("/metrics")
+async def metrics_endpoint():
+    """Prometheus text format; 404 unless ``METRICS=on``."""
+    if metrics is None:
+        raise HTTPException(status_code=404, detail="Not Found")
+    from fastapi.responses import PlainTextResponse
+    return PlainTextResponse(metrics.render(), media_type="text/plain; version=0.0.4; charset=utf-8")
+
+
+@app.get("/admin/slow-requests")
+async def admin_slow_requests(request: Request):
+    """The last slow requests, newest first; 404 unless ``ADMIN_TOKEN`` is set and presented."""
+    supplied = request.headers.get("authorization", "").removeprefix("Bearer ").encode()
+    if not ADMIN_TOKEN or not hmac.compare_digest(supplied, ADMIN_TOKEN.encode()):
+        raise HTTPException(status_code=404, detail="Not Found")
+    from fastapi.responses import JSONResponse
+    return JSONResponse({
+        "threshold_ms": SLOW_REQUEST_MS,
+        "entries": slow_requests.recent() if slow_requests is not None else [],
+    }, headers={"Cache-Control": "no-store"})
+
+
+# Sitemap / RSS：每个内容版本只生成一次，之后直接从内存发送
+SITEMAP_MAX_URLS = 50_000  # sitemaps.org 单文件上限，超过就拆成 sitemap index
+RSS_ITEMS = 20
+
+# name -> (内容版本 key, 生成结果)
+_generated: dict[str, tuple[tuple, object]] = {}
+
+
+def generated(name: str, key: tuple, build):
+    """Return ``build()`` memoised until ``key`` (store generations) changes."""
+    cached = _generated.get(name)
+    if cached is None or cached[0] != key:
+        cached = _generated[name] = (key, build())
+    return cached[1]
+
+
+def lastmod(record: Record) -> date:
+    """Sitemap ``<lastmod>``: the frontmatter date, falling back to the file mtime."""
+    return record.date or datetime.fromtimestamp(record.mtime, timezone.utc).date()
+
+
+def sitemap_validators() -> Validators:
+    posts_store.refresh()
+    digests_store.refresh()
+    return Validators(BUILD_ID, posts_store.etag, digests_store.etag,
+                      last_modified=max(BUILD_MTIME, posts_store.last_modified, digests_store.last_modified))
+
+
+def sitemap_urls() -> list[tuple[str, date | None, str, str]]:
+    """(loc, lastmod, changefreq, priority) for every public URL."""
     posts = visible_posts()
-    
+    issues = load_digests()
+    newest_post = max((lastmod(p) for p in posts), default=None)
+    newest_issue = max((lastmod(d) for d in issues), default=None)
     urls = [
-        f"<url><loc>{SITE_URL}/</loc><changefreq>daily</changefreq><priority>1.0</priority></url>",
-        f"<url><loc>{SITE_URL}/blog</loc><changefreq>daily</changefreq><priority>0.8</priority></url>",
-        f"<url><loc>{SITE_URL}/tools</loc><changefreq>weekly</changefreq><priority>0.8</priority></url>",
-        f"<url><loc>{SITE_URL}/mcp</loc><changefreq>weekly</changefreq><priority>0.8</priority></url>",
-        f"<url><loc>{SITE_URL}/about</loc><changefreq>monthly</changefreq><priority>0.5</priority></url>",
+        (f"{SITE_URL}/", newest_post, "daily", "1.0"),
+        (f"{SITE_URL}/blog", newest_post, "daily", "0.8"),
+        (f"{SITE_URL}/tools", None, "weekly", "0.8"),
+        (f"{SITE_URL}/mcp", None, "weekly", "0.8"),
+        (f"{SITE_URL}/about", None, "monthly", "0.5"),
     ]
-    
-    for p in posts:
-        urls.append(f"<url><loc>{SITE_URL}/blog/{p['slug']}</loc><changefreq>monthly</changefreq><priority>0.6</priority></url>")
-    
-    xml = f'''<?xml version="1.0" encoding="UTF-8"?>
+    if issues:
+        urls.append((f"{SITE_URL}/digest", newest_issue, "weekly", "0.7"))
+    urls += [(f"{SITE_URL}/blog/{p.slug}", lastmod(p), "monthly", "0.6") for p in posts]
+    for name, _ in tag_index.counts():
+        tagged = tag_index.get(name)[1]
+        urls.append((f"{SITE_URL}{tag_url(name)}", max(lastmod(p) for p in tagged), "weekly", "0.4"))
+    urls += [(f"{SITE_URL}/digest/{d.slug}", lastmod(d), "monthly", "0.6") for d in issues]
+    return urls
+
+
+def _sitemap_url(loc: str, modified: date | None, changefreq: str, priority: str) -> str:
+    mod = f"<lastmod>{modified.isoformat()}</lastmod>" if modified else ""
+    return f"<url><loc>{xml_escape(loc)}</loc>{mod}<changefreq>{changefreq}</changefreq><priority>{priority}</priority></url>"
+
+
+def build_sitemaps() -> list[str]:
+    """Sitemap documents: ``[0]`` is /sitemap.xml, the rest are /sitemap-1.xml … when split."""
+    urls = sitemap_urls()
+    chunks = [urls[i:i + SITEMAP_MAX_URLS] for i in range(0, len(urls), SITEMAP_MAX_URLS)]
+    pages = [f'''<?xml version="1.0" encoding="UTF-8"?>
 <urlset xmlns="http://www.sitemaps.org/schemas/sitemap/0.9">
-{''.join(urls)}
-</urlset>'''
-    
-    from fastapi.responses import Response
-    return Response(content=xml, media_type="application/xml")
+{''.join(_sitemap_url(*u) for u in chunk)}
+</urlset>''' for chunk in chunks]
+    if len(pages) == 1:
+        return pages
 
+    entries = []
+    for n, chunk in enumerate(chunks, 1):
+        newest = max((u[1] for u in chunk if u[1]), default=None)
+        mod = f"<lastmod>{newest.isoformat()}</lastmod>" if newest else ""
+        entries.append(f"<sitemap><loc>{SITE_URL}/sitemap-{n}.xml</loc>{mod}</sitemap>")
+    index = f'''<?xml version="1.0" encoding="UTF-8"?>
+<sitemapindex xmlns="http://www.sitemaps.org/schemas/sitemap/0.9">
+{''.join(entries)}
+</sitemapindex>'''
+    return [index] + pages
 
-# RSS Feed
-@app.get("/feed.xml")
-@app.get("/rss.xml")
-async def rss_feed():
+
+def sitemaps() -> list[str]:
+    return generated("sitemap", (posts_store.generation, digests_store.generation), build_sitemaps)
+
+
+# Sitemap for SEO
+@app.get("/sitemap.xml")
+async def sitemap(request: Request):
+    validators = sitemap_validators()
+    if (cached := response_cache.lookup(request, validators)) is not None:
+        return cached
     from fastapi.responses import Response
-    posts = visible_posts()
-    
+    return response_cache.store(request, validators, Response(content=sitemaps()[0], media_type="application/xml"))
+
+
+@app.get("/sitemap-{page:int}.xml")
+async def sitemap_page(page: int, request: Request):
+    validators = sitemap_validators()
+    if (cached := response_cache.lookup(request, validators)) is not None:
+        return cached
+    docs = sitemaps()
+    # 只有一个文件时没有分片，/sitemap.xml 就是全部
+    if len(docs) == 1 or not 1 <= page < len(docs):
+        raise HTTPException(status_code=404, detail="Sitemap not found")
+    from fastapi.responses import Response
+    return response_cache.store(request, validators, Response(content=docs[page], media_type="application/xml"))
+
+
+def build_rss() -> str:
     items = []
-    for p in posts[:20]:  # Last 20 posts
-        pub_date = ""
-        if p.get("date"):
-            try:
-                d = p["date"]
-                if isinstance(d, str):
-                    d = datetime.strptime(d, "%Y-%m-%d")
-                pub_date = d.strftime("%a, %d %b %Y 00:00:00 GMT")
-            except:
-                pub_date = ""
-        
+    for p in visible_posts()[:RSS_ITEMS]:
+        published = p.date
+        pub_date = published.strftime("%a, %d %b %Y 00:00:00 GMT") if published else ""
+
         # Escape XML special chars
-        title = str(p.get("title", "")).replace("&", "&amp;").replace("<", "&lt;").replace(">", "&gt;")
-        desc = str(p.get("description", "")).replace("&", "&amp;").replace("<", "&lt;").replace(">", "&gt;")
-        
+        title = xml_escape(p.title)
+        desc = xml_escape(p.description)
+
         items.append(f"""
     <item>
       <title>{title}</title>
-      <link>{SITE_URL}/blog/{p['slug']}</link>
+      <link>{SITE_URL}/blog/{p.slug}</link>
       <description>{desc}</description>
-      <guid>{SITE_URL}/blog/{p['slug']}</guid>
+      <guid>{SITE_URL}/blog/{p.slug}</guid>
       {f'<pubDate>{pub_date}</pubDate>' if pub_date else ''}
     </item>""")
-    
-    xml = f"""<?xml version="1.0" encoding="UTF-8"?>
+
+    return f"""<?xml version="1.0" encoding="UTF-8"?>
 <rss version="2.0" xmlns:atom="http://www.w3.org/2005/Atom">
   <channel>
     <title>{SITE_NAME}</title>
@@ -1009,14 +967,27 @@ async def rss_feed():
     {''.join(items)}
   </channel>
 </rss>"""
-    
-    return Response(content=xml, media_type="application/xml")
+
+
+# RSS Feed
+@app.get("/feed.xml")
+@app.get("/rss.xml")
+async def rss_feed(request: Request):
+    from fastapi.responses import Response
+    validators = corpus_validators()
+    if (cached := response_cache.lookup(request, validators)) is not None:
+        return cached
+    xml = generated("rss", (posts_store.generation,), build_rss)
+    return response_cache.store(request, validators, Response(content=xml, media_type="application/xml"))
 
 
 @app.get("/robots.txt")
-async def robots():
+async def robots(request: Request):
     from fastapi.responses import PlainTextResponse
-    return PlainTextResponse(f"""User-agent: *
+    validators = static_validators()
+    if (cached := response_cache.lookup(request, validators)) is not None:
+        return cached
+    return response_cache.store(request, validators, PlainTextResponse(f"""User-agent: *
 Allow: /
 
 User-agent: GPTBot
@@ -1029,14 +1000,11 @@ User-agent: Google-Extended
 Allow: /
 
 Sitemap: {SITE_URL}/sitemap.xml
-""")
+"""))
 
 
 # llms.txt - AI agent friendly (llmstxt.org standard)
-@app.get("/llms.txt")
-async def llms_txt():
-    from fastapi.responses import PlainTextResponse
-    return PlainTextResponse("""# IndieKit
+LLMS_TXT = """# IndieKit
 
 > Open-source developer tools that make developers' lives easier.
 
@@ -1092,83 +1060,218 @@ GitHub: https://github.com/indiekitai
 ## Blog
 
 Latest posts at https://indiekit.ai/blog
-""")
+"""
 
 
-# llms-full.txt - 完整内容给 AI 抓取
-@app.get("/llms-full.txt")
-async def llms_full():
+@app.get("/llms.txt")
+async def llms_txt(request: Request):
     from fastapi.responses import PlainTextResponse
-    posts = visible_posts()
-    
-    content = f"""# IndieKit.ai - 完整内容
+    validators = corpus_validators()
+    if (cached := response_cache.lookup(request, validators)) is not None:
+        return cached
+    # 每篇文章链到原始 markdown（/blog/{slug}.md），抓取方不必解析 HTML 或 JSON
+    posts = "".join(f"- [{p.title}]({SITE_URL}/blog/{p.slug}.md): {p.description}\n" for p in visible_posts())
+    return response_cache.store(request, validators, PlainTextResponse(
+        f"{LLMS_TXT}\n### Posts (Markdown)\n\n{posts}"))
+
+
+# llms-full.txt - 完整内容给 AI 抓取
+LLMS_FULL_HEADER = """# IndieKit.ai - 完整内容
 
 > 独立开发者的 AI 工具包
 
 ## 所有博客文章
 
 """
+
+# (文章列表快照, 编码后的分段)：每个内容版本只编码一次，分段为 None 表示全文超过响应缓存预算
+_llms_full: tuple[list[Post], list[bytes] | None] | None = None
+
+
+def llms_full_chunks(posts: list[Post]) -> Iterator[bytes]:
+    """llms-full.txt body: the header, then one encoded section per post."""
+    yield LLMS_FULL_HEADER.encode()
     for p in posts:
-        content += f"""
-### {p['title']}
+        yield f"""
+### {p.title}
 
-日期: {p['date']}
-标签: {', '.join(p['tags']) if p['tags'] else '无'}
-链接: {SITE_URL}/blog/{p['slug']}
+日期: {p.iso_date}
+标签: {', '.join(p.tags) if p.tags else '无'}
+链接: {SITE_URL}/blog/{p.slug}
 
-{p['content']}
+{posts_store.body(p)}
 
 ---
-"""
-    
-    return PlainTextResponse(content)
+""".encode()
+
+
+def llms_full_sections(posts: list[Post]) -> list[bytes] | None:
+    """``llms_full_chunks(posts)`` taken once per snapshot, or None if it exceeds the response cache budget.
+
+    长度和发送的字节出自同一份分段，Content-Length 不会和正文对不上；
+    超过预算时不整体保留，改为不带长度的分块流式输出。
+    """
+    global _llms_full
+    cached = _llms_full
+    if cached is None or cached[0] is not posts:
+        sections, size = [], 0
+        for chunk in llms_full_chunks(posts):
+            size += len(chunk)
+            if size > response_cache.cache.max_bytes:
+                sections = None
+                break
+            sections.append(chunk)
+        cached = _llms_full = (posts, sections)
+    return cached[1]
+
+
+@app.get("/llms-full.txt")
+async def llms_full(request: Request):
+    validators = corpus_validators()
+    if (cached := response_cache.lookup(request, validators)) is not None:
+        return cached
+    # 分段按内容版本共享，不按请求各拼一份；内容变更后第一次要把全文过一遍，放到线程里，不堵事件循环
+    posts = visible_posts()
+    sections = await asyncio.to_thread(llms_full_sections, posts)
+    if sections is None:
+        # 超过预算：边读边发，正文可能跨内容版本，压缩结果不进缓存
+        return response_cache.stream(request, validators, lambda: llms_full_chunks(posts),
+                                     "text/plain; charset=utf-8", store=False)
+    return response_cache.stream(request, validators, lambda: iter(sections),
+                                 "text/plain; charset=utf-8", sum(map(len, sections)))
 
 
 # --- AI Agent friendly APIs ---
 
 @app.get("/api/tools")
-async def api_tools():
-    return {"tools": TOOLS_DATA}
+async def api_tools(request: Request):
+    from fastapi.responses import JSONResponse
+    validators = static_validators()
+    if (cached := response_cache.lookup(request, validators)) is not None:
+        return cached
+    return response_cache.store(request, validators, JSONResponse({"tools": TOOLS_DATA}))
+
+
+def encode_cursor(post: Post) -> str:
+    # 列表按文件名（日期前缀 + slug）降序，slug 本身就是排序键
+    return base64.urlsafe_b64encode(post.slug.encode()).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str) -> str:
+    try:
+        slug = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4)).decode()
+    except (binascii.Error, UnicodeDecodeError):
+        slug = ""
+    if not slug:
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+    return slug
 
 
 @app.get("/api/blog")
-async def api_blog():
-    posts = visible_posts()
-    return {"posts": [
-        {"slug": p["slug"], "title": p["title"], "date": str(p["date"]), "tags": p["tags"], "url": f"{SITE_URL}/blog/{p['slug']}"}
+async def api_blog(request: Request, cursor: str | None = None, tag: str | None = None,
+                   limit: int = Query(API_PAGE_SIZE, ge=1, le=API_PAGE_SIZE_MAX)):
+    from fastapi.responses import JSONResponse
+    validators = corpus_validators()
+    if (cached := response_cache.lookup(request, validators)) is not None:
+        return cached
+    if tag is None:
+        all_posts = visible_posts()
+        start = posts_store.visible_after(decode_cursor(cursor)) if cursor else 0
+        query = ""
+    else:
+        if (group := tag_index.get(tag)) is None:
+            raise HTTPException(status_code=404, detail="Tag not found")
+        all_posts = group[1]
+        start = tag_index.after(tag, decode_cursor(cursor)) if cursor else 0
+        query = f"tag={quote(group[0], safe='')}&"
+    posts = all_posts[start:start + limit]
+    next_url = None
+    if start + limit < len(all_posts) and posts:
+        next_url = f"{SITE_URL}/api/blog?{query}cursor={encode_cursor(posts[-1])}&limit={limit}"
+    return response_cache.store(request, validators, JSONResponse({"posts": [
+        {"slug": p.slug, "title": p.title, "date": p.iso_date, "tags": p.tags, "url": f"{SITE_URL}/blog/{p.slug}"}
         for p in posts
-    ]}
+    ], "next": next_url}))
+
+
+@app.get("/api/tags")
+async def api_tags(request: Request):
+    from fastapi.responses import JSONResponse
+    validators = corpus_validators()
+    if (cached := response_cache.lookup(request, validators)) is not None:
+        return cached
+    return response_cache.store(request, validators, JSONResponse({"tags": [
+        {"name": name, "count": count, "url": f"{SITE_URL}{tag_url(name)}",
+         "api": f"{SITE_URL}/api/blog?tag={quote(name, safe='')}"}
+        for name, count in tag_index.counts()
+    ]}))
 
 
 @app.get("/api/blog/{slug}")
-async def api_blog_post(slug: str):
-    posts = load_posts()
-    post = next((p for p in posts if p["slug"] == slug), None)
+async def api_blog_post(slug: str, request: Request):
+    from fastapi.responses import JSONResponse
+    post = posts_store.get(slug)
     if not post:
         raise HTTPException(status_code=404, detail="Post not found")
-    return {
-        "slug": post["slug"],
-        "title": post["title"],
-        "date": str(post["date"]),
-        "tags": post["tags"],
-        "description": post["description"],
-        "content_markdown": post["content"],
+    versions = post_alternates(post)
+    validators = Validators(BUILD_ID, post.digest, *(f"{v.slug}:{v.digest}" for v in versions),
+                            last_modified=max([BUILD_MTIME, post.mtime] + [v.mtime for v in versions]))
+    if (cached := response_cache.lookup(request, validators)) is not None:
+        return cached
+    return response_cache.store(request, validators, JSONResponse({
+        "slug": post.slug,
+        "title": post.title,
+        "date": post.iso_date,
+        "tags": post.tags,
+        "description": post.description,
+        "content_markdown": posts_store.body(post),
         "url": f"{SITE_URL}/blog/{slug}",
-    }
+        "lang": post.lang,
+        "alternates": [{"lang": v.lang, "slug": v.slug, "url": f"{SITE_URL}/blog/{v.slug}"}
+                       for v in versions if v is not post],
+    }))
+
+
+@app.get("/api/search")
+async def api_search(request: Request, q: str = Query(..., min_length=1, max_length=200),
+                     limit: int = Query(10, ge=1, le=SEARCH_LIMIT_MAX)):
+    from fastapi.responses import JSONResponse
+    validators = corpus_validators()
+    if (not_modified := validators.not_modified(request)) is not None:
+        return not_modified
+    await sync_search_index()
+    total, results = search_posts(q, limit)
+    return validators.apply(JSONResponse({"query": q, "total": total, "results": results}))
 
 
 @app.get("/.well-known/ai-plugin.json")
-async def ai_plugin():
-    return {
+async def ai_plugin(request: Request):
+    from fastapi.responses import JSONResponse
+    validators = static_validators()
+    if (cached := response_cache.lookup(request, validators)) is not None:
+        return cached
+    return response_cache.store(request, validators, JSONResponse({
         "schema_version": "v1",
         "name": "IndieKit",
         "description": "Open-source developer tools with MCP support",
         "api": {"url": f"{SITE_URL}/api"},
         "logo_url": f"{SITE_URL}/logo.png",
         "contact_email": "hello@indiekit.ai",
-    }
+    }))
+
+
+startup["import_ms"] = round((time.perf_counter() - _IMPORT_STARTED) * 1000, 1)
 
 
 if __name__ == "__main__":
+    if sys.argv[1:2] == ["export"]:
+        # python -m src.main export out/ —— 预渲染整站到静态文件
+        from .export import main as export_main
+        sys.exit(export_main(sys.argv[2:]))
+    if sys.argv[1:2] == ["bundle"]:
+        # python -m src.main bundle content.bundle —— 把 content/ 编译成一个可 mmap 的内容包
+        from .bundle import main as bundle_main
+        sys.exit(bundle_main(sys.argv[2:]))
+
     import uvicorn
     uvicorn.run(app, host="0.0.0.0", port=8085)
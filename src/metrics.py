@@ -0,0 +1,238 @@
+"""
+Per-request phase timings: ``Server-Timing`` headers, Prometheus metrics and a
+slow-request log.
+
+Code marks expensive steps with ``with phase("render"): ...``. Outside an
+instrumented request (no ``TimingMiddleware``, background threads, the
+static export) ``phase()`` returns a shared no-op context manager, so the
+instrumentation costs one ContextVar lookup.
+"""
+import json
+import logging
+import time
+from bisect import bisect_left
+from collections import deque
+from contextlib import nullcontext
+from contextvars import ContextVar
+from datetime import datetime, timezone
+
+from .asgi import INTERNAL
+
+logger = logging.getLogger(__name__)
+
+# 当前请求的 {阶段: 累计秒数}（进行中的阶段为 None）；不在请求里时为 None
+_timings: ContextVar[dict[str, float | None] | None] = ContextVar("timings", default=None)
+_NOOP = nullcontext()
+
+# 秒；覆盖从缓存命中（亚毫秒）到整站 llms-full.txt（秒级）
+BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0)
+
+
+class _Phase:
+    __slots__ = ("name", "timings", "before", "start")
+
+    def __init__(self, name: str, timings: dict[str, float | None]):
+        self.name = name
+        self.timings = timings
+
+    def __enter__(self):
+        # 计时期间置为 None：嵌套的同名阶段（扫描时监听器读正文）不会重复计时
+        self.before = self.timings.get(self.name) or 0.0
+        self.timings[self.name] = None
+        self.start = time.perf_counter()
+
+    def __exit__(self, *exc):
+        # 同名阶段（如多次读正文）累加
+        self.timings[self.name] = self.before + time.perf_counter() - self.start
+
+
+def phase(name: str):
+    """Context manager timing one phase of the current request (no-op outside a request)."""
+    timings = _timings.get()
+    if timings is None or (name in timings and timings[name] is None):
+        return _NOOP
+    return _Phase(name, timings)
+
+
+class Histogram:
+    """Cumulative-bucket histogram in the Prometheus sense."""
+
+    __slots__ = ("counts", "sum", "count")
+
+    def __init__(self):
+        self.counts = [0] * (len(BUCKETS) + 1)
+        self.sum = 0.0
+        self.count = 0
+
+    def observe(self, value: float) -> None:
+        self.counts[bisect_left(BUCKETS, value)] += 1
+        self.sum += value
+        self.count += 1
+
+    def lines(self, name: str, labels: str) -> list[str]:
+        out = []
+        cumulative = 0
+        sep = "," if labels else ""
+        for bound, n in zip(BUCKETS + (float("inf"),), self.counts):
+            cumulative += n
+            le = "+Inf" if bound == float("inf") else repr(bound)
+            out.append(f'{name}_bucket{{{labels}{sep}le="{le}"}} {cumulative}')
+        out.append(f"{name}_sum{{{labels}}} {self.sum!r}")
+        out.append(f"{name}_count{{{labels}}} {self.count}")
+        return out
+
+
+def _label(value: str) -> str:
+    return value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+class Metrics:
+    """Request counts, latency / phase histograms and bytes sent, keyed by route template.
+
+    路由按模板（``/blog/{slug}``）而不是实际路径计数，序列数量有上限。
+    只在事件循环线程里更新，不加锁。
+    """
+
+    def __init__(self):
+        self.requests: dict[tuple[str, str, int], int] = {}
+        self.bytes_sent: dict[str, int] = {}
+        self.latency: dict[str, Histogram] = {}
+        self.phases: dict[tuple[str, str], Histogram] = {}
+
+    def observe(self, method: str, route: str, status: int, seconds: float, sent: int,
+                timings: dict[str, float | None]) -> None:
+        key = (method, route, status)
+        self.requests[key] = self.requests.get(key, 0) + 1
+        self.bytes_sent[route] = self.bytes_sent.get(route, 0) + sent
+        if (latency := self.latency.get(route)) is None:
+            latency = self.latency[route] = Histogram()
+        latency.observe(seconds)
+        for name, spent in timings.items():
+            if spent is None:
+                continue
+            if (hist := self.phases.get((route, name))) is None:
+                hist = self.phases[(route, name)] = Histogram()
+            hist.observe(spent)
+
+    def render(self) -> str:
+        """Prometheus text exposition format (version 0.0.4)."""
+        out = ["# HELP indiekit_http_requests_total HTTP requests by method, route template and status.",
+               "# TYPE indiekit_http_requests_total counter"]
+        for (method, route, status), n in sorted(self.requests.items()):
+            out.append(f'indiekit_http_requests_total{{method="{method}",route="{_label(route)}",'
+                       f'status="{status}"}} {n}')
+        out += ["# HELP indiekit_http_response_bytes_total Response body bytes sent (after compression).",
+                "# TYPE indiekit_http_response_bytes_total counter"]
+        for route, n in sorted(self.bytes_sent.items()):
+            out.append(f'indiekit_http_response_bytes_total{{route="{_label(route)}"}} {n}')
+        out += ["# HELP indiekit_http_request_duration_seconds Time from request to last body byte.",
+                "# TYPE indiekit_http_request_duration_seconds histogram"]
+        for route, hist in sorted(self.latency.items()):
+            out += hist.lines("indiekit_http_request_duration_seconds", f'route="{_label(route)}"')
+        out += ["# HELP indiekit_phase_duration_seconds Time per request spent in a phase "
+                "(parse, render, jsonld, index, search, assemble, cache, compress).",
+                "# TYPE indiekit_phase_duration_seconds histogram"]
+        for (route, name), hist in sorted(self.phases.items()):
+            out += hist.lines("indiekit_phase_duration_seconds", f'route="{_label(route)}",phase="{name}"')
+        return "\n".join(out) + "\n"
+
+
+class SlowRequestLog:
+    """Requests slower than ``threshold`` seconds: one JSON log line each, the newest ``size`` kept in memory.
+
+    阶段耗时里 ``parse`` 是内容加载，``render`` 是 markdown 转换，``assemble`` 是页面拼装。
+    """
+
+    def __init__(self, threshold: float, size: int = 100):
+        self.threshold = threshold
+        self.entries: deque[dict] = deque(maxlen=size)
+
+    def observe(self, scope, route: str, status: int, seconds: float, sent: int,
+                timings: dict[str, float | None]) -> None:
+        if seconds < self.threshold:
+            return
+        params = scope.get("path_params") or {}
+        entry = {
+            "event": "slow_request",
+            "time": datetime.now(timezone.utc).isoformat(timespec="milliseconds"),
+            "method": scope["method"],
+            "route": route,
+            "path": scope["path"],
+            "slug": params.get("slug") or params.get("tag"),
+            "status": status,
+            "bytes": sent,
+            "total_ms": round(seconds * 1000, 3),
+            "phases_ms": {name: round(spent * 1000, 3) for name, spent in timings.items() if spent is not None},
+        }
+        self.entries.append(entry)
+        # 整行就是一个 JSON 对象，日志系统可以直接解析
+        logger.warning("%s", json.dumps(entry, ensure_ascii=False))
+
+    def recent(self) -> list[dict]:
+        """Logged entries, newest first."""
+        return list(reversed(self.entries))
+
+
+def _route_label(scope) -> str:
+    """Metrics label for a finished request: route template, mount path, or ``unmatched``."""
+    route = scope.get("route")
+    if route is not None:
+        return route.path
+    # Mount 匹配时 starlette 才写 app_root_path，root_path 比它多出的部分就是挂载路径（/static）
+    if "app_root_path" in scope:
+        return scope["root_path"][len(scope["app_root_path"]):] or "/"
+    return "unmatched"
+
+
+class TimingMiddleware:
+    """ASGI middleware: collects phase timings per request.
+
+    ``server_timing`` adds a ``Server-Timing`` header (phases finished before the
+    headers went out, plus ``total``); ``metrics`` records the request once the
+    last body byte is sent, and so does ``slow_log`` if it took long enough.
+    缓存的响应字节里不含这个头，每次命中都是当次的耗时。进程内自发的请求
+    （``scope[INTERNAL]``，导出和预热）直接放行，不计时也不记录。
+    """
+
+    def __init__(self, app, metrics: Metrics | None = None, server_timing: bool = True,
+                 slow_log: SlowRequestLog | None = None):
+        self.app = app
+        self.metrics = metrics
+        self.server_timing = server_timing
+        self.slow_log = slow_log
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or scope.get(INTERNAL):
+            return await self.app(scope, receive, send)
+        timings: dict[str, float | None] = {}
+        token = _timings.set(timings)
+        start = time.perf_counter()
+        status = 500
+        sent = 0
+
+        async def send_timed(message):
+            nonlocal status, sent
+            if message["type"] == "http.response.start":
+                status = message["status"]
+                if self.server_timing:
+                    # 流式响应发头时还在进行的阶段不写进头，只进 metrics
+                    entries = [f"{name};dur={spent * 1000:.3f}" for name, spent in timings.items()
+                               if spent is not None]
+                    entries.append(f"total;dur={(time.perf_counter() - start) * 1000:.3f}")
+                    message["headers"] = [*message.get("headers", ()),
+                                          (b"server-timing", ", ".join(entries).encode())]
+            elif message["type"] == "http.response.body":
+                sent += len(message.get("body", b""))
+                if not message.get("more_body", False):
+                    elapsed = time.perf_counter() - start
+                    route = _route_label(scope)
+                    if self.metrics is not None:
+                        self.metrics.observe(scope["method"], route, status, elapsed, sent, dict(timings))
+                    if self.slow_log is not None:
+                        self.slow_log.observe(scope, route, status, elapsed, sent, timings)
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_timed)
+        finally:
+            _timings.reset(token)
@@ -0,0 +1,232 @@
+"""
+On-demand and continuous sampling profiles of live requests.
+
+A background thread samples the Python stacks of the event-loop thread and
+the markdown worker threads every ``interval`` seconds while one request is
+in flight, and the samples are written as a speedscope profile (open it at
+https://www.speedscope.app) or as collapsed stacks (``flamegraph.pl`` /
+inferno). Sampling instead of ``cProfile``: the overhead doesn't grow with the
+number of calls, worker threads are covered, and real stacks survive.
+
+- On demand: a request carrying ``X-Profile: <PROFILE_TOKEN>`` is profiled
+  and answered with the profile instead of the page (``X-Profile-Status``
+  has the route's own status). ``X-Profile-Format: collapsed`` selects the
+  text format.
+- Continuous: every ``PROFILE_SAMPLE_EVERY``-th request is profiled into a
+  rolling ring of the newest ``PROFILE_KEEP`` files in ``PROFILE_DIR``.
+
+Only one request is profiled at a time; the event loop interleaves requests,
+so concurrent requests show up in the loop thread's stacks too.
+"""
+import asyncio
+import hmac
+import itertools
+import json
+import logging
+import os
+import re
+import sys
+import threading
+import time
+from collections import Counter
+from pathlib import Path
+
+from .asgi import INTERNAL
+
+logger = logging.getLogger(__name__)
+
+FORMATS = {"speedscope": ("json", "application/json"), "collapsed": ("txt", "text/plain; charset=utf-8")}
+
+# 工作线程空闲时停在这些文件里（等任务），这类样本不计入
+_IDLE_FILES = ("threading.py", "queue.py", "thread.py")
+
+Frame = tuple[str, str, int]  # (qualname, filename, firstlineno)
+
+
+class Sampler:
+    """Samples stacks of the given thread plus ``markdown*`` worker threads until ``stop()``."""
+
+    def __init__(self, thread_id: int, interval: float = 0.001, worker_prefix: str = "markdown"):
+        self.thread_id = thread_id
+        self.interval = interval
+        self.worker_prefix = worker_prefix
+        # (线程名, 栈) -> 累计秒数；栈从根到叶
+        self.stacks: Counter[tuple[str, tuple[Frame, ...]]] = Counter()
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, name="profiler", daemon=True)
+
+    def start(self) -> "Sampler":
+        # 采样线程要拿到 GIL 才能采样：采样期间把切换间隔（默认 5ms）降到采样间隔
+        self._switch_interval = sys.getswitchinterval()
+        sys.setswitchinterval(min(self._switch_interval, self.interval))
+        self._thread.start()
+        return self
+
+    def stop(self) -> "Sampler":
+        self._stop.set()
+        self._thread.join()
+        sys.setswitchinterval(self._switch_interval)
+        return self
+
+    def _targets(self) -> dict[int, str]:
+        targets = {self.thread_id: "event-loop"}
+        for t in threading.enumerate():
+            if t.name.startswith(self.worker_prefix) and t.ident is not None:
+                targets[t.ident] = t.name
+        return targets
+
+    def _run(self) -> None:
+        last = time.perf_counter()
+        while not self._stop.wait(self.interval):
+            now = time.perf_counter()
+            # 按真实间隔加权：GIL 让采样线程迟到时不会少算
+            weight, last = now - last, now
+            frames = sys._current_frames()
+            for ident, name in self._targets().items():
+                frame = frames.get(ident)
+                if frame is None:
+                    continue
+                if ident != self.thread_id and frame.f_code.co_filename.endswith(_IDLE_FILES):
+                    continue
+                stack = []
+                while frame is not None:
+                    code = frame.f_code
+                    stack.append((code.co_qualname, code.co_filename, code.co_firstlineno))
+                    frame = frame.f_back
+                self.stacks[(name, tuple(reversed(stack)))] += weight
+
+    def collapsed(self) -> str:
+        """Brendan Gregg's collapsed-stack format, weights in microseconds."""
+        lines = []
+        for (thread, stack), seconds in sorted(self.stacks.items()):
+            frames = ";".join(f"{name} ({os.path.basename(file)}:{line})" for name, file, line in stack)
+            lines.append(f"{thread};{frames} {max(1, round(seconds * 1e6))}")
+        return "\n".join(lines) + "\n"
+
+    def speedscope(self, name: str) -> str:
+        """A speedscope file with one sampled profile per thread."""
+        index: dict[Frame, int] = {}
+        frames = []
+        by_thread: dict[str, tuple[list[list[int]], list[float]]] = {}
+        for (thread, stack), seconds in self.stacks.items():
+            ids = []
+            for frame in stack:
+                if frame not in index:
+                    index[frame] = len(frames)
+                    frames.append({"name": frame[0], "file": frame[1], "line": frame[2]})
+                ids.append(index[frame])
+            samples, weights = by_thread.setdefault(thread, ([], []))
+            samples.append(ids)
+            weights.append(round(seconds * 1000, 3))
+        return json.dumps({
+            "$schema": "https://www.speedscope.app/file-format-schema.json",
+            "name": name,
+            "exporter": "indiekit-site",
+            "activeProfileIndex": 0,
+            "shared": {"frames": frames},
+            "profiles": [{
+                "type": "sampled",
+                "name": f"{name} [{thread}]",
+                "unit": "milliseconds",
+                "startValue": 0,
+                "endValue": round(sum(weights), 3),
+                "samples": samples,
+                "weights": weights,
+            } for thread, (samples, weights) in by_thread.items()],
+        })
+
+    def render(self, fmt: str, name: str) -> str:
+        return self.collapsed() if fmt == "collapsed" else self.speedscope(name)
+
+
+class ProfileRing:
+    """The newest ``keep`` profile files in ``directory``; older ones are deleted on write."""
+
+    def __init__(self, directory: Path, keep: int = 100):
+        self.directory = directory
+        self.keep = keep
+
+    def save(self, label: str, data: str, fmt: str) -> str:
+        self.directory.mkdir(parents=True, exist_ok=True)
+        slug = re.sub(r"[^A-Za-z0-9._-]+", "_", label).strip("_")[:80] or "root"
+        name = f"{time.strftime('%Y%m%dT%H%M%S')}-{time.time_ns() % 1_000_000_000:09d}-{slug}.{FORMATS[fmt][0]}"
+        tmp = self.directory / f".{name}.tmp"
+        tmp.write_text(data, encoding="utf-8")
+        os.replace(tmp, self.directory / name)
+        # 文件名以时间开头，字典序即时间序
+        files = sorted(p for p in self.directory.iterdir() if not p.name.startswith("."))
+        for old in files[:-self.keep] if self.keep > 0 else files:
+            old.unlink(missing_ok=True)
+        return name
+
+
+class ProfilingMiddleware:
+    """ASGI middleware for on-demand (secret header) and 1-in-N continuous profiling."""
+
+    def __init__(self, app, ring: ProfileRing, token: str = "", sample_every: int = 0, interval: float = 0.001,
+                 fmt: str = "speedscope"):
+        self.app = app
+        self.ring = ring
+        self.token = token.encode()
+        self.sample_every = sample_every
+        self.interval = interval
+        self.fmt = fmt
+        self._counter = itertools.count(1)
+        self._busy = threading.Lock()
+
+    async def __call__(self, scope, receive, send):
+        # 预热这类进程内请求不占采样名额
+        if scope["type"] != "http" or scope.get(INTERNAL):
+            return await self.app(scope, receive, send)
+        headers = dict(scope["headers"])
+        on_demand = bool(self.token) and hmac.compare_digest(headers.get(b"x-profile", b""), self.token)
+        sampled = not on_demand and self.sample_every > 0 and next(self._counter) % self.sample_every == 0
+        if not (on_demand or sampled):
+            return await self.app(scope, receive, send)
+        if not self._busy.acquire(blocking=False):
+            if on_demand:
+                return await _respond(send, 429, b"profiler busy\n", "text/plain; charset=utf-8")
+            return await self.app(scope, receive, send)
+
+        label = f"{scope['method']} {scope['path']}"
+        fmt = headers.get(b"x-profile-format", b"").decode() if on_demand else ""
+        fmt = fmt if fmt in FORMATS else self.fmt
+        try:
+            sampler = Sampler(threading.get_ident(), self.interval).start()
+            if on_demand:
+                status = 500
+
+                async def capture(message):
+                    # 原响应丢弃，只保留状态码
+                    nonlocal status
+                    if message["type"] == "http.response.start":
+                        status = message["status"]
+
+                try:
+                    await self.app(scope, receive, capture)
+                finally:
+                    sampler.stop()
+                data = sampler.render(fmt, label)
+                name = await asyncio.to_thread(self.ring.save, label, data, fmt)
+                return await _respond(send, 200, data.encode(), FORMATS[fmt][1],
+                                      [(b"x-profile-status", str(status).encode()), (b"x-profile-id", name.encode()),
+                                       (b"cache-control", b"no-store")])
+            try:
+                await self.app(scope, receive, send)
+            finally:
+                sampler.stop()
+            try:
+                await asyncio.to_thread(self.ring.save, label, sampler.render(fmt, label), fmt)
+            except OSError:
+                # 响应已经发出，写盘失败只记日志
+                logger.exception("failed to store profile in %s", self.ring.directory)
+        finally:
+            self._busy.release()
+
+
+async def _respond(send, status: int, body: bytes, content_type: str,
+                   extra: list[tuple[bytes, bytes]] = ()) -> None:
+    await send({"type": "http.response.start", "status": status,
+                "headers": [(b"content-type", content_type.encode()), (b"content-length", str(len(body)).encode()),
+                            *extra]})
+    await send({"type": "http.response.body", "body": body})
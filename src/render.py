@@ -0,0 +1,88 @@
+"""
+Markdown → HTML rendering with a content-addressed cache.
+"""
+import asyncio
+import hashlib
+import threading
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import TYPE_CHECKING
+
+from .cache import LRUCache
+from .metrics import phase
+
+if TYPE_CHECKING:
+    import markdown
+
+MARKDOWN_EXTENSIONS = ['fenced_code', 'tables', 'toc']
+
+
+class MarkdownRenderer:
+    """Convert markdown to HTML, caching results by content hash + extension config.
+
+    ``markdown.Markdown`` 实例有内部状态（TOC id、reset()），不能跨线程共享：
+    每个工作线程持有自己的实例，转换在有界线程池里执行，不阻塞事件循环。
+    """
+
+    def __init__(self, extensions: list[str], cache_bytes: int, max_workers: int = 4):
+        self.extensions = list(extensions)
+        # 扩展配置参与缓存 key，改扩展列表后旧结果自然失效
+        self._config_key = ("|".join(self.extensions) + "\0").encode()
+        self._local = threading.local()
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="markdown")
+        # 同一内容的并发 miss 只转换一次
+        self._inflight: dict[str, Future] = {}
+        self._inflight_lock = threading.Lock()
+        self.cache = LRUCache(cache_bytes)
+
+    def cache_key(self, text: str) -> str:
+        return hashlib.sha256(self._config_key + text.encode()).hexdigest()
+
+    def _markdown(self) -> "markdown.Markdown":
+        md = getattr(self._local, "md", None)
+        if md is None:
+            # markdown 及其扩展只有渲染正文的路由才需要：第一次转换时再导入
+            import markdown
+            md = self._local.md = markdown.Markdown(extensions=self.extensions)
+        return md
+
+    def _convert(self, text: str) -> str:
+        md = self._markdown()
+        md.reset()
+        return md.convert(text)
+
+    def convert(self, text: str) -> str:
+        """Render synchronously in the calling thread (thread-safe)."""
+        with phase("render"):
+            key = self.cache_key(text)
+            html = self.cache.get(key)
+            if html is None:
+                html = self._convert(text)
+                self.cache.put(key, html)
+        return html
+
+    async def render(self, text: str) -> str:
+        """Render on the worker pool; cache hits return without leaving the event loop."""
+        with phase("render"):
+            key = self.cache_key(text)
+            html = self.cache.get(key)
+            if html is not None:
+                return html
+
+            with self._inflight_lock:
+                future = self._inflight.get(key)
+                if future is None:
+                    future = self._executor.submit(self._convert_and_store, key, text)
+                    self._inflight[key] = future
+            return await asyncio.wrap_future(future)
+
+    def _convert_and_store(self, key: str, text: str) -> str:
+        try:
+            html = self._convert(text)
+            self.cache.put(key, html)
+            return html
+        finally:
+            with self._inflight_lock:
+                self._inflight.pop(key, None)
+
+    def shutdown(self) -> None:
+        self._executor.shutdown(wait=False, cancel_futures=True)
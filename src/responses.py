@@ -0,0 +1,267 @@
+"""
+HTTP caching helpers: ETag / Last-Modified validators, conditional GET and a
+cache of encoded (identity / gzip / brotli) response bodies.
+"""
+import gzip
+import hashlib
+import threading
+import zlib
+from collections import OrderedDict
+from email.utils import formatdate, parsedate_to_datetime
+from typing import Callable, Iterable, Iterator
+
+from fastapi import Request, Response
+from fastapi.responses import StreamingResponse
+
+from .cache import LRUCache
+from .metrics import phase
+
+try:
+    import brotli
+except ImportError:  # 可选依赖：pip install brotli，缺失时只提供 gzip
+    brotli = None
+
+# 按偏好排序的可用压缩编码
+ENCODINGS = ("br", "gzip") if brotli is not None else ("gzip",)
+
+# 带校验器的响应一律要求重新验证：避免浏览器按 Last-Modified 启发式缓存出旧页面
+CACHE_CONTROL = "no-cache"
+
+# 记住多少个压缩后超过缓存预算的流式表示（之后的请求不再缓冲它们）
+OVERSIZE_KEYS = 256
+
+
+class Validators:
+    """Strong ETag plus optional Last-Modified for one representation of a route."""
+
+    __slots__ = ("etag", "last_modified")
+
+    def __init__(self, *parts: object, last_modified: float | None = None):
+        digest = hashlib.sha1("\0".join(map(str, parts)).encode()).hexdigest()[:20]
+        self.etag = f'"{digest}"'
+        self.last_modified = last_modified
+
+    def headers(self, encoding: str | None = None) -> dict[str, str]:
+        # 不同编码是不同的表示，强 ETag 需要区分："<hash>-gzip"
+        etag = f'{self.etag[:-1]}-{encoding}"' if encoding else self.etag
+        headers = {"ETag": etag, "Cache-Control": CACHE_CONTROL}
+        if self.last_modified:
+            headers["Last-Modified"] = formatdate(self.last_modified, usegmt=True)
+        return headers
+
+    def matches(self, request: Request) -> bool:
+        """True if the client's cached copy is current (If-None-Match wins over If-Modified-Since)."""
+        if_none_match = request.headers.get("if-none-match")
+        if if_none_match is not None:
+            if if_none_match.strip() == "*":
+                return True
+            # GET 用弱比较：忽略 W/ 前缀和编码后缀
+            return any(_base_etag(t) == self.etag for t in if_none_match.split(","))
+
+        if_modified_since = request.headers.get("if-modified-since")
+        if if_modified_since and self.last_modified:
+            try:
+                since = parsedate_to_datetime(if_modified_since).timestamp()
+            except (TypeError, ValueError):
+                return False
+            # HTTP 日期精确到秒
+            return int(self.last_modified) <= since
+        return False
+
+    def not_modified(self, request: Request) -> Response | None:
+        """A bodiless 304 if the request's validators match, else None."""
+        if self.matches(request):
+            return Response(status_code=304, headers=self.headers())
+        return None
+
+    def apply(self, response: Response) -> Response:
+        response.headers.update(self.headers())
+        return response
+
+
+def _base_etag(tag: str) -> str:
+    tag = tag.strip().removeprefix("W/")
+    for encoding in ENCODINGS:
+        if tag.endswith(f'-{encoding}"'):
+            return tag[:-len(encoding) - 2] + '"'
+    return tag
+
+
+def negotiate_encoding(accept_encoding: str) -> str | None:
+    """Pick br or gzip from an Accept-Encoding header (highest q wins, br on ties)."""
+    prefs: dict[str, float] = {}
+    for part in accept_encoding.split(","):
+        name, _, params = part.partition(";")
+        q = 1.0
+        params = params.strip()
+        if params.startswith("q="):
+            try:
+                q = float(params[2:])
+            except ValueError:
+                q = 0.0
+        prefs[name.strip().lower()] = q
+    best, best_q = None, 0.0
+    for encoding in ENCODINGS:
+        q = prefs.get(encoding, prefs.get("*", 0.0))
+        if q > best_q:
+            best, best_q = encoding, q
+    return best
+
+
+class ResponseCache:
+    """Encoded response bodies keyed by path + declared query parameters + ETag.
+
+    每个表示（identity / gzip / br）只压缩一次；同一 URL 内容变了 ETag 就变，
+    旧条目自然按 LRU 淘汰。命中时直接发送缓存的字节，连页面拼装都跳过。
+    """
+
+    def __init__(self, max_bytes: int, gzip_level: int = 6, brotli_quality: int = 6, min_size: int = 1024):
+        self.gzip_level = gzip_level
+        self.brotli_quality = brotli_quality
+        self.min_size = min_size
+        self.cache = LRUCache(max_bytes)
+        # 流式压缩的填充状态：正在填的键（同一键只有一个请求缓冲）和放不进缓存的键
+        self._fill_lock = threading.Lock()
+        self._filling: set[tuple] = set()
+        self._oversize: OrderedDict[tuple, None] = OrderedDict()
+
+    @staticmethod
+    def _key(request: Request, validators: Validators) -> tuple:
+        # 只取路由声明的查询参数：utm_*、fbclid 之类的追踪参数不再各占一份缓存
+        route = request.scope.get("route")
+        dependant = getattr(route, "dependant", None)
+        if dependant is None:
+            return request.url.path, request.url.query, validators.etag
+        params = request.query_params
+        query = tuple((p.alias, tuple(params.getlist(p.alias)))
+                      for p in dependant.query_params if p.alias in params)
+        return request.url.path, query, validators.etag
+
+    def lookup(self, request: Request, validators: Validators) -> Response | None:
+        """A 304 or a stored representation for this request, else None (caller renders)."""
+        with phase("cache"):
+            key = self._key(request, validators)
+            encoding = negotiate_encoding(request.headers.get("accept-encoding", ""))
+            if validators.matches(request):
+                return self._not_modified(key, validators, encoding)
+            if encoding is not None and (hit := self.cache.get(key + (encoding,))) is not None:
+                return self._response(validators, hit, encoding)
+            if (identity := self.cache.get(key + ("identity",))) is not None:
+                if encoding is not None and len(identity[1]) >= self.min_size:
+                    return self._response(validators, self._encode(key, identity, encoding), encoding)
+                return self._response(validators, identity, None)
+        return None
+
+    def store(self, request: Request, validators: Validators, response: Response) -> Response:
+        """Remember a freshly rendered 200 response and answer with the negotiated encoding."""
+        validators.apply(response)
+        response.headers["Vary"] = "Accept-Encoding"
+        if response.status_code != 200:
+            return response
+        key = self._key(request, validators)
+        identity = (response.headers["content-type"], bytes(response.body))
+        self.cache.put(key + ("identity",), identity, len(identity[1]))
+        encoding = negotiate_encoding(request.headers.get("accept-encoding", ""))
+        if encoding is None or len(identity[1]) < self.min_size:
+            return response
+        return self._response(validators, self._encode(key, identity, encoding), encoding)
+
+    def stream(self, request: Request, validators: Validators, chunks: Callable[[], Iterable[bytes]],
+               media_type: str, content_length: int | None = None, store: bool = True) -> Response:
+        """Stream a large body chunk by chunk instead of materialising it.
+
+        ``media_type`` should carry the charset (it is also the cached Content-Type).
+        ``store=False`` never caches the compressed body (chunks not tied to the ETag's content).
+
+        原文直接流式发送（已知长度时带 Content-Length）；压缩版本边压边发，
+        完成后把压缩结果放进缓存，之后同一 ETag 的请求由 ``lookup()`` 直接命中。
+        同一表示同时只有一个请求缓冲压缩结果，其余请求只压缩不缓冲；
+        缓冲超过缓存预算就丢掉并记下这个键，之后的请求不再缓冲。
+        """
+        encoding = negotiate_encoding(request.headers.get("accept-encoding", ""))
+        if content_length is not None and content_length < self.min_size:
+            encoding = None
+        headers = validators.headers(encoding)
+        headers["Vary"] = "Accept-Encoding"
+        if encoding is None:
+            if content_length is not None:
+                headers["Content-Length"] = str(content_length)
+            return StreamingResponse(chunks(), media_type=media_type, headers=headers)
+        headers["Content-Encoding"] = encoding
+        body = self._compress_stream(self._key(request, validators), chunks(), encoding, media_type, store)
+        return StreamingResponse(body, media_type=media_type, headers=headers)
+
+    def _compress_stream(self, key: tuple, chunks: Iterable[bytes], encoding: str,
+                         content_type: str, store: bool = True) -> Iterator[bytes]:
+        if encoding == "br":
+            compressor = brotli.Compressor(quality=self.brotli_quality)
+            compress, finish = compressor.process, compressor.finish
+        else:
+            # wbits=31：带 gzip 头
+            compressor = zlib.compressobj(self.gzip_level, zlib.DEFLATED, 31)
+            compress, finish = compressor.compress, compressor.flush
+        key += (encoding,)
+        with self._fill_lock:
+            fill = owner = store and key not in self._filling and key not in self._oversize
+            if owner:
+                self._filling.add(key)
+        parts: list[bytes] = []
+        size = 0
+        try:
+            for chunk in chunks:
+                if out := compress(chunk):
+                    if fill:
+                        size += len(out)
+                        fill = self._buffer(key, parts, out, size)
+                    yield out
+            tail = finish()
+            if fill and self._buffer(key, parts, tail, size + len(tail)):
+                data = b"".join(parts)
+                self.cache.put(key, (content_type, data), len(data))
+            yield tail
+        finally:
+            if owner:
+                with self._fill_lock:
+                    self._filling.discard(key)
+
+    def _buffer(self, key: tuple, parts: list[bytes], out: bytes, size: int) -> bool:
+        """Keep ``out`` for the cache unless the body has outgrown the cache budget."""
+        if size <= self.cache.max_bytes:
+            parts.append(out)
+            return True
+        parts.clear()
+        with self._fill_lock:
+            self._oversize[key] = None
+            if len(self._oversize) > OVERSIZE_KEYS:
+                self._oversize.popitem(last=False)
+        return False
+
+    def _encode(self, key: tuple, identity: tuple[str, bytes], encoding: str) -> tuple[str, bytes]:
+        content_type, body = identity
+        with phase("compress"):
+            if encoding == "br":
+                data = brotli.compress(body, quality=self.brotli_quality)
+            else:
+                data = gzip.compress(body, compresslevel=self.gzip_level, mtime=0)
+        self.cache.put(key + (encoding,), (content_type, data), len(data))
+        return content_type, data
+
+    def _not_modified(self, key: tuple, validators: Validators, encoding: str | None) -> Response:
+        # 304 带上 200 会带的 ETag（含编码后缀）、Cache-Control 和 Vary（RFC 9110 §15.4.5），
+        # 共享缓存才能按 Accept-Encoding 区分 gzip / br 版本；低于 min_size 的页面 200 不压缩
+        if encoding is not None and (identity := self.cache.get(key + ("identity",))) is not None:
+            if len(identity[1]) < self.min_size:
+                encoding = None
+        headers = validators.headers(encoding)
+        headers["Vary"] = "Accept-Encoding"
+        return Response(status_code=304, headers=headers)
+
+    @staticmethod
+    def _response(validators: Validators, entry: tuple[str, bytes], encoding: str | None) -> Response:
+        content_type, body = entry
+        headers = validators.headers(encoding)
+        headers["Content-Type"] = content_type
+        headers["Vary"] = "Accept-Encoding"
+        if encoding is not None:
+            headers["Content-Encoding"] = encoding
+        return Response(content=body, headers=headers)
@@ -0,0 +1,297 @@
+"""
+In-memory full-text search over blog posts: BM25 over an inverted index.
+
+中文（及日文、韩文）没有空格分词，按相邻两字切 bigram；英文按单词切分。
+标题、标签、摘要、正文分字段加权后合成一个词频。索引挂在 ``ContentStore``
+的变更通知上，单篇文章变化只更新这一篇的倒排项。
+"""
+import heapq
+import html
+import math
+import re
+import sys
+import threading
+from array import array
+from bisect import bisect_left
+from collections import Counter
+from typing import Callable
+
+from .content import Record
+
+_CJK = "\u3040-\u30ff\u3400-\u4dbf\u4e00-\u9fff\uf900-\ufaff\uac00-\ud7af"  # 假名、汉字、谚文
+_CJK_RUN = re.compile(f"[{_CJK}]+")
+# CJK 连续段，或不含 CJK / 下划线的单词
+_TOKEN_RE = re.compile(f"[{_CJK}]+|[^\\W_{_CJK}]+")
+
+# 各字段对词频的权重：标题和标签命中比正文重要得多
+FIELD_WEIGHTS = {"title": 3.0, "tags": 2.5, "description": 1.5, "content": 1.0}
+
+_MD_LINK = re.compile(r"!?\[([^\]]*)\]\([^)]*\)")
+_MD_NOISE = re.compile(r"```\w*|<[^>]+>|[#>*_`|~]+")
+
+
+def _runs(text: str) -> list[str]:
+    return _TOKEN_RE.findall(text.lower())
+
+
+def tokenize(text: str) -> list[str]:
+    """Index terms: lowercase words, and overlapping bigrams for CJK runs."""
+    tokens = []
+    for run in _runs(text):
+        if not _CJK_RUN.fullmatch(run):
+            tokens.append(run)
+        elif len(run) == 1:
+            tokens.append(run)
+        else:
+            tokens.extend(run[i:i + 2] for i in range(len(run) - 1))
+    return tokens
+
+
+def _field_text(record: Record, field: str) -> str:
+    value = getattr(record, field, None) or ""
+    return " ".join(map(str, value)) if isinstance(value, (list, tuple)) else str(value)
+
+
+class SearchIndex:
+    """BM25 inverted index over records; ``update`` is a ``ContentStore`` listener.
+
+    文档用整数 id，查询时分数累加进一个定长 list，比按 slug 的 dict 快一倍。
+    倒排表里直接存 BM25 的词频部分（impact），查询只剩 ``idf * impact`` 累加。
+    impact 依赖平均文档长度：增量更新沿用建表时的平均长度，偏离超过
+    ``REWEIGHT_DRIFT`` 才整体重算一次。
+
+    每个词的倒排表是按文档 id 排好序的三个平行 array（文档 id、加权词频、impact），
+    每条约 16 字节；每篇文档只记它包含的词 id，删除时按 id 二分定位。
+    ``body(record)`` 提供正文（如 ``ContentStore.body``），只在建索引时读一次，
+    索引本身不保存原文。
+
+    ``update`` 只把变更记下来，``flush`` 才真正建索引：首次建几万篇要好几秒，
+    调用方可以把 ``flush`` 放进线程；``search`` 前会先 flush 剩下的变更。
+    """
+
+    REWEIGHT_DRIFT = 0.1
+
+    def __init__(self, k1: float = 1.2, b: float = 0.75, body: Callable[[Record], str] | None = None):
+        self.k1 = k1
+        self.b = b
+        self._body = body
+        # term -> term id；词表只增不减（空倒排表留着，下次出现时复用）
+        self._term_ids: dict[str, int] = {}
+        # term id -> (文档 id, 加权词频, impact)，按文档 id 升序
+        self._postings: list[tuple[array, array, array]] = []
+        # doc id -> 所含词的 id；删除后的 id 进 _free 复用
+        self._doc_terms: list[array | None] = []
+        self._doc_len = array("d")
+        self._docs: list[Record | None] = []
+        self._ids: dict[str, int] = {}
+        self._free: list[int] = []
+        self._total_len = 0.0
+        self._norm_len = 0.0
+        self._lock = threading.Lock()
+        # slug -> 待索引的记录（None 表示删除）；单独一把锁，listener 不用等正在进行的 flush
+        self._pending: dict[str, Record | None] = {}
+        self._pending_lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self._ids)
+
+    @property
+    def pending(self) -> bool:
+        """True if ``update`` queued changes that ``flush`` has not indexed yet."""
+        return bool(self._pending)
+
+    def update(self, changed: list[Record], removed: list[Record]) -> None:
+        """Queue ``removed`` records for removal and ``changed`` ones for (re)indexing by ``flush``."""
+        with self._pending_lock:
+            for record in removed:
+                self._pending[record.slug] = None
+            for record in changed:
+                self._pending[record.slug] = record
+
+    def flush(self) -> None:
+        """Index the queued changes; hidden records are not searchable."""
+        with self._lock:
+            with self._pending_lock:
+                pending, self._pending = self._pending, {}
+            if not pending:
+                return
+            for slug, record in pending.items():
+                self._remove(slug)
+                if record is not None and not record.hidden:
+                    self._add(record)
+            avg_len = self._total_len / len(self._ids) if self._ids else 0.0
+            if abs(avg_len - self._norm_len) > self.REWEIGHT_DRIFT * self._norm_len:
+                self._reweight(avg_len)
+
+    def _impact(self, tf: float, length: float) -> float:
+        norm = self.k1 * (1 - self.b + self.b * length / self._norm_len) if self._norm_len else self.k1
+        return tf * (self.k1 + 1) / (tf + norm)
+
+    def _term_id(self, term: str) -> int:
+        term_id = self._term_ids.get(term)
+        if term_id is None:
+            term_id = self._term_ids[term] = len(self._postings)
+            self._postings.append((array("I"), array("f"), array("d")))
+        return term_id
+
+    def _add(self, record: Record) -> None:
+        terms: Counter[str] = Counter()
+        for field, weight in FIELD_WEIGHTS.items():
+            text = self._body(record) if field == "content" and self._body else _field_text(record, field)
+            for token in tokenize(text):
+                terms[token] += weight
+        length = sum(terms.values())
+        term_ids = array("I", map(self._term_id, terms))
+        if self._free:
+            doc = self._free.pop()
+            self._doc_terms[doc], self._doc_len[doc], self._docs[doc] = term_ids, length, record
+        else:
+            doc = len(self._docs)
+            self._doc_terms.append(term_ids)
+            self._doc_len.append(length)
+            self._docs.append(record)
+        self._ids[record.slug] = doc
+        self._total_len += length
+        for term_id, tf in zip(term_ids, terms.values()):
+            docs, tfs, impacts = self._postings[term_id]
+            if not docs or docs[-1] < doc:
+                # 新 id 总是最大的，直接追加
+                docs.append(doc)
+                tfs.append(tf)
+                impacts.append(self._impact(tf, length))
+            else:
+                # 复用的旧 id 插到有序位置
+                i = bisect_left(docs, doc)
+                docs.insert(i, doc)
+                tfs.insert(i, tf)
+                impacts.insert(i, self._impact(tf, length))
+
+    def _remove(self, slug: str) -> None:
+        doc = self._ids.pop(slug, None)
+        if doc is None:
+            return
+        for term_id in self._doc_terms[doc]:
+            docs, tfs, impacts = self._postings[term_id]
+            i = bisect_left(docs, doc)
+            del docs[i], tfs[i], impacts[i]
+        self._total_len -= self._doc_len[doc]
+        self._doc_terms[doc] = self._docs[doc] = None
+        self._doc_len[doc] = 0.0
+        self._free.append(doc)
+
+    def _reweight(self, avg_len: float) -> None:
+        self._norm_len = avg_len
+        doc_len = self._doc_len
+        for docs, tfs, impacts in self._postings:
+            for i, (doc, tf) in enumerate(zip(docs, tfs)):
+                impacts[i] = self._impact(tf, doc_len[doc])
+
+    def stats(self) -> dict:
+        """Size of the index: documents, distinct terms, postings and approximate bytes."""
+        self.flush()
+        with self._lock:
+            arrays = sum(a.buffer_info()[1] * a.itemsize for p in self._postings for a in p)
+            arrays += sum(a.buffer_info()[1] * a.itemsize for a in self._doc_terms if a is not None)
+            # 词表字符串与字典、列表本身；array 对象头约 64 字节
+            overhead = (sys.getsizeof(self._term_ids) + sum(map(sys.getsizeof, self._term_ids))
+                        + sys.getsizeof(self._postings) + 64 * 3 * len(self._postings)
+                        + sys.getsizeof(self._doc_terms) + 64 * len(self._doc_terms)
+                        + sys.getsizeof(self._ids) + sys.getsizeof(self._docs) + sys.getsizeof(self._doc_len))
+            return {"documents": len(self._ids), "terms": len(self._term_ids),
+                    "postings": sum(len(p[0]) for p in self._postings), "bytes": arrays + overhead}
+
+    def search(self, query: str, limit: int = 10) -> tuple[int, list[tuple[float, Record]]]:
+        """(number of matching records, top ``limit`` as (score, record)), best first."""
+        terms = set(tokenize(query))
+        if self._pending:
+            self.flush()
+        with self._lock:
+            n = len(self._ids)
+            if not n or not terms:
+                return 0, []
+            scores = [0.0] * len(self._docs)
+            for term in terms:
+                term_id = self._term_ids.get(term)
+                if term_id is None:
+                    continue
+                docs, _, impacts = self._postings[term_id]
+                if not docs:
+                    continue
+                idf = math.log(1 + (n - len(docs) + 0.5) / (len(docs) + 0.5))
+                for doc, impact in zip(docs, impacts):
+                    scores[doc] += idf * impact
+            # impact 恒为正：未命中的文档分数仍是 0
+            total = len(scores) - scores.count(0.0)
+            top = heapq.nlargest(min(limit, total), range(len(scores)), key=scores.__getitem__)
+            return total, [(scores[doc], self._docs[doc]) for doc in top]
+
+
+def _is_word(c: str) -> bool:
+    return c.isalnum()
+
+
+class Highlighter:
+    """Snippets for one query: finds the first hit and marks every query term in the excerpt.
+
+    先在小写正文上用 ``str.find`` 定位第一个命中（C 速度），正则只跑在摘录窗口上。
+    英文词要求整词匹配；CJK 同时匹配整段和 bigram，长的优先。
+    """
+
+    def __init__(self, query: str):
+        terms = set()
+        for run in _runs(query):
+            if _CJK_RUN.fullmatch(run):
+                terms.add(run)
+                terms.update(run[i:i + 2] for i in range(len(run) - 1))
+            else:
+                terms.add(run)
+        self.terms = sorted(terms, key=len, reverse=True)
+        # 纯 CJK 查询没有大小写，定位命中时不必把整篇正文转小写
+        self._casefold = any(not _CJK_RUN.fullmatch(t) for t in self.terms)
+        parts = [re.escape(t) if _CJK_RUN.fullmatch(t) else rf"(?<![^\W_]){re.escape(t)}(?![^\W_])"
+                 for t in self.terms]
+        self.pattern = re.compile("|".join(parts), re.IGNORECASE) if parts else None
+
+    def first_hit(self, text: str) -> int:
+        """Offset of the earliest query term in ``text``, or -1."""
+        lower = text.lower() if self._casefold else text
+        best = -1
+        for term in self.terms:
+            whole_word = not _CJK_RUN.fullmatch(term)
+            i = lower.find(term)
+            while i >= 0 and whole_word and (
+                    (i > 0 and _is_word(lower[i - 1])) or
+                    (i + len(term) < len(lower) and _is_word(lower[i + len(term)]))):
+                i = lower.find(term, i + 1)
+            if i >= 0 and (best < 0 or i < best):
+                best = i
+        return best
+
+    def snippet(self, text: str, width: int = 120, fallback: str = "") -> str:
+        """HTML-escaped excerpt of ``text`` around the first hit, hits wrapped in ``<mark>``.
+
+        没有命中（只命中了标题/标签）时用 ``fallback``（通常是摘要），再没有就取正文开头。
+        """
+        hit = self.first_hit(text)
+        if hit < 0 and fallback:
+            return html.escape(fallback)
+        start = max(0, hit - width // 3)
+        raw = text[start:start + width * 3]
+        window = plain_text(raw)[:width]
+        prefix = "…" if start > 0 else ""
+        suffix = "…" if start + len(raw) < len(text) or len(window) == width else ""
+
+        out = []
+        pos = 0
+        for m in (self.pattern.finditer(window) if self.pattern else ()):
+            out.append(html.escape(window[pos:m.start()]))
+            out.append(f"<mark>{html.escape(m.group())}</mark>")
+            pos = m.end()
+        out.append(html.escape(window[pos:]))
+        return prefix + "".join(out) + suffix
+
+
+def plain_text(markdown_text: str) -> str:
+    """Markdown with links unwrapped and markup characters / tags dropped, whitespace collapsed."""
+    text = _MD_LINK.sub(r"\1", markdown_text)
+    return " ".join(_MD_NOISE.sub(" ", text).split())
@@ -0,0 +1,211 @@
+"""
+Content directory watcher: inotify on Linux, stat polling elsewhere.
+
+Changed filenames are batched (debounced) and handed to per-directory
+callbacks, so a ``git pull`` touching dozens of posts becomes one update
+that re-parses only those files.
+"""
+import ctypes
+import ctypes.util
+import logging
+import os
+import select
+import struct
+import sys
+import threading
+import time
+from pathlib import Path
+from typing import Callable
+
+logger = logging.getLogger(__name__)
+
+# callback(names)：names 为变更的文件名集合；None 表示需要整目录重扫（目录新建/被替换）
+ChangeCallback = Callable[[set[str] | None], object]
+
+# <sys/inotify.h>
+IN_ATTRIB = 0x00000004
+IN_CLOSE_WRITE = 0x00000008
+IN_MOVED_FROM = 0x00000040
+IN_MOVED_TO = 0x00000080
+IN_CREATE = 0x00000100
+IN_DELETE = 0x00000200
+IN_DELETE_SELF = 0x00000400
+IN_MOVE_SELF = 0x00000800
+IN_Q_OVERFLOW = 0x00004000
+IN_IGNORED = 0x00008000
+IN_ONLYDIR = 0x01000000
+IN_NONBLOCK = os.O_NONBLOCK
+IN_CLOEXEC = os.O_CLOEXEC
+
+_WATCH_MASK = (IN_CLOSE_WRITE | IN_MOVED_FROM | IN_MOVED_TO | IN_CREATE | IN_DELETE
+               | IN_ATTRIB | IN_DELETE_SELF | IN_MOVE_SELF | IN_ONLYDIR)
+_EVENT_HEADER = struct.Struct("iIII")
+
+
+class ContentWatcher:
+    """Background thread dispatching debounced change batches per directory."""
+
+    def __init__(self, targets: dict[Path, ChangeCallback], debounce: float = 0.2,
+                 poll_interval: float = 1.0, max_delay: float = 2.0):
+        self.targets = {Path(d): cb for d, cb in targets.items()}
+        self.debounce = debounce
+        self.poll_interval = poll_interval
+        # 持续写入时最多攒这么久就必须派发一次，避免饿死
+        self.max_delay = max_delay
+        self.mode = "stopped"
+        self._stop = threading.Event()
+        self._thread: threading.Thread | None = None
+
+    def start(self, mode: str = "auto") -> "ContentWatcher":
+        """Start watching. ``mode`` is ``auto`` (inotify if available), ``inotify`` or ``poll``."""
+        inotify = None
+        if mode in ("auto", "inotify"):
+            try:
+                inotify = _Inotify()
+            except OSError as e:
+                if mode == "inotify":
+                    raise
+                logger.info("inotify unavailable (%s), falling back to polling", e)
+        if inotify is not None:
+            self.mode = "inotify"
+            # 在调用线程里挂好监听，start() 返回后的变更一定不会漏
+            wd_dirs, parents = self._add_watches(inotify)
+            run = lambda: self._run_inotify(inotify, wd_dirs, parents)  # noqa: E731
+        else:
+            self.mode = "poll"
+            run = self._run_poll
+        self._thread = threading.Thread(target=self._guard(run), name="content-watcher", daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self) -> None:
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout=5)
+        self.mode = "stopped"
+
+    def _guard(self, run: Callable[[], None]) -> Callable[[], None]:
+        def target():
+            try:
+                run()
+            except Exception:
+                logger.exception("content watcher crashed")
+        return target
+
+    def _dispatch(self, changes: dict[Path, set[str] | None]) -> None:
+        for directory, names in changes.items():
+            try:
+                self.targets[directory](names)
+            except Exception:
+                # 写了一半的 frontmatter 等解析错误：保留旧内容，下次变更再试
+                logger.exception("failed to apply content changes in %s", directory)
+
+    # --- polling ---
+
+    def _run_poll(self) -> None:
+        # 轮询模式：每轮让各目录整目录对比 stat，只有变化的文件会被重新解析
+        while not self._stop.wait(self.poll_interval):
+            self._dispatch({d: None for d in self.targets})
+
+    # --- inotify ---
+
+    def _add_watches(self, inotify: "_Inotify") -> tuple[dict[int, Path], dict[int, Path]]:
+        wd_dirs: dict[int, Path] = {}
+        parents: dict[int, Path] = {}
+        # 同时监听目标目录的父目录，目录被创建/替换时重新挂监听
+        for parent in {d.parent for d in self.targets}:
+            try:
+                parents[inotify.add_watch(parent)] = parent
+            except OSError:
+                pass
+        for directory in self.targets:
+            try:
+                wd_dirs[inotify.add_watch(directory)] = directory
+            except OSError:
+                # 目录还不存在：等父目录上的 IN_CREATE 再挂
+                pass
+        return wd_dirs, parents
+
+    def _run_inotify(self, inotify: "_Inotify", wd_dirs: dict[int, Path], parents: dict[int, Path]) -> None:
+        def add(directory: Path) -> None:
+            try:
+                wd_dirs[inotify.add_watch(directory)] = directory
+            except OSError:
+                pass
+
+        try:
+            while not self._stop.is_set():
+                if not inotify.wait(0.5):
+                    continue
+                pending: dict[Path, set[str] | None] = {}
+                first = time.monotonic()
+                while True:
+                    for wd, mask, name in inotify.read():
+                        if mask & IN_Q_OVERFLOW:
+                            pending = {d: None for d in self.targets}
+                            continue
+                        child = parents[wd] / name if wd in parents and name else None
+                        if child in self.targets and mask & (IN_CREATE | IN_MOVED_TO | IN_DELETE | IN_MOVED_FROM):
+                            # 目标目录本身被创建/删除/替换
+                            if mask & (IN_CREATE | IN_MOVED_TO):
+                                add(child)
+                            pending[child] = None
+                        directory = wd_dirs.get(wd)
+                        if directory is None:
+                            continue
+                        if mask & (IN_IGNORED | IN_DELETE_SELF | IN_MOVE_SELF):
+                            wd_dirs.pop(wd, None)
+                            pending[directory] = None
+                            continue
+                        if name and pending.get(directory, set()) is not None:
+                            pending.setdefault(directory, set()).add(name)
+                    # 防抖：安静 debounce 秒后派发，或累计超过 max_delay
+                    if time.monotonic() - first >= self.max_delay or not inotify.wait(self.debounce):
+                        break
+                if pending:
+                    self._dispatch(pending)
+        finally:
+            inotify.close()
+
+
+class _Inotify:
+    """Minimal ctypes binding for inotify(7)."""
+
+    def __init__(self):
+        if not sys.platform.startswith("linux"):
+            raise OSError("inotify requires Linux")
+        libc = ctypes.CDLL(ctypes.util.find_library("c") or "libc.so.6", use_errno=True)
+        self._libc = libc
+        self.fd = libc.inotify_init1(IN_NONBLOCK | IN_CLOEXEC)
+        if self.fd < 0:
+            errno = ctypes.get_errno()
+            raise OSError(errno, os.strerror(errno))
+
+    def add_watch(self, path: Path) -> int:
+        wd = self._libc.inotify_add_watch(self.fd, os.fsencode(path), _WATCH_MASK)
+        if wd < 0:
+            errno = ctypes.get_errno()
+            raise OSError(errno, os.strerror(errno), str(path))
+        return wd
+
+    def wait(self, timeout: float) -> bool:
+        ready, _, _ = select.select([self.fd], [], [], timeout)
+        return bool(ready)
+
+    def read(self) -> list[tuple[int, int, str]]:
+        try:
+            buf = os.read(self.fd, 64 * 1024)
+        except BlockingIOError:
+            return []
+        events = []
+        offset = 0
+        while offset < len(buf):
+            wd, mask, _cookie, length = _EVENT_HEADER.unpack_from(buf, offset)
+            offset += _EVENT_HEADER.size
+            name = buf[offset:offset + length].rstrip(b"\0")
+            offset += length
+            events.append((wd, mask, os.fsdecode(name)))
+        return events
+
+    def close(self) -> None:
+        os.close(self.fd)
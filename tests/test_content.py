@@ -0,0 +1,87 @@
+"""
+Content edited on disk between two reads of the same snapshot.
+
+    uv run pytest -q
+"""
+import importlib
+import sys
+
+import pytest
+from fastapi.testclient import TestClient
+
+POST = """---
+title: "{title}"
+date: 2026-01-0{day}
+tags: ["AI"]
+---
+
+{body}
+"""
+
+
+def write_post(directory, slug, day, body):
+    (directory / f"{slug}.md").write_text(POST.format(title=slug, day=day, body=body), encoding="utf-8")
+
+
+@pytest.fixture
+def site(tmp_path, monkeypatch):
+    """A fresh ``src.main`` over a two-post corpus: body cache too small to hold anything, no rescans."""
+    blog = tmp_path / "blog"
+    blog.mkdir()
+    write_post(blog, "first", 1, "first body")
+    write_post(blog, "second", 2, "second body")
+    monkeypatch.setenv("CONTENT_DIR", str(tmp_path))
+    monkeypatch.setenv("BODY_CACHE_BYTES", "1")
+    monkeypatch.setenv("CONTENT_RESCAN_INTERVAL", "3600")
+    monkeypatch.setenv("WARMUP", "off")
+    sys.modules.pop("src.main", None)
+    main = importlib.import_module("src.main")
+    yield main, blog
+    sys.modules.pop("src.main", None)
+
+
+def test_body_follows_the_file_it_was_read_from(site):
+    main, blog = site
+    store = main.posts_store
+    record = store.get("first")
+    assert store.body(record) == "first body"
+
+    write_post(blog, "first", 1, "edited " * 50)
+    # 旧记录的正文：先让快照追上磁盘，正文与新快照的 digest 一致
+    assert store.body(record) == ("edited " * 50).strip()
+    assert store.get("first").digest != record.digest
+
+
+def test_llms_full_length_matches_body_when_a_post_changes_mid_request(site, monkeypatch):
+    main, blog = site
+    client = TestClient(main.app)
+    stream = main.response_cache.stream
+
+    def edit_then_stream(*args, **kwargs):
+        # 长度已经算好、正文还没发：这时改一篇文章
+        write_post(blog, "second", 2, "a much longer body " * 100)
+        return stream(*args, **kwargs)
+
+    monkeypatch.setattr(main.response_cache, "stream", edit_then_stream)
+    for encoding in ("identity", "gzip"):
+        main.response_cache.cache.clear()
+        response = client.get("/llms-full.txt", headers={"accept-encoding": encoding})
+        assert response.status_code == 200
+        if encoding == "identity":
+            assert int(response.headers["content-length"]) == len(response.content)
+        assert "second body" in response.text
+        assert "a much longer body" not in response.text
+
+
+def test_search_index_is_built_by_the_first_search_not_the_first_page(site):
+    main, blog = site
+    client = TestClient(main.app)
+    assert client.get("/blog").status_code == 200
+    # 列表页只扫描内容，索引留给第一次搜索（在线程里建）
+    assert main.search_index.pending
+    assert [r["slug"] for r in client.get("/api/search", params={"q": "second"}).json()["results"]] == ["second"]
+    assert not main.search_index.pending
+
+    write_post(blog, "first", 1, "renamed body")
+    main.posts_store.update(["first.md"])
+    assert [r["slug"] for r in client.get("/api/search", params={"q": "renamed"}).json()["results"]] == ["first"]
@@ -0,0 +1,31 @@
+"""
+Start-up warm-up stays out of request metrics and the slow-request log.
+
+    uv run pytest -q
+"""
+import importlib
+import sys
+import time
+
+from fastapi.testclient import TestClient
+
+
+def test_warm_up_is_not_recorded(monkeypatch):
+    monkeypatch.setenv("METRICS", "on")
+    monkeypatch.setenv("SLOW_REQUEST_MS", "0.001")
+    monkeypatch.setenv("WARMUP", "on")
+    sys.modules.pop("src.main", None)
+    main = importlib.import_module("src.main")
+    try:
+        with TestClient(main.app) as client:
+            while not main.startup["ready"]:
+                time.sleep(0.05)
+            assert main.startup["warmed_routes"] > 0
+            assert not main.metrics.requests
+            assert not main.slow_requests.entries
+
+            client.get("/about")
+            assert sum(main.metrics.requests.values()) == 1
+            assert len(main.slow_requests.entries) == 1
+    finally:
+        sys.modules.pop("src.main", None)
@@ -0,0 +1,21 @@
+"""
+Conditional GET against cached routes.
+
+    uv run pytest -q
+"""
+import pytest
+from fastapi.testclient import TestClient
+
+
+@pytest.mark.parametrize("encoding", ["gzip", "identity"])
+@pytest.mark.parametrize("url", ["/blog", "/robots.txt", "/llms-full.txt"])
+def test_304_repeats_the_200_cache_headers(url, encoding):
+    from src.main import app
+
+    client = TestClient(app)
+    ok = client.get(url, headers={"accept-encoding": encoding})
+    assert ok.status_code == 200
+    revalidated = client.get(url, headers={"accept-encoding": encoding, "if-none-match": ok.headers["etag"]})
+    assert revalidated.status_code == 304
+    for name in ("etag", "cache-control", "vary"):
+        assert revalidated.headers.get(name) == ok.headers.get(name)